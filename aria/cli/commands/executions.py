@@ -15,13 +15,16 @@
 
 import os
 
+from .. import defaults
 from .. import helptexts
 from .. import table
 from .. import utils
 from .. import logger as cli_logger
 from .. import execution_logging
 from ..core import aria
+from ...core import Core
 from ...modeling.models import Execution
+from ...orchestrator import execution_archive
 from ...orchestrator.workflow_runner import WorkflowRunner
 from ...orchestrator.workflows.executor.dry import DryExecutor
 from ...utils import formatting
@@ -29,6 +32,13 @@ from ...utils import threading
 
 EXECUTION_COLUMNS = ['id', 'workflow_name', 'status', 'service_name',
                      'created_at', 'error']
+# Relationships read by the columns
+EXECUTION_LOAD = ['service']
+
+# Time (in seconds) between checks of whether a started execution ended
+_EXECUTION_CHECK_INTERVAL = 1
+# Time (in seconds) without notifications about stored logs after which the storage is read anyway
+_LOGS_FALLBACK_INTERVAL = 10
 
 
 @aria.group(name='executions')
@@ -51,7 +61,7 @@ def show(execution_id, model_storage, logger):
     `EXECUTION_ID` is the execution to get information on.
     """
     logger.info('Showing execution {0}'.format(execution_id))
-    execution = model_storage.execution.get(execution_id)
+    execution = model_storage.execution.get(execution_id, load=EXECUTION_LOAD + ['inputs'])
 
     table.print_data(EXECUTION_COLUMNS, execution, 'Execution:', col_max_width=50)
 
@@ -66,6 +76,11 @@ def show(execution_id, model_storage, logger):
     else:
         logger.info('\tNo inputs')
 
+    summary = execution_archive.get_summary(model_storage, execution.id)
+    if summary:
+        logger.info('Archived {0} tasks and {1} logs at {2} ({3} bytes)'.format(
+            summary.tasks_count, summary.logs_count, summary.archived_at, summary.size))
+
 
 @executions.command(name='list',
                     short_help='List service executions')
@@ -94,13 +109,38 @@ def list(service_name,
         logger.info('Listing all executions...')
         filters = {}
 
-    executions_list = model_storage.execution.list(
+    executions_list = [execution for execution in model_storage.execution.iter(
         filters=filters,
-        sort=utils.storage_sort_param(sort_by, descending)).items
+        sort=utils.storage_sort_param(sort_by, descending),
+        load=EXECUTION_LOAD,
+        chunk_size=defaults.STORAGE_CHUNK_SIZE)]
 
     table.print_data(EXECUTION_COLUMNS, executions_list, 'Executions:')
 
 
+@executions.command(name='archive',
+                    short_help='Archive the tasks and logs of an ended execution')
+@aria.argument('execution-id')
+@aria.options.verbose()
+@aria.pass_model_storage
+@aria.pass_resource_storage
+@aria.pass_plugin_manager
+@aria.pass_logger
+def archive(execution_id, model_storage, resource_storage, plugin_manager, logger):
+    """Archive the tasks and logs of an ended execution
+
+    The tasks and logs are moved from the storage to a compressed archive in the resource storage.
+    The logs are still listed by `aria logs list`.
+
+    `EXECUTION_ID` is the id of the execution to archive.
+    """
+    logger.info('Archiving execution {0}...'.format(execution_id))
+    core = Core(model_storage, resource_storage, plugin_manager)
+    summary = core.archive_execution(execution_id)
+    logger.info('Archived {0} tasks and {1} logs of execution {2}'.format(
+        summary.tasks_count, summary.logs_count, execution_id))
+
+
 @executions.command(name='start',
                     short_help='Execute a workflow')
 @aria.argument('workflow-name')
@@ -146,10 +186,7 @@ def start(workflow_name,
 
     log_iterator = cli_logger.ModelLogIterator(model_storage, workflow_runner.execution_id)
     try:
-        while execution_thread.is_alive():
-            execution_logging.log_list(log_iterator)
-            execution_thread.join(1)
-
+        _follow_logs(execution_thread, log_iterator)
     except KeyboardInterrupt:
         _cancel_execution(workflow_runner, execution_thread, logger, log_iterator)
 
@@ -167,6 +204,7 @@ def start(workflow_name,
 
     if dry:
         # remove traces of the dry execution (including tasks, logs, inputs..)
+        execution_archive.delete(model_storage, resource_storage, execution)
         model_storage.execution.delete(execution)
 
 
@@ -174,9 +212,22 @@ def _cancel_execution(workflow_runner, execution_thread, logger, log_iterator):
     logger.info('Cancelling execution. Press Ctrl+C again to force-cancel')
     try:
         workflow_runner.cancel()
-        while execution_thread.is_alive():
-            execution_logging.log_list(log_iterator)
-            execution_thread.join(1)
+        _follow_logs(execution_thread, log_iterator)
     except KeyboardInterrupt:
         logger.info('Force-cancelling execution')
         # TODO handle execution (update status etc.) and exit process
+
+
+def _follow_logs(execution_thread, log_iterator):
+    # The logs are read as soon as they are stored. The storage is also read after
+    # _LOGS_FALLBACK_INTERVAL idle seconds, for logs stored by processes that do not notify about
+    # them
+    idle_time = 0
+    execution_logging.log_list(log_iterator)
+    while execution_thread.is_alive():
+        if log_iterator.wait(timeout=_EXECUTION_CHECK_INTERVAL) or \
+                idle_time >= _LOGS_FALLBACK_INTERVAL:
+            execution_logging.log_list(log_iterator)
+            idle_time = 0
+        else:
+            idle_time += _EXECUTION_CHECK_INTERVAL
@@ -12,6 +12,7 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+from .. import defaults
 from .. import execution_logging
 from ..logger import ModelLogIterator
 from ..core import aria
@@ -29,12 +30,13 @@ def logs():
 @aria.argument('execution-id')
 @aria.options.verbose()
 @aria.pass_model_storage
+@aria.pass_resource_storage
 @aria.pass_logger
-def list(execution_id, model_storage, logger):
-    """Display logs for an execution
+def list(execution_id, model_storage, resource_storage, logger):
+    """Display logs for an execution (including archived logs)
     """
     logger.info('Listing logs for execution id {0}'.format(execution_id))
-    log_iterator = ModelLogIterator(model_storage, execution_id)
+    log_iterator = ModelLogIterator(model_storage, execution_id, resource_storage=resource_storage)
 
     any_logs = execution_logging.log_list(log_iterator)
 
@@ -54,7 +56,8 @@ def delete(execution_id, model_storage, logger):
     `EXECUTION_ID` is the execution logs to delete.
     """
     logger.info('Deleting logs for execution id {0}'.format(execution_id))
-    logs_list = model_storage.log.list(filters=dict(execution_fk=execution_id))
-    for log in logs_list:
+    execution_logs = model_storage.log.iter(filters=dict(execution_fk=execution_id),
+                                            chunk_size=defaults.STORAGE_CHUNK_SIZE)
+    for log in execution_logs:
         model_storage.log.delete(log)
     logger.info('Deleted logs for execution id {0}'.format(execution_id))
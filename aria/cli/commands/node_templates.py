@@ -19,6 +19,8 @@ from ..core import aria
 
 
 NODE_TEMPLATE_COLUMNS = ['id', 'name', 'description', 'service_template_name', 'type_name']
+# Relationships read by the columns
+NODE_TEMPLATE_LOAD = ['service_template', 'type']
 
 
 @aria.group(name='node-templates')
@@ -42,7 +44,8 @@ def show(node_template_id, model_storage, logger):
     `NODE_TEMPLATE_ID` is the node id to get information on.
     """
     logger.info('Showing node template {0}'.format(node_template_id))
-    node_template = model_storage.node_template.get(node_template_id)
+    node_template = model_storage.node_template.get(
+        node_template_id, load=NODE_TEMPLATE_LOAD + ['properties', 'nodes'])
 
     table.print_data(NODE_TEMPLATE_COLUMNS, node_template, 'Node template:', col_max_width=50)
 
@@ -88,6 +91,7 @@ def list(service_template_name, sort_by, descending, model_storage, logger):
 
     node_templates_list = model_storage.node_template.list(
         filters=filters,
-        sort=utils.storage_sort_param(sort_by, descending))
+        sort=utils.storage_sort_param(sort_by, descending),
+        load=NODE_TEMPLATE_LOAD)
 
     table.print_data(NODE_TEMPLATE_COLUMNS, node_templates_list, 'Node templates:')
@@ -19,6 +19,8 @@ from ..core import aria
 
 
 NODE_COLUMNS = ['id', 'name', 'service_name', 'node_template_name', 'state']
+# Relationships read by the columns
+NODE_LOAD = ['service', 'node_template']
 
 
 @aria.group(name='nodes')
@@ -41,7 +43,7 @@ def show(node_id, model_storage, logger):
     `NODE_ID` is the id of the node to get information on.
     """
     logger.info('Showing node {0}'.format(node_id))
-    node = model_storage.node.get(node_id)
+    node = model_storage.node.get(node_id, load=NODE_LOAD)
 
     table.print_data(NODE_COLUMNS, node, 'Node:', col_max_width=50)
 
@@ -82,6 +84,7 @@ def list(service_name,
 
     nodes_list = model_storage.node.list(
         filters=filters,
-        sort=utils.storage_sort_param(sort_by, descending))
+        sort=utils.storage_sort_param(sort_by, descending),
+        load=NODE_LOAD)
 
     table.print_data(NODE_COLUMNS, nodes_list, 'Nodes:')
@@ -22,6 +22,7 @@ from .. import table
 from .. import utils
 from ..core import aria
 from ...core import Core
+from ...parser.loading import IMPORT_STORE
 from ...storage import exceptions as storage_exceptions
 
 
@@ -97,20 +98,31 @@ def list(sort_by, descending, model_storage, logger):
 @aria.argument('service-template-path')
 @aria.argument('service-template-name')
 @aria.options.service_template_filename
+@aria.options.imports_bundle
+@aria.options.refresh_imports
 @aria.options.verbose()
 @aria.pass_model_storage
 @aria.pass_resource_storage
 @aria.pass_plugin_manager
 @aria.pass_logger
 def store(service_template_path, service_template_name, service_template_filename,
-          model_storage, resource_storage, plugin_manager, logger):
+          imports_bundle, refresh_imports, model_storage, resource_storage, plugin_manager,
+          logger):
     """Store a service template
 
     `SERVICE_TEMPLATE_PATH` is the path of the service template to store.
 
     `SERVICE_TEMPLATE_NAME` is the name of the service template to store.
+
+    Documents imported from URLs are read from the local import store when they are there (and
+    checked against the lock of the service template, if it has one).
     """
     logger.info('Storing service template {0}...'.format(service_template_name))
+    IMPORT_STORE.refresh = refresh_imports
+
+    if imports_bundle:
+        IMPORT_STORE.add_bundle(imports_bundle)
+        logger.info('Imports bundle {0} added to the import store'.format(imports_bundle))
 
     service_template_path = service_template_utils.get(service_template_path,
                                                        service_template_filename)
@@ -163,24 +175,55 @@ def inputs(service_template_name, model_storage, logger):
                            short_help='Validate a service template')
 @aria.argument('service-template')
 @aria.options.service_template_filename
+@aria.options.refresh_imports
 @aria.options.verbose()
 @aria.pass_model_storage
 @aria.pass_resource_storage
 @aria.pass_plugin_manager
 @aria.pass_logger
-def validate(service_template, service_template_filename,
+def validate(service_template, service_template_filename, refresh_imports,
              model_storage, resource_storage, plugin_manager, logger):
     """Validate a service template
 
     `SERVICE_TEMPLATE` is the path or url of the service template or archive to validate.
     """
     logger.info('Validating service template: {0}'.format(service_template))
+    IMPORT_STORE.refresh = refresh_imports
     service_template_path = service_template_utils.get(service_template, service_template_filename)
     core = Core(model_storage, resource_storage, plugin_manager)
     core.validate_service_template(service_template_path)
     logger.info('Service template validated successfully')
 
 
+@service_templates.command(name='lock-imports',
+                           short_help='Lock the imports of a service template')
+@aria.argument('service-template-path')
+@aria.argument('bundle-path', required=False)
+@aria.options.refresh_imports
+@aria.options.verbose()
+@aria.pass_model_storage
+@aria.pass_resource_storage
+@aria.pass_plugin_manager
+@aria.pass_logger
+def lock_imports(service_template_path, bundle_path, refresh_imports,
+                 model_storage, resource_storage, plugin_manager, logger):
+    """Lock the documents a service template imports from URLs
+
+    `SERVICE_TEMPLATE_PATH` is the path of the service template to lock the imports of. The lock
+    is written next to it.
+
+    `BUNDLE_PATH` is the optional path of an offline bundle of the imported documents, to store
+    the service template with where the URLs cannot be reached.
+    """
+    logger.info('Locking the imports of service template {0}...'.format(service_template_path))
+    IMPORT_STORE.refresh = refresh_imports
+    core = Core(model_storage, resource_storage, plugin_manager)
+    lock_path = core.lock_service_template_imports(service_template_path, bundle_path)
+    logger.info('Imports locked at {0}'.format(lock_path))
+    if bundle_path:
+        logger.info('Imports bundle created at {0}'.format(bundle_path))
+
+
 @service_templates.command(name='create-archive',
                            short_help='Create a csar archive')
 @aria.argument('service-template-path')
@@ -28,6 +28,8 @@ from ...storage import exceptions as storage_exceptions
 
 
 SERVICE_COLUMNS = ['id', 'name', 'service_template_name', 'created_at', 'updated_at']
+# Relationships read by the columns
+SERVICE_LOAD = ['service_template']
 
 
 @aria.group(name='services')
@@ -66,7 +68,8 @@ def list(service_template_name,
 
     services_list = model_storage.service.list(
         sort=utils.storage_sort_param(sort_by=sort_by, descending=descending),
-        filters=filters)
+        filters=filters,
+        load=SERVICE_LOAD)
     table.print_data(SERVICE_COLUMNS, services_list, 'Services:')
 
 
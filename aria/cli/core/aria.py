@@ -325,6 +325,16 @@ class Options(object):
             default=defaults.SERVICE_TEMPLATE_FILENAME,
             help=helptexts.SERVICE_TEMPLATE_FILENAME)
 
+        self.imports_bundle = click.option(
+            '--imports-bundle',
+            type=click.Path(exists=True, dir_okay=False),
+            help=helptexts.IMPORTS_BUNDLE)
+
+        self.refresh_imports = click.option(
+            '--refresh-imports',
+            is_flag=True,
+            help=helptexts.REFRESH_IMPORTS)
+
     @staticmethod
     def verbose(expose_value=False):
         return click.option(
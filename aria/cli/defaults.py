@@ -18,3 +18,4 @@ SERVICE_TEMPLATE_FILENAME = 'service_template.yaml'
 TASK_MAX_ATTEMPTS = 30
 TASK_RETRY_INTERVAL = 30
 SORT_DESCENDING = False
+STORAGE_CHUNK_SIZE = 1000
@@ -20,6 +20,8 @@ import shutil
 from .config import config
 from .logger import Logging
 from .. import (application_model_storage, application_resource_storage)
+from ..parser.loading import IMPORT_STORE
+from ..parser.presentation import PRESENTATION_CACHE
 from ..orchestrator.plugin import PluginManager
 from ..storage.sql_mapi import SQLAlchemyModelAPI
 from ..storage.filesystem_rapi import FileSystemResourceAPI
@@ -42,6 +44,11 @@ class _Environment(object):
         self._resource_storage_dir = os.path.join(workdir, 'resources')
         self._plugins_dir = os.path.join(workdir, 'plugins')
 
+        # Presentations of profiles are shared by the processes using this workdir
+        PRESENTATION_CACHE.path = os.path.join(workdir, 'cache', 'presentations')
+        # Documents imported from URLs are read from the store before they are requested
+        IMPORT_STORE.path = os.path.join(workdir, 'imports')
+
         # initialized lazily
         self._model_storage = None
         self._resource_storage = None
@@ -30,6 +30,12 @@ SERVICE_TEMPLATE_PATH = "The path to the application's service template file"
 SERVICE_TEMPLATE_FILENAME = (
     "The name of the archive's main service template file. "
     "This is only relevant if uploading a (non-csar) archive")
+IMPORTS_BUNDLE = (
+    "An offline bundle of the documents the service template imports from URLs "
+    "(as created by `aria service-templates lock-imports`)")
+REFRESH_IMPORTS = (
+    "Fetch the documents the service template imports from URLs again, rather than reading them "
+    "from the import store (locked documents are still read from the store)")
 INPUTS_PARAMS_USAGE = (
     '(Can be provided as wildcard based paths '
     '(*.yaml, /my_inputs/, etc..) to YAML files, a JSON string or as '
@@ -17,8 +17,13 @@
 import os
 import copy
 import logging
+import threading
 from logutils import dictconfig
 
+from . import defaults
+from .. import logger as aria_logger
+from ..orchestrator import execution_archive
+
 
 HIGH_VERBOSE = 3
 MEDIUM_VERBOSE = 2
@@ -115,18 +120,58 @@ class Logging(object):
 
 
 class ModelLogIterator(object):
-
-    def __init__(self, model_storage, execution_id, filters=None, sort=None):
+    """
+    Iterates over the logs of an execution stored since the previous iteration. ``wait`` blocks
+    until new logs are stored, as long as they are stored by this process (or by the processes of
+    its executors); logs stored by other processes are only found by iterating again.
+
+    If a resource storage is provided, the first iteration starts with the archived logs of the
+    execution (see :mod:`aria.orchestrator.execution_archive`), to which the filters and sort do
+    not apply.
+    """
+
+    def __init__(self, model_storage, execution_id, filters=None, sort=None,
+                 resource_storage=None):
         self._last_visited_id = 0
         self._model_storage = model_storage
+        self._resource_storage = resource_storage
+        self._archive_visited = resource_storage is None
         self._execution_id = execution_id
         self._additional_filters = filters or {}
         self._sort = sort or {}
+        self._logs_stored = threading.Event()
+        aria_logger.logs_stored_signal.connect(self._notify)
+
+    def wait(self, timeout=None):
+        """
+        Blocks until logs of the execution are stored, or until the timeout (in seconds) expires
+        :return: whether logs were stored
+        """
+        # Event.wait returns None before Python 2.7
+        self._logs_stored.wait(timeout)
+        stored = self._logs_stored.is_set()
+        self._logs_stored.clear()
+        return stored
+
+    def _notify(self, execution_id):
+        if execution_id == self._execution_id:
+            self._logs_stored.set()
 
     def __iter__(self):
+        if not self._archive_visited:
+            # The archived logs are no longer stored, and their ids are unrelated to the ids of the
+            # stored logs
+            self._archive_visited = True
+            for log in execution_archive.iter_logs(self._model_storage,
+                                                   self._resource_storage,
+                                                   self._execution_id):
+                yield log
+
         filters = dict(execution_fk=self._execution_id, id=dict(gt=self._last_visited_id))
         filters.update(self._additional_filters)
 
-        for log in self._model_storage.log.iter(filters=filters, sort=self._sort):
+        for log in self._model_storage.log.iter(filters=filters,
+                                                sort=self._sort,
+                                                chunk_size=defaults.STORAGE_CHUNK_SIZE):
             self._last_visited_id = log.id
             yield log
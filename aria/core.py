@@ -14,8 +14,27 @@
 # limitations under the License.
 
 from . import exceptions
+from .orchestrator import execution_archive
 from .parser import consumption
 from .parser.loading.location import UriLocation
+from .parser.loading.store import ImportLock
+
+# The relationships of a service template which are read when instantiating it, loaded up front
+# rather than one instance at a time
+_INSTANTIATION_GRAPH = (
+    'node_templates.type',
+    'node_templates.nodes',
+    'node_templates.properties',
+    'node_templates.artifact_templates',
+    'node_templates.interface_templates.inputs',
+    'node_templates.interface_templates.operation_templates.inputs',
+    'node_templates.capability_templates.properties',
+    'node_templates.capability_templates.valid_source_node_types',
+    'node_templates.requirement_templates.relationship_template.properties',
+    'node_templates.requirement_templates.relationship_template.interface_templates.inputs',
+    'node_templates.requirement_templates.relationship_template.interface_templates'
+    '.operation_templates.inputs',
+)
 
 
 class Core(object):
@@ -63,7 +82,8 @@ class Core(object):
 
     def create_service(self, service_template_id, inputs, service_name=None):
 
-        service_template = self.model_storage.service_template.get(service_template_id)
+        service_template = self.model_storage.service_template.get(
+            service_template_id, load=_INSTANTIATION_GRAPH)
 
         # creating an empty ConsumptionContext, initiating a threadlocal context
         context = consumption.ConsumptionContext()
@@ -106,12 +126,45 @@ class Core(object):
                     "Can't delete service {0} - there are available nodes for this service. "
                     "Available node ids: {1}".format(service.name, ', '.join(available_nodes)))
 
+        for execution in service.executions:
+            execution_archive.delete(self.model_storage, self.resource_storage, execution)
         self.model_storage.service.delete(service)
 
+    def lock_service_template_imports(self, service_template_path, bundle_path=None):
+        """
+        Writes the lock of the documents the service template imports from URLs next to it, and
+        optionally an offline bundle of these documents (see :mod:`aria.parser.loading.store`)
+
+        :return: the path of the lock
+        """
+        import_lock = ImportLock()
+        context = self._parse_service_template(service_template_path, import_lock)
+        lock_path = ImportLock.get_path(service_template_path)
+        import_lock.write(lock_path)
+        if bundle_path is not None:
+            context.loading.import_store.write_bundle(bundle_path, import_lock)
+        return lock_path
+
+    def archive_execution(self, execution_id):
+        """
+        Moves the tasks and logs of an ended execution to an archive in the resource storage (see
+        :mod:`aria.orchestrator.execution_archive`)
+
+        :return: the summary of the archive
+        """
+        execution = self.model_storage.execution.get(execution_id)
+        if not execution.has_ended():
+            raise exceptions.ActiveExecutionError(
+                "Can't archive execution {0} - it has not ended (status: {1})".format(
+                    execution.id, execution.status))
+        return execution_archive.archive(self.model_storage, self.resource_storage, execution)
+
     @staticmethod
-    def _parse_service_template(service_template_path):
+    def _parse_service_template(service_template_path, import_lock=None):
         context = consumption.ConsumptionContext()
         context.presentation.location = UriLocation(service_template_path)
+        context.loading.import_lock = import_lock or \
+            ImportLock.read(ImportLock.get_path(service_template_path))
         consumption.ConsumerChain(
             context,
             (
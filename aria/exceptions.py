@@ -67,6 +67,13 @@ class DependentAvailableNodesError(AriaError):
     pass
 
 
+class ActiveExecutionError(AriaError):
+    """
+    Raised when attempting to archive an execution which has not ended
+    """
+    pass
+
+
 class ParsingError(AriaError):
     pass
 
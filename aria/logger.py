@@ -18,7 +18,14 @@ Logging related mixins and functions
 """
 
 import logging
+import Queue
+import threading
+import time
+import traceback
 from logging import handlers as logging_handlers
+
+from blinker import signal
+from sqlalchemy.exc import OperationalError
 # NullHandler doesn't exist in < 27. this workaround is from
 # http://docs.python.org/release/2.6/library/logging.html#configuring-logging-for-a-library
 try:
@@ -31,6 +38,16 @@ from datetime import datetime
 
 
 TASK_LOGGER_NAME = 'aria.executions.task'
+# Attempts to insert a batch of logs while the db is locked (e.g. by concurrent writers), before
+# keeping the batch for the next insert
+_INSERT_ATTEMPTS = 5
+# Seconds to wait before retrying an insert, doubled on each retry
+_INSERT_RETRY_INTERVAL = 0.05
+
+# Sent (with the execution id as the sender) whenever logs of an execution are stored by this
+# process, or by the processes of its executors. Lets readers of the logs wait for new ones rather
+# than poll the storage.
+logs_stored_signal = signal('logs_stored_signal')
 
 
 _base_logger = logging.getLogger('aria')
@@ -114,19 +131,38 @@ def create_console_log_handler(level=logging.DEBUG, formatter=None):
     return console
 
 
-def create_sqla_log_handler(session, engine, log_cls, execution_id, level=logging.DEBUG):
+def create_sqla_log_handler(session, engine, log_cls, execution_id, level=logging.DEBUG,
+                            batch_size=100, flush_interval=0.1, **kwargs):
+    """
+    Create a handler which stores the logs of an execution in its model storage. Logs are written
+    in batches by a background thread (see ``_SQLAlchemyHandler``), and are only guaranteed to be
+    stored once the handler is flushed (see ``flush_task_logs``).
+
+    :param engine: the engine of the model storage, which the handler shares
+    :param batch_size: maximal number of logs written at once
+    :param flush_interval: maximal time (in seconds) a log waits before it is written
+    """
 
-    # This is needed since the engine and session are entirely new we need to reflect the db
-    # schema of the logging model into the engine and session.
+    # The log table might not exist yet if the engine was never used to create the storage
     log_cls.__table__.create(bind=engine, checkfirst=True)
 
     return _SQLAlchemyHandler(session=session,
                               engine=engine,
                               log_cls=log_cls,
                               execution_id=execution_id,
+                              batch_size=batch_size,
+                              flush_interval=flush_interval,
                               level=level)
 
 
+def flush_task_logs():
+    """
+    Waits until the logs of the task logger are stored by its handlers
+    """
+    for handler in logging.getLogger(TASK_LOGGER_NAME).handlers:
+        handler.flush()
+
+
 class _DefaultConsoleFormat(logging.Formatter):
     """
     _DefaultConsoleFormat class
@@ -167,34 +203,124 @@ def create_file_log_handler(
 
 
 class _SQLAlchemyHandler(logging.Handler):
+    """
+    Queues the emitted logs, which a background thread inserts in batches of up to ``batch_size``
+    rows, at most ``flush_interval`` seconds after they were emitted. ``flush`` (and ``close``)
+    wait until all the logs emitted so far are stored. ``logs_stored_signal`` is sent after each
+    batch.
+
+    Inserts failing because the db is locked are retried, and the batch is kept for the next insert
+    (or flush) if they keep failing.
+    """
 
-    def __init__(self, session, engine, log_cls, execution_id, **kwargs):
+    def __init__(self, session, engine, log_cls, execution_id, batch_size=100, flush_interval=0.1,
+                 **kwargs):
         logging.Handler.__init__(self, **kwargs)
         self._session = session
         self._engine = engine
         self._cls = log_cls
         self._execution_id = execution_id
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._queue = Queue.Queue()
+        self._flusher = None
+        self._flusher_lock = threading.Lock()
 
     def emit(self, record):
-        created_at = datetime.strptime(logging.Formatter('%(asctime)s').formatTime(record),
-                                       '%Y-%m-%d %H:%M:%S,%f')
-        log = self._cls(
+        self._queue.put(dict(
             execution_fk=self._execution_id,
             task_fk=record.task_id,
             level=record.levelname,
             msg=str(record.msg),
-            created_at=created_at,
+            created_at=datetime.fromtimestamp(record.created),
 
             # Not mandatory.
             traceback=getattr(record, 'traceback', None)
-        )
-        self._session.add(log)
-
-        try:
-            self._session.commit()
-        except BaseException:
-            self._session.rollback()
-            raise
+        ))
+        if self._flusher is None:
+            self._start_flusher()
+
+    def flush(self):
+        with self._flusher_lock:
+            if self._flusher is None:
+                return
+            flushed = threading.Event()
+            self._queue.put(flushed)
+        flushed.wait()
+
+    def close(self):
+        with self._flusher_lock:
+            flusher, self._flusher = self._flusher, None
+            if flusher is not None:
+                self._queue.put(_STOP_FLUSHER)
+        if flusher is not None:
+            flusher.join()
+        logging.Handler.close(self)
+
+    def _start_flusher(self):
+        with self._flusher_lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_queue,
+                                                 name='SQLAlchemyHandler-flusher')
+                self._flusher.daemon = True
+                self._flusher.start()
+
+    def _flush_queue(self):
+        rows = []
+        deadline = None
+        while True:
+            try:
+                item = self._queue.get(
+                    timeout=max(deadline - time.time(), 0) if rows else None)
+            except Queue.Empty:
+                # The oldest log waited long enough
+                item = None
+            if isinstance(item, dict):
+                rows.append(item)
+                if len(rows) == 1:
+                    deadline = time.time() + self._flush_interval
+                if len(rows) < self._batch_size:
+                    continue
+                item = None
+            if rows:
+                if self._insert(rows):
+                    rows = []
+                else:
+                    deadline = time.time() + self._flush_interval
+            if item is _STOP_FLUSHER:
+                return
+            elif item is not None:
+                # A flush request
+                item.set()
+
+    def _insert(self, rows):
+        """
+        :return: ``False`` if the rows should be kept for the next insert
+        """
+        retry_interval = _INSERT_RETRY_INTERVAL
+        for attempt in range(1, _INSERT_ATTEMPTS + 1):
+            try:
+                self._engine.execute(self._cls.__table__.insert(), rows)
+                logs_stored_signal.send(self._execution_id)
+                return True
+            except OperationalError:
+                if attempt == _INSERT_ATTEMPTS:
+                    _print_exception()
+                    return False
+                time.sleep(retry_interval)
+                retry_interval *= 2
+            except BaseException:
+                _print_exception()
+                return True
+
+
+def _print_exception():
+    # There is no caller to raise to, this is what logging does with failing handlers
+    if logging.raiseExceptions:
+        traceback.print_exc()
+
+
+_STOP_FLUSHER = object()
 
 
 _default_file_formatter = logging.Formatter(
@@ -80,7 +80,8 @@ __all__ = (
     'Execution',
     'Plugin',
     'Task',
-    'Log'
+    'Log',
+    'ExecutionArchive'
 )
 
 
@@ -237,6 +238,10 @@ class Task(aria_declarative_base, orchestration.TaskBase):
 class Log(aria_declarative_base, orchestration.LogBase):
     pass
 
+
+class ExecutionArchive(aria_declarative_base, orchestration.ExecutionArchiveBase):
+    pass
+
 # endregion
 
 
@@ -284,5 +289,6 @@ models_to_register = [
     Execution,
     Plugin,
     Task,
-    Log
+    Log,
+    ExecutionArchive
 ]
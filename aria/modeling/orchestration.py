@@ -18,6 +18,8 @@ classes:
     * Execution - execution implementation model.
     * Plugin - plugin implementation model.
     * Task - a task
+    * Log - a log of an execution
+    * ExecutionArchive - a summary of an archived execution
 """
 
 # pylint: disable=no-self-argument, no-member, abstract-method
@@ -33,6 +35,7 @@ from sqlalchemy import (
     Enum,
     String,
     Float,
+    Index,
     orm,
 )
 from sqlalchemy.ext.associationproxy import association_proxy
@@ -123,7 +126,7 @@ class ExecutionBase(ModelMixin):
 
     @declared_attr
     def service_fk(cls):
-        return relationship.foreign_key('service')
+        return relationship.foreign_key('service', index=True)
 
     # endregion
 
@@ -259,6 +262,11 @@ class TaskBase(ModelMixin):
 
     __tablename__ = 'task'
 
+    @declared_attr
+    def __table_args__(cls):
+        # The tasks of an execution, possibly in some status
+        return (Index('ix_task_execution_fk_status', 'execution_fk', 'status'),)
+
     __private_fields__ = ['node_fk',
                           'relationship_fk',
                           'plugin_fk',
@@ -311,7 +319,7 @@ class TaskBase(ModelMixin):
     ignore_failure = Column(Boolean, default=False)
 
     # State
-    status = Column(Enum(*STATES, name='status'), default=PENDING)
+    status = Column(Enum(*STATES, name='status'), default=PENDING, index=True)
     due_at = Column(DateTime, nullable=False, index=True, default=datetime.utcnow())
     started_at = Column(DateTime, default=None)
     ended_at = Column(DateTime, default=None)
@@ -421,7 +429,7 @@ class LogBase(ModelMixin):
 
     @declared_attr
     def execution_fk(cls):
-        return relationship.foreign_key('execution')
+        return relationship.foreign_key('execution', index=True)
 
     @declared_attr
     def task_fk(cls):
@@ -435,3 +443,32 @@ class LogBase(ModelMixin):
     def __repr__(self):
         name = (self.task.actor if self.task else self.execution).name
         return '{name}: {self.msg}'.format(name=name, self=self)
+
+
+class ExecutionArchiveBase(ModelMixin):
+    """
+    Summary of the tasks and logs of an ended execution, which were moved from the model storage to
+    an archive in the resource storage (see :mod:`aria.orchestrator.execution_archive`).
+    """
+
+    __tablename__ = 'execution_archive'
+
+    __private_fields__ = ['execution_fk']
+
+    @declared_attr
+    def execution(cls):
+        return relationship.one_to_one(cls, 'execution', back_populates=relationship.NO_BACK_POP)
+
+    archived_at = Column(DateTime, nullable=False)
+    tasks_count = Column(Integer, nullable=False, default=0)
+    logs_count = Column(Integer, nullable=False, default=0)
+    # Size (in bytes) of the compressed archive
+    size = Column(Integer, nullable=False, default=0)
+
+    # region foreign keys
+
+    @declared_attr
+    def execution_fk(cls):
+        return relationship.foreign_key('execution', index=True)
+
+    # endregion
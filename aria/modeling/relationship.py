@@ -29,7 +29,7 @@ from ..utils import formatting
 NO_BACK_POP = 'NO_BACK_POP'
 
 
-def foreign_key(other_table, nullable=False):
+def foreign_key(other_table, nullable=False, index=False):
     """
     Declare a foreign key property, which will also create a foreign key column in the table with
     the name of the property. By convention the property name should end in "_fk".
@@ -48,11 +48,15 @@ def foreign_key(other_table, nullable=False):
     :type other_table: basestring
     :param nullable: True to allow null values (meaning that there is no relationship)
     :type nullable: bool
+    :param index: True to index the column, for relationships which are often queried (by the
+                  other table, e.g. the logs of an execution)
+    :type index: bool
     """
 
     return Column(Integer,
                   ForeignKey('{table}.id'.format(table=other_table), ondelete='CASCADE'),
-                  nullable=nullable)
+                  nullable=nullable,
+                  index=index)
 
 
 def one_to_one_self(model_class, fk):
@@ -100,7 +100,7 @@ class ServiceBase(InstanceModelMixin):
     @declared_attr
     def service_template_fk(cls):
         """For Service many-to-one to ServiceTemplate"""
-        return relationship.foreign_key('service_template', nullable=True)
+        return relationship.foreign_key('service_template', nullable=True, index=True)
 
     # endregion
 
@@ -433,12 +433,12 @@ class NodeBase(InstanceModelMixin):
     @declared_attr
     def service_fk(cls):
         """For Service one-to-many to Node"""
-        return relationship.foreign_key('service')
+        return relationship.foreign_key('service', index=True)
 
     @declared_attr
     def node_template_fk(cls):
         """For Node many-to-one to NodeTemplate"""
-        return relationship.foreign_key('node_template')
+        return relationship.foreign_key('node_template', index=True)
 
     # endregion
 
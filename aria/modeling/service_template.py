@@ -454,7 +454,7 @@ class NodeTemplateBase(TemplateModelMixin):
     @declared_attr
     def service_template_fk(cls):
         """For ServiceTemplate one-to-many to NodeTemplate"""
-        return relationship.foreign_key('service_template')
+        return relationship.foreign_key('service_template', index=True)
 
     # endregion
 
@@ -79,13 +79,10 @@ class BaseContext(object):
             self.logger.addHandler(self._get_sqla_handler())
 
     def _get_sqla_handler(self):
-        api_kwargs = {}
-        if self._model._initiator:
-            api_kwargs.update(self._model._initiator(**self._model._initiator_kwargs))
-        api_kwargs.update(**self._model._api_kwargs)
+        # The handler shares the engine (and thus the connection pool) of the model storage
         return aria_logger.create_sqla_log_handler(log_cls=modeling.models.Log,
                                                    execution_id=self._execution_id,
-                                                   **api_kwargs)
+                                                   **self._model._all_api_kwargs)
 
     def __repr__(self):
         return (
@@ -89,7 +89,8 @@ class BaseOperationContext(BaseContext):
 
     @classmethod
     def deserialize_from_dict(cls, model_storage=None, resource_storage=None, **kwargs):
-        if model_storage:
+        # The model storage may also be passed as is (e.g. one the process already uses)
+        if isinstance(model_storage, dict):
             model_storage = aria.application_model_storage(**model_storage)
         if resource_storage:
             resource_storage = aria.application_resource_storage(**resource_storage)
@@ -28,6 +28,17 @@ class WorkflowContext(BaseContext):
     """
     Context object used during workflow creation and execution
     """
+
+    # The relationships of nodes which are used when building workflow graphs (each operation task
+    # reads its operation, and each relationship task reads the target node as well)
+    NODE_GRAPH = (
+        'interfaces.operations.plugin',
+        'interfaces.operations.inputs',
+        'outbound_relationships.target_node',
+        'outbound_relationships.interfaces.operations.plugin',
+        'outbound_relationships.interfaces.operations.inputs',
+    )
+
     def __init__(self,
                  workflow_name,
                  parameters=None,
@@ -83,13 +94,14 @@ class WorkflowContext(BaseContext):
     @property
     def nodes(self):
         """
-        Iterator over node instances
+        Iterator over node instances, along with their ``NODE_GRAPH``
         """
         key = 'service_{0}'.format(self.model.node.model_cls.name_column_name())
         return self.model.node.iter(
             filters={
                 key: getattr(self.service, self.service.name_column_name())
-            }
+            },
+            load=self.NODE_GRAPH
         )
 
 
@@ -0,0 +1,238 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Archives of ended executions.
+
+The tasks and logs of an ended execution can be moved out of the model storage, into a compressed
+archive in the execution's entry of the resource storage. An ``ExecutionArchive`` summary is left
+in the model storage instead.
+
+The archive is a directory of parts, each a gzip file of JSON lines holding a task or a log.
+Archiving an execution again only uploads a new part, named by the time it was archived (so that
+the parts are read in the order they were archived).
+"""
+
+import gzip
+import itertools
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+from sqlalchemy import DateTime
+
+from ..modeling import models
+from ..storage import exceptions as storage_exceptions
+from ..utils import formatting
+
+
+ARCHIVE_DIR = 'archive'
+
+_DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+_PART_NAME_FORMAT = '%Y%m%dT%H%M%S%f.jsonl.gz'
+
+
+def archive(model_storage, resource_storage, execution, chunk_size=1000):
+    """
+    Moves the tasks and logs of an ended execution to its archive.
+
+    If the execution was already archived, the tasks and logs it has since are added to the archive
+    as a new part. An interrupted archiving is completed this way as well (the rows it archived but
+    did not remove are archived again, and skipped when reading the archive).
+
+    :param chunk_size: number of tasks or logs held in memory at a time
+    :return: the summary of the archive
+    :rtype: :class:`~aria.modeling.models.ExecutionArchive`
+    """
+    entry_id = str(execution.id)
+    filters = dict(execution_fk=execution.id)
+    archived_at = datetime.utcnow()
+    temp_dir = tempfile.mkdtemp()
+    try:
+        part_name = archived_at.strftime(_PART_NAME_FORMAT)
+        part_path = os.path.join(temp_dir, part_name)
+        with gzip.open(part_path, 'wb') as part_file:
+            for task in model_storage.task.iter(filters=filters, load=['inputs'],
+                                                chunk_size=chunk_size):
+                _write(part_file, _task_record(task))
+            for log in model_storage.log.iter(filters=filters, chunk_size=chunk_size):
+                _write(part_file, _record('log', log))
+        resource_storage.execution.upload(entry_id=entry_id,
+                                          source=part_path,
+                                          path='{0}/{1}'.format(ARCHIVE_DIR, part_name))
+        size = os.path.getsize(part_path)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    summary = get_summary(model_storage, execution.id) or \
+        models.ExecutionArchive(execution=execution, tasks_count=0, logs_count=0, size=0)
+    summary.archived_at = archived_at
+    summary.size += size
+    model_storage.execution_archive.put(summary)
+
+    # The rows are only removed once they are safely archived. The storage's models share a
+    # session, so the counts of the summary are committed along with the removal of the rows.
+    for logs in _chunks(model_storage.log.iter(filters=filters, chunk_size=chunk_size),
+                        chunk_size):
+        summary.logs_count += len(logs)
+        model_storage.log.delete_many(logs, bulk=True)
+    for tasks in _chunks(model_storage.task.iter(filters=filters, load=['inputs'],
+                                                 chunk_size=chunk_size),
+                         chunk_size):
+        inputs = [parameter for task in tasks for parameter in task.inputs.values()]
+        summary.tasks_count += len(tasks)
+        model_storage.task.delete_many(tasks)
+        # The inputs belong to their task alone, which was just removed along with its
+        # association rows
+        model_storage.parameter.delete_many(inputs, bulk=True)
+    return summary
+
+
+def get_summary(model_storage, execution_id):
+    """
+    :return: the summary of the archive of the execution, or ``None`` if it was never archived
+    :rtype: :class:`~aria.modeling.models.ExecutionArchive`
+    """
+    summaries = model_storage.execution_archive.list(filters=dict(execution_fk=execution_id))
+    return summaries[0] if summaries else None
+
+
+def delete(model_storage, resource_storage, execution):
+    """
+    Removes the archive of an execution, and its summary (e.g. once the execution is removed)
+    """
+    resource_storage.execution.delete(entry_id=str(execution.id), path=ARCHIVE_DIR)
+    summary = get_summary(model_storage, execution.id)
+    if summary is not None:
+        model_storage.execution_archive.delete(summary)
+
+
+def iter_logs(model_storage, resource_storage, execution_id):
+    """
+    Iterates over the archived logs of an execution, by their order of creation. The logs (and
+    their tasks) are read-only stand-ins for the models which were archived.
+
+    :rtype: iterable of :class:`ArchivedLog`
+    """
+    temp_dir = tempfile.mkdtemp()
+    try:
+        try:
+            resource_storage.execution.download(entry_id=str(execution_id),
+                                                destination=temp_dir,
+                                                path=ARCHIVE_DIR)
+        except storage_exceptions.StorageError:
+            return
+        execution = model_storage.execution.get(execution_id)
+        tasks = {}
+        archived_logs = set()
+        # An interrupted archiving may have archived some of the logs twice. Note that SQLite may
+        # reuse the ids of rows removed from the end of a table, so logs stored after a previous
+        # archiving may have the ids of logs archived by it.
+        for part_name in sorted(os.listdir(temp_dir)):
+            with gzip.open(os.path.join(temp_dir, part_name), 'rb') as part_file:
+                for line in part_file:
+                    record = json.loads(line)
+                    if record.pop('type') == 'task':
+                        tasks[record['id']] = ArchivedTask(record)
+                    else:
+                        key = record['id'], record['created_at']
+                        if key not in archived_logs:
+                            archived_logs.add(key)
+                            yield ArchivedLog(record, execution=execution,
+                                              task=tasks.get(record['task_fk']))
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+class ArchivedTask(object):
+    """
+    An archived :class:`~aria.modeling.models.Task`. Its inputs are
+    :class:`ArchivedParameter` instances.
+    """
+
+    def __init__(self, record):
+        inputs = record.pop('inputs')
+        vars(self).update(_decode(models.Task, record))
+        self.inputs = dict((name, ArchivedParameter(name, value))
+                           for name, value in inputs.iteritems())
+
+
+class ArchivedLog(object):
+    """
+    An archived :class:`~aria.modeling.models.Log`.
+    """
+
+    def __init__(self, record, execution, task):
+        vars(self).update(_decode(models.Log, record))
+        self.execution = execution
+        self.task = task
+
+    def __str__(self):
+        return self.msg
+
+
+class ArchivedParameter(object):
+    """
+    An archived :class:`~aria.modeling.models.Parameter`, holding its raw value.
+    """
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+    def unwrap(self):
+        return self.name, self.value
+
+
+def _task_record(task):
+    record = _record('task', task)
+    record['inputs'] = dict((name, formatting.as_raw(parameter.value))
+                            for name, parameter in task.inputs.iteritems())
+    return record
+
+
+def _record(record_type, instance):
+    record = dict(type=record_type)
+    for column in instance.__table__.columns:
+        value = getattr(instance, column.key)
+        if isinstance(value, datetime):
+            value = value.strftime(_DATETIME_FORMAT)
+        record[column.key] = value
+    return record
+
+
+def _decode(model_cls, record):
+    for column in model_cls.__table__.columns:
+        value = record.get(column.key)
+        if value is not None and isinstance(column.type, DateTime):
+            record[column.key] = datetime.strptime(value, _DATETIME_FORMAT)
+    return record
+
+
+def _write(archive_file, record):
+    archive_file.write(json.dumps(record, cls=formatting.JsonAsRawEncoder))
+    archive_file.write('\n')
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
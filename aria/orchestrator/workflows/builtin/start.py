@@ -24,5 +24,5 @@ from ... import workflow
 
 @workflow
 def start(ctx, graph):
-    for node in ctx.model.node.iter():
+    for node in ctx.model.node.iter(load=ctx.NODE_GRAPH):
         graph.add_tasks(WorkflowTask(start_node, node=node))
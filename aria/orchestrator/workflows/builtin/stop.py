@@ -24,5 +24,5 @@ from ... import workflow
 
 @workflow
 def stop(ctx, graph):
-    for node in ctx.model.node.iter():
+    for node in ctx.model.node.iter(load=ctx.NODE_GRAPH):
         graph.add_tasks(WorkflowTask(stop_node, node=node))
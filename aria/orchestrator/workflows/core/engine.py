@@ -17,7 +17,9 @@
 The workflow engine. Executes workflows
 """
 
+import heapq
 import time
+import Queue
 from datetime import datetime
 
 import networkx
@@ -32,6 +34,13 @@ from . import translation
 # Import required so all signals are registered
 from . import events_handler  # pylint: disable=unused-import
 
+# Maximal time (in seconds) the engine waits for a task update before checking whether the
+# execution has been cancelled by another process
+_CANCEL_CHECK_INTERVAL = 1
+
+# Queued in place of a task id in order to wake up the engine (e.g. on cancellation)
+_WAKE_UP = object()
+
 
 class Engine(logger.LoggerMixin):
     """
@@ -45,25 +54,43 @@ class Engine(logger.LoggerMixin):
         self._executor = executor
         translation.build_execution_graph(task_graph=tasks_graph,
                                           execution_graph=self._execution_graph)
+        # Number of unfinished dependencies per task; a task is ready once it drops to 0
+        self._dependencies_count = dict(
+            (task_id, len(self._execution_graph.pred[task_id]))
+            for task_id in self._execution_graph.nodes_iter())
+        # Tasks whose state was updated, pushed by the executors' threads
+        self._updated_tasks = Queue.Queue()
+        # Heap of (due_at, task_id) of tasks waiting to be (re)executed
+        self._timers = []
+        self._scheduled = set()
+        # Operation tasks whose in-memory state was updated but not yet stored
+        self._unstored_tasks = set()
 
     def execute(self):
         """
         execute the workflow
         """
+        events.on_update_task_signal.connect(self._task_updated)
         try:
             events.start_workflow_signal.send(self._workflow_context)
-            while True:
-                cancel = self._is_cancel()
-                if cancel:
-                    break
-                for task in self._ended_tasks():
-                    self._handle_ended_tasks(task)
-                for task in self._executable_tasks():
-                    self._handle_executable_task(task)
+            for task_id, count in self._dependencies_count.items():
+                if count == 0:
+                    self._schedule(self._get_task(task_id))
+            cancel = self._is_cancel()
+            last_cancel_check = time.time()
+            while not cancel and not self._all_tasks_consumed():
+                self._execute_due_tasks()
                 if self._all_tasks_consumed():
                     break
-                else:
-                    time.sleep(0.1)
+                updated_tasks = self._wait_for_updates(
+                    timeout=self._next_timeout(last_cancel_check))
+                self._store_tasks_state()
+                for task in updated_tasks:
+                    self._handle_updated_task(task)
+                if _WAKE_UP in updated_tasks or \
+                        time.time() - last_cancel_check >= _CANCEL_CHECK_INTERVAL:
+                    cancel = self._is_cancel()
+                    last_cancel_check = time.time()
             if cancel:
                 events.on_cancelled_workflow_signal.send(self._workflow_context)
             else:
@@ -72,6 +99,12 @@ class Engine(logger.LoggerMixin):
 
             events.on_failure_workflow_signal.send(self._workflow_context, exception=e)
             raise
+        finally:
+            events.on_update_task_signal.disconnect(self._task_updated)
+            # From now on tasks store their own updates; store the ones the engine took
+            self._wait_for_updates(timeout=0)
+            self._store_tasks_state()
+            logger.flush_task_logs()
 
     def cancel_execution(self):
         """
@@ -80,44 +113,113 @@ class Engine(logger.LoggerMixin):
         will be modified to 'cancelled' directly.
         """
         events.on_cancelling_workflow_signal.send(self._workflow_context)
+        self._updated_tasks.put(_WAKE_UP)
 
     def _is_cancel(self):
         return self._workflow_context.execution.status in (models.Execution.CANCELLING,
                                                            models.Execution.CANCELLED)
 
-    def _executable_tasks(self):
-        now = datetime.utcnow()
-        return (task for task in self._tasks_iter()
-                if task.is_waiting() and
-                task.due_at <= now and
-                not self._task_has_dependencies(task))
-
-    def _ended_tasks(self):
-        return (task for task in self._tasks_iter() if task.has_ended())
+    def _task_updated(self, task, *args, **kwargs):
+        # Called from the executors' threads; the actual handling is done by the engine's thread.
+        # Returning True means the engine takes care of storing the update
+        if task.id in self._execution_graph:
+            self._updated_tasks.put(task)
+            return True
+        return False
 
-    def _task_has_dependencies(self, task):
-        return len(self._execution_graph.pred.get(task.id, {})) > 0
+    def _wait_for_updates(self, timeout):
+        """
+        Waits for at least one task update, and returns all the pending updated tasks
+        """
+        updated_tasks = []
+        try:
+            updated_tasks.append(self._updated_tasks.get(timeout=timeout))
+            while True:
+                updated_tasks.append(self._updated_tasks.get_nowait())
+        except Queue.Empty:
+            pass
+        self._unstored_tasks.update(task for task in updated_tasks if task is not _WAKE_UP)
+        return updated_tasks
+
+    def _store_tasks_state(self):
+        # Task states are stored in batches, storage is not read back by the engine
+        engine_task.store_tasks_state(self._unstored_tasks, self._workflow_context.model)
+        self._unstored_tasks.clear()
+
+    def _next_timeout(self, last_cancel_check):
+        timeout = max(_CANCEL_CHECK_INTERVAL - (time.time() - last_cancel_check), 0)
+        if self._timers:
+            due_at = self._timers[0][0]
+            timeout = min(timeout, max(_total_seconds(due_at - datetime.utcnow()), 0))
+        return timeout
+
+    def _get_task(self, task_id):
+        return self._execution_graph.node[task_id]['task']
 
     def _all_tasks_consumed(self):
         return len(self._execution_graph.node) == 0
 
-    def _tasks_iter(self):
-        for _, data in self._execution_graph.nodes_iter(data=True):
-            task = data['task']
-            if isinstance(task, engine_task.OperationTask):
-                if not task.model_task.has_ended():
-                    self._workflow_context.model.task.refresh(task.model_task)
-            yield task
-
-    def _handle_executable_task(self, task):
+    def _schedule(self, task):
+        if task.id not in self._scheduled:
+            self._scheduled.add(task.id)
+            heapq.heappush(self._timers, (task.due_at, task.id))
+
+    def _execute_due_tasks(self):
+        while True:
+            now = datetime.utcnow()
+            due_tasks = []
+            while self._timers and self._timers[0][0] <= now:
+                _, task_id = heapq.heappop(self._timers)
+                self._scheduled.discard(task_id)
+                if task_id in self._execution_graph:
+                    due_tasks.append(self._get_task(task_id))
+            if not due_tasks:
+                return
+            # Tasks on the critical path of the execution graph (see the priorities set by
+            # translation.build_execution_graph) are executed first
+            sent_tasks = []
+            for task in sorted(due_tasks, key=lambda due_task: due_task.priority, reverse=True):
+                if task.is_waiting():
+                    self._handle_executable_task(task, sent_tasks)
+            self._execute_sent_tasks(sent_tasks)
+
+    def _handle_updated_task(self, task):
+        if task is _WAKE_UP or task.id not in self._execution_graph:
+            # Stale update of a task that was already handled
+            return
+        if task.has_ended():
+            self._handle_ended_tasks(task)
+        elif task.status == models.Task.RETRYING:
+            self._schedule(task)
+
+    def _handle_executable_task(self, task, sent_tasks):
         if isinstance(task, engine_task.StubTask):
             task.status = models.Task.SUCCESS
+            self._handle_ended_tasks(task)
         else:
             events.sent_task_signal.send(task)
+            sent_tasks.append(task)
+
+    def _execute_sent_tasks(self, sent_tasks):
+        # The tasks are stored as sent before their operations start, so that the operations (and
+        # any other reader of the storage) do not find them pending
+        self._unstored_tasks.update(sent_tasks)
+        self._store_tasks_state()
+        for task in sent_tasks:
             self._executor.execute(task)
 
     def _handle_ended_tasks(self, task):
         if task.status == models.Task.FAILED and not task.ignore_failure:
             raise exceptions.ExecutorException('Workflow failed')
         else:
+            dependents = self._execution_graph.successors(task.id)
             self._execution_graph.remove_node(task.id)
+            for dependent_id in dependents:
+                self._dependencies_count[dependent_id] -= 1
+                if self._dependencies_count[dependent_id] == 0:
+                    self._schedule(self._get_task(dependent_id))
+
+
+def _total_seconds(delta):
+    # timedelta.total_seconds is not available on python 2.6
+    return (delta.microseconds + (delta.seconds + delta.days * 24 * 3600) * 10 ** 6) / 10.0 ** 6
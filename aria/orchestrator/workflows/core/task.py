@@ -26,9 +26,15 @@ from functools import (
 
 
 from ....modeling import models
+from ... import events
 from ...context import operation as operation_context
 from .. import exceptions
 
+# Number of task models loaded by a single query when storing new tasks
+_LOAD_CHUNK_SIZE = 1000
+# Maximal number of values in a single "IN" filter (SQLite limits the number of query parameters)
+_MAX_FILTER_VALUES = 500
+
 
 def _locked(func=None):
     if func is None:
@@ -50,6 +56,8 @@ class BaseTask(object):
     def __init__(self, id, *args, **kwargs):
         super(BaseTask, self).__init__(*args, **kwargs)
         self._id = id
+        # Tasks with a higher priority are executed first when the executor has to queue tasks
+        self.priority = 0
 
     @property
     def id(self):
@@ -104,12 +112,42 @@ class EndSubWorkflowTask(StubTask):
     pass
 
 
+class _TaskState(object):
+    """
+    The engine's in-memory record of an operation task's state
+    """
+    __slots__ = ('status', 'due_at', 'started_at', 'ended_at', 'retry_count')
+
+    def __init__(self, task_model):
+        for field in self.__slots__:
+            setattr(self, field, getattr(task_model, field))
+
+
 class OperationTask(BaseTask):
     """
     Operation task
+
+    The task's state is held in memory, and is what the engine reads. The engine stores state
+    updates to the model storage in batches (see ``store_tasks_state``).
     """
 
-    def __init__(self, api_task, *args, **kwargs):
+    # Task model columns which never change once the task is created
+    _STATIC_FIELDS = ('name', 'implementation', 'max_attempts', 'retry_interval',
+                      'ignore_failure', 'plugin_fk')
+
+    PENDING = models.Task.PENDING
+    RETRYING = models.Task.RETRYING
+    SENT = models.Task.SENT
+    STARTED = models.Task.STARTED
+    SUCCESS = models.Task.SUCCESS
+    FAILED = models.Task.FAILED
+    INFINITE_RETRIES = models.Task.INFINITE_RETRIES
+
+    def __init__(self, api_task, store=True, *args, **kwargs):
+        """
+        :param store: whether to store the task model right away. Otherwise, the task must be stored
+                      with ``store_new_tasks`` before it is used
+        """
         super(OperationTask, self).__init__(id=api_task.id, **kwargs)
         self._workflow_context = api_task._workflow_context
         self.interface_name = api_task.interface_name
@@ -128,7 +166,9 @@ class OperationTask(BaseTask):
             raise RuntimeError('No operation context could be created for {actor.model_cls}'
                                .format(actor=api_task.actor))
 
-        task_model = create_task_model(
+        self._context_cls = context_cls
+        self._actor_id = api_task.actor.id
+        self._task_model = create_task_model(
             name=api_task.name,
             implementation=api_task.implementation,
             actor=api_task.actor,
@@ -137,37 +177,48 @@ class OperationTask(BaseTask):
             max_attempts=api_task.max_attempts,
             retry_interval=api_task.retry_interval,
             ignore_failure=api_task.ignore_failure,
-            plugin=plugin,
-            execution=self._workflow_context.execution
+            plugin=plugin
         )
-        self._workflow_context.model.task.put(task_model)
-
-        self._ctx = context_cls(name=api_task.name,
-                                model_storage=self._workflow_context.model,
-                                resource_storage=self._workflow_context.resource,
-                                service_id=self._workflow_context._service_id,
-                                task_id=task_model.id,
-                                actor_id=api_task.actor.id,
-                                execution_id=self._workflow_context._execution_id,
-                                workdir=self._workflow_context._workdir)
-        self._task_id = task_model.id
+        self._task_id = None
+        self._ctx = None
+        self._state = None
+        self._static_fields = None
         self._update_fields = None
+        if store:
+            store_new_tasks([self], model_storage)
+
+    def _stored(self, task_model):
+        self._task_model = None
+        self._ctx = self._context_cls(name=task_model.name,
+                                      model_storage=self._workflow_context.model,
+                                      resource_storage=self._workflow_context.resource,
+                                      service_id=self._workflow_context._service_id,
+                                      task_id=task_model.id,
+                                      actor_id=self._actor_id,
+                                      execution_id=self._workflow_context._execution_id,
+                                      workdir=self._workflow_context._workdir)
+        self._task_id = task_model.id
+        self._state = _TaskState(task_model)
+        self._static_fields = dict((field, getattr(task_model, field))
+                                   for field in self._STATIC_FIELDS)
 
     @contextmanager
     def _update(self):
         """
         A context manager which puts the task into update mode, enabling fields update.
+        Once the in-memory state is updated, ``on_update_task_signal`` is sent. If no receiver
+        (i.e. the engine) takes care of storing the update, it is stored right away.
         :yields: None
         """
         self._update_fields = {}
         try:
             yield
-            task = self.model_task
             for key, value in self._update_fields.items():
-                setattr(task, key, value)
-            self.model_task = task
+                setattr(self._state, key, value)
         finally:
             self._update_fields = None
+        if not any(result for _, result in events.on_update_task_signal.send(self)):
+            store_tasks_state([self], self._workflow_context.model)
 
     @property
     def model_task(self):
@@ -177,10 +228,6 @@ class OperationTask(BaseTask):
         """
         return self._workflow_context.model.task.get(self._task_id)
 
-    @model_task.setter
-    def model_task(self, value):
-        self._workflow_context.model.task.put(value)
-
     @property
     def context(self):
         """
@@ -195,7 +242,7 @@ class OperationTask(BaseTask):
         Returns the task status
         :return: task status
         """
-        return self.model_task.status
+        return self._state.status
 
     @status.setter
     @_locked
@@ -208,7 +255,7 @@ class OperationTask(BaseTask):
         Returns when the task started
         :return: when task started
         """
-        return self.model_task.started_at
+        return self._state.started_at
 
     @started_at.setter
     @_locked
@@ -221,7 +268,7 @@ class OperationTask(BaseTask):
         Returns when the task ended
         :return: when task ended
         """
-        return self.model_task.ended_at
+        return self._state.ended_at
 
     @ended_at.setter
     @_locked
@@ -234,7 +281,7 @@ class OperationTask(BaseTask):
         Returns the retry count for the task
         :return: retry count
         """
-        return self.model_task.retry_count
+        return self._state.retry_count
 
     @retry_count.setter
     @_locked
@@ -247,15 +294,74 @@ class OperationTask(BaseTask):
         Returns the minimum datetime in which the task can be executed
         :return: eta
         """
-        return self.model_task.due_at
+        return self._state.due_at
 
     @due_at.setter
     @_locked
     def due_at(self, value):
         self._update_fields['due_at'] = value
 
+    def has_ended(self):
+        return self.status in (self.SUCCESS, self.FAILED)
+
+    def is_waiting(self):
+        return self.status in (self.PENDING, self.RETRYING)
+
     def __getattr__(self, attr):
+        if attr in self._STATIC_FIELDS:
+            return self._static_fields[attr]
+        if attr.startswith('__') or attr == 'im_func':
+            # Probed by signal dispatching (blinker), no reason to load the model for these
+            raise AttributeError(attr)
         try:
             return getattr(self.model_task, attr)
         except AttributeError:
             return super(OperationTask, self).__getattribute__(attr)
+
+
+def store_new_tasks(tasks, model_storage):
+    """
+    Stores the task models of new operation tasks in a single transaction, and loads them back
+    using a query per chunk of tasks
+    :param tasks: operation tasks which were created without being stored
+    :param model_storage: the model storage of the tasks
+    """
+    if not tasks:
+        return
+    execution = tasks[0]._workflow_context.execution
+    task_models = []
+    for task in tasks:
+        task._task_model.execution = execution
+        task_models.append(task._task_model)
+    model_storage.task.put_many(task_models)
+
+    if len(task_models) > 1:
+        # The commit expires the stored task models. Loading the tasks of the execution refreshes
+        # them in a few queries, rather than in a query per task
+        for _ in model_storage.task.iter(filters={'execution_fk': execution.id},
+                                         chunk_size=_LOAD_CHUNK_SIZE):
+            pass
+    for task, task_model in zip(tasks, task_models):
+        task._stored(task_model)
+
+
+def store_tasks_state(tasks, model_storage):
+    """
+    Writes the in-memory state of operation tasks to the storage, loading the task models using a
+    query per chunk of tasks and storing them in a single commit
+    :param tasks: operation tasks whose state should be stored
+    :param model_storage: the model storage of the tasks
+    """
+    tasks = dict((task._task_id, task) for task in tasks)
+    if not tasks:
+        return
+    task_ids = tasks.keys()
+    task_models = []
+    for index in range(0, len(task_ids), _MAX_FILTER_VALUES):
+        task_models.extend(model_storage.task.list(
+            filters={'id': task_ids[index:index + _MAX_FILTER_VALUES]}))
+    for task_model in task_models:
+        state = tasks[task_model.id]._state
+        for field in _TaskState.__slots__:
+            setattr(task_model, field, getattr(state, field))
+    model_storage.task.update_many(task_models)
@@ -17,9 +17,18 @@
 Translation of user graph's API to the execution graph
 """
 
+import networkx
+from sqlalchemy import extract, func, literal_column
+
+from ....modeling import models
 from .. import api
 from . import task as core_task
 
+# Assumed duration (in seconds) of operations that never ran before, if no operation ever ran
+_DEFAULT_OPERATION_DURATION = 1.0
+# Maximal number of values in a single "IN" filter (SQLite limits the number of query parameters)
+_MAX_FILTER_VALUES = 500
+
 
 def build_execution_graph(
         task_graph,
@@ -28,7 +37,8 @@ def build_execution_graph(
         end_cls=core_task.EndWorkflowTask,
         depends_on=()):
     """
-    Translates the user graph to the execution graph
+    Translates the user graph to the execution graph, and sets the priority of its tasks (see
+    ``set_priorities``)
     :param task_graph: The user's graph
     :param workflow_context: The workflow
     :param execution_graph: The execution graph that is being built
@@ -36,6 +46,87 @@ def build_execution_graph(
     :param end_cls: internal use
     :param depends_on: internal use
     """
+    # The operation tasks are created without being stored, and are then stored all at once
+    operation_tasks = []
+    _build_execution_graph(task_graph, execution_graph, start_cls, end_cls, depends_on,
+                           operation_tasks)
+    if operation_tasks:
+        core_task.store_new_tasks(operation_tasks, operation_tasks[0]._workflow_context.model)
+    set_priorities(execution_graph)
+
+
+def set_priorities(execution_graph):
+    """
+    Sets the priority of each task in the execution graph to the expected duration of the longest
+    path of tasks starting with it. Ready tasks are executed by priority, so tasks on the critical
+    path of the graph are executed first.
+
+    The expected duration of an operation is the average duration of its past successful
+    executions (on databases whose durations cannot be computed, all operations are expected to
+    take the same time).
+    """
+    tasks = [execution_graph.node[task_id]['task'] for task_id in execution_graph.nodes_iter()]
+    operation_tasks = [task for task in tasks if isinstance(task, core_task.OperationTask)]
+    durations = _get_operation_durations(operation_tasks)
+    default_duration = sum(durations.values()) / len(durations) if durations \
+        else _DEFAULT_OPERATION_DURATION
+    for task_id in reversed(networkx.topological_sort(execution_graph)):
+        task = execution_graph.node[task_id]['task']
+        if isinstance(task, core_task.OperationTask):
+            duration = durations.get(task.implementation, default_duration)
+        else:
+            duration = 0
+        task.priority = duration + max(
+            [execution_graph.node[successor_id]['task'].priority
+             for successor_id in execution_graph.successors(task_id)] or [0])
+
+
+def _get_operation_durations(operation_tasks):
+    """
+    :return: dict of the average duration (in seconds) of each of the tasks' operations, by
+             implementation
+    """
+    if not operation_tasks:
+        return {}
+    # The durations are averaged by the db, as the past tasks are many more than the graph's
+    session = operation_tasks[0].context.model.task._session
+    task_cls = models.Task
+    duration = _duration_in_seconds(session.get_bind().dialect.name,
+                                    task_cls.started_at, task_cls.ended_at)
+    if duration is None:
+        return {}
+    implementations = list(set(task.implementation for task in operation_tasks))
+    durations = {}
+    for index in range(0, len(implementations), _MAX_FILTER_VALUES):
+        query = session.query(task_cls.implementation, func.avg(duration)) \
+            .filter(task_cls.implementation.in_(implementations[index:index + _MAX_FILTER_VALUES]),
+                    task_cls.status == task_cls.SUCCESS,
+                    task_cls.started_at.isnot(None),
+                    task_cls.ended_at.isnot(None)) \
+            .group_by(task_cls.implementation)
+        durations.update((implementation, float(average_duration))
+                         for implementation, average_duration in query
+                         if average_duration is not None)
+    return durations
+
+
+def _duration_in_seconds(dialect_name, started_at, ended_at):
+    """
+    :return: the expression of the duration between the timestamps, or ``None`` if the dialect is
+             not supported
+    """
+    if dialect_name == 'sqlite':
+        # Timestamps are stored as strings
+        return (func.julianday(ended_at) - func.julianday(started_at)) * 86400.0
+    elif dialect_name == 'mysql':
+        return func.timestampdiff(literal_column('MICROSECOND'), started_at, ended_at) / 1000000.0
+    elif dialect_name == 'postgresql':
+        return extract('epoch', ended_at - started_at)
+    return None
+
+
+def _build_execution_graph(task_graph, execution_graph, start_cls, end_cls, depends_on,
+                           operation_tasks):
     # Insert start marker
     start_task = start_cls(id=_start_graph_suffix(task_graph.id))
     _add_task_and_dependencies(execution_graph, start_task, depends_on)
@@ -49,16 +140,18 @@ def build_execution_graph(
 
         if isinstance(api_task, api.task.OperationTask):
             # Add the task an the dependencies
-            operation_task = core_task.OperationTask(api_task)
+            operation_task = core_task.OperationTask(api_task, store=False)
+            operation_tasks.append(operation_task)
             _add_task_and_dependencies(execution_graph, operation_task, operation_dependencies)
         elif isinstance(api_task, api.task.WorkflowTask):
             # Build the graph recursively while adding start and end markers
-            build_execution_graph(
+            _build_execution_graph(
                 task_graph=api_task,
                 execution_graph=execution_graph,
                 start_cls=core_task.StartSubWorkflowTask,
                 end_cls=core_task.EndSubWorkflowTask,
-                depends_on=operation_dependencies
+                depends_on=operation_dependencies,
+                operation_tasks=operation_tasks
             )
         elif isinstance(api_task, api.task.StubTask):
             stub_task = core_task.StubTask(id=api_task.id)
@@ -19,4 +19,5 @@ Executors for task execution
 
 
 from . import process, thread
+from .admission import AdmissionController
 from .base import BaseExecutor
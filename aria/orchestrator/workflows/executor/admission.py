@@ -0,0 +1,209 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Admission control for executors
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import namedtuple
+
+
+AdmissionMetrics = namedtuple('AdmissionMetrics',
+                              'queue_depth, in_flight, admitted, total_wait_time, max_wait_time')
+
+
+class AdmissionController(object):
+    """
+    Bounds the number of tasks executed concurrently. Tasks submitted beyond the limits are queued,
+    and admitted by priority (higher first, see ``task.priority``) once running tasks end.
+
+    A single controller may be shared by several executors, in which case the limits apply to all
+    of their tasks together.
+
+    Tasks admitted once running tasks end are executed by a thread of the controller, rather than
+    by the thread that reported the end (e.g. the listener thread of an executor, which would
+    otherwise stop handling the messages of the other tasks in the meantime).
+    """
+
+    def __init__(self, max_tasks=None, max_tasks_per_plugin=None, max_tasks_per_host=None):
+        """
+        :param max_tasks: maximal number of tasks running at once
+        :param max_tasks_per_plugin: maximal number of tasks of the same plugin running at once
+        :param max_tasks_per_host: maximal number of tasks on the same host running at once
+        """
+        self._max_tasks = max_tasks
+        self._max_tasks_per_plugin = max_tasks_per_plugin
+        self._max_tasks_per_host = max_tasks_per_host
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._sequence = itertools.count()
+        # Heap of (-priority, sequence, _Entry) of the tasks waiting to be admitted
+        self._queue = []
+        self._in_flight = {}
+        self._plugins = {}
+        self._hosts = {}
+        self._admitted = 0
+        self._total_wait_time = 0.0
+        self._max_wait_time = 0.0
+        # Thread executing the tasks admitted by releases, while there are any
+        self._dispatcher = None
+        self._redispatch = False
+
+    def submit(self, task, execute):
+        """
+        Queues the task, ``execute(task)`` is called once it is admitted (possibly right away, or
+        later from the controller's thread)
+        """
+        entry = _Entry(task=task,
+                       execute=execute,
+                       plugin=getattr(task, 'plugin_fk', None)
+                       if self._max_tasks_per_plugin else None,
+                       host=_get_host(task) if self._max_tasks_per_host else None)
+        with self._lock:
+            heapq.heappush(self._queue,
+                           (-getattr(task, 'priority', 0), next(self._sequence), entry))
+        self._dispatch()
+
+    def release(self, task):
+        """
+        Frees the resources held by an ended task, and admits the queued tasks that can now run
+        """
+        with self._lock:
+            entry = self._in_flight.pop(task.id, None)
+            if entry is None:
+                return
+            _decrease(self._plugins, entry.plugin)
+            _decrease(self._hosts, entry.host)
+            if not self._queue or getattr(self._local, 'dispatching', False):
+                # Nothing to admit, or admitted by the dispatching loop of this thread
+                return
+            if self._dispatcher is not None:
+                self._redispatch = True
+            else:
+                self._dispatcher = threading.Thread(target=self._run_dispatcher,
+                                                    name='AdmissionController-dispatcher')
+                self._dispatcher.daemon = True
+                self._dispatcher.start()
+
+    def discard(self, execute):
+        """
+        Drops the queued tasks submitted with ``execute`` (e.g. when their executor is closed)
+        """
+        with self._lock:
+            self._queue = [item for item in self._queue if item[2].execute != execute]
+            heapq.heapify(self._queue)
+
+    def metrics(self):
+        """
+        :return: the current :class:`AdmissionMetrics`
+        """
+        with self._lock:
+            return AdmissionMetrics(queue_depth=len(self._queue),
+                                    in_flight=len(self._in_flight),
+                                    admitted=self._admitted,
+                                    total_wait_time=self._total_wait_time,
+                                    max_wait_time=self._max_wait_time)
+
+    def _dispatch(self):
+        # Executing a task may end it right away (and release it) in the same thread; the loop
+        # below takes care of the tasks admitted by such nested releases
+        if getattr(self._local, 'dispatching', False):
+            return
+        self._local.dispatching = True
+        try:
+            while True:
+                entry = self._admit_next()
+                if entry is None:
+                    return
+                entry.execute(entry.task)
+        finally:
+            self._local.dispatching = False
+
+    def _run_dispatcher(self):
+        while True:
+            self._dispatch()
+            with self._lock:
+                if not self._redispatch:
+                    self._dispatcher = None
+                    return
+                self._redispatch = False
+
+    def _admit_next(self):
+        with self._lock:
+            if self._max_tasks is not None and len(self._in_flight) >= self._max_tasks:
+                return None
+            skipped = []
+            admitted = None
+            while self._queue:
+                item = heapq.heappop(self._queue)
+                entry = item[2]
+                if self._is_allowed(entry):
+                    admitted = entry
+                    break
+                skipped.append(item)
+            for item in skipped:
+                heapq.heappush(self._queue, item)
+            if admitted is None:
+                return None
+
+            self._in_flight[admitted.task.id] = admitted
+            _increase(self._plugins, admitted.plugin)
+            _increase(self._hosts, admitted.host)
+            wait_time = time.time() - admitted.submitted_at
+            self._admitted += 1
+            self._total_wait_time += wait_time
+            self._max_wait_time = max(self._max_wait_time, wait_time)
+            return admitted
+
+    def _is_allowed(self, entry):
+        return _is_below(self._plugins, entry.plugin, self._max_tasks_per_plugin) and \
+            _is_below(self._hosts, entry.host, self._max_tasks_per_host)
+
+
+class _Entry(object):
+
+    def __init__(self, task, execute, plugin, host):
+        self.task = task
+        self.execute = execute
+        self.plugin = plugin
+        self.host = host
+        self.submitted_at = time.time()
+
+
+def _get_host(task):
+    actor = task.actor
+    # Relationship operations run on the host of the relationship's source node
+    node = getattr(actor, 'source_node', actor)
+    return getattr(node, 'host_fk', None)
+
+
+def _is_below(counts, key, limit):
+    return key is None or limit is None or counts.get(key, 0) < limit
+
+
+def _increase(counts, key):
+    if key is not None:
+        counts[key] = counts.get(key, 0) + 1
+
+
+def _decrease(counts, key):
+    if key is not None:
+        counts[key] -= 1
+        if not counts[key]:
+            del counts[key]
@@ -17,36 +17,70 @@
 Base executor module
 """
 
+import sys
+
 from aria import logger
 from aria.orchestrator import events
+from aria.utils import exceptions
+
+from .admission import AdmissionController
 
 
 class BaseExecutor(logger.LoggerMixin):
     """
     Base class for executors for running tasks
+
+    Tasks are executed (see ``_execute``) once admitted by the executor's admission controller,
+    which by default admits all tasks right away.
     """
 
+    def __init__(self, admission=None, *args, **kwargs):
+        """
+        :param admission: admission controller bounding the number of tasks executed concurrently;
+                          it may be shared by several executors
+        :type admission: :class:`~aria.orchestrator.workflows.executor.admission.AdmissionController`
+        """
+        super(BaseExecutor, self).__init__(*args, **kwargs)
+        self.admission = admission or AdmissionController()
+
     def execute(self, task):
         """
         Execute a task
         :param task: task to execute
         """
-        raise NotImplementedError
+        self.admission.submit(task, self._execute_admitted)
 
     def close(self):
         """
         Close the executor
         """
-        pass
+        self.admission.discard(self._execute_admitted)
+
+    def _execute(self, task):
+        """
+        Actually execute an admitted task
+        :param task: task to execute
+        """
+        raise NotImplementedError
+
+    def _execute_admitted(self, task):
+        try:
+            self._execute(task)
+        except BaseException as e:
+            self._task_failed(task,
+                              exception=e,
+                              traceback=exceptions.get_exception_as_string(*sys.exc_info()))
 
     @staticmethod
     def _task_started(task):
         events.start_task_signal.send(task)
 
-    @staticmethod
-    def _task_failed(task, exception, traceback=None):
+    def _task_failed(self, task, exception, traceback=None):
+        logger.flush_task_logs()
+        self.admission.release(task)
         events.on_failure_task_signal.send(task, exception=exception, traceback=traceback)
 
-    @staticmethod
-    def _task_succeeded(task):
+    def _task_succeeded(self, task):
+        logger.flush_task_logs()
+        self.admission.release(task)
         events.on_success_task_signal.send(task)
@@ -42,7 +42,7 @@ class CeleryExecutor(BaseExecutor):
         self._receiver_thread.start()
         self._started_queue.get(timeout=30)
 
-    def execute(self, task):
+    def _execute(self, task):
         self._tasks[task.id] = task
         inputs = dict(inp.unwrap() for inp in task.inputs.values())
         inputs['ctx'] = task.context
@@ -53,6 +53,7 @@ class CeleryExecutor(BaseExecutor):
             queue=self._get_queue(task))
 
     def close(self):
+        super(CeleryExecutor, self).close()
         self._stopped = True
         if self._receiver:
             self._receiver.should_stop = True
@@ -27,7 +27,7 @@ class DryExecutor(BaseExecutor):
     Executor which dry runs tasks - prints task information without causing any side effects
     """
 
-    def execute(self, task):
+    def _execute(self, task):
         # updating the task manually instead of calling self._task_started(task),
         # to avoid any side effects raising that event might cause
         with task._update():
@@ -50,6 +50,7 @@ class DryExecutor(BaseExecutor):
 
         # updating the task manually instead of calling self._task_succeeded(task),
         # to avoid any side effects raising that event might cause
+        self.admission.release(task)
         with task._update():
             task.ended_at = datetime.utcnow()
             task.status = task.SUCCESS
@@ -29,20 +29,26 @@ script_dir = os.path.dirname(__file__)
 if script_dir in sys.path:
     sys.path.remove(script_dir)
 
+import collections
 import contextlib
 import io
+import logging
+import select
 import threading
+import time
 import socket
 import struct
 import subprocess
-import tempfile
 import Queue
 import pickle
 
-import jsonpickle
+from sqlalchemy import event
 
 import aria
+from aria import logger as aria_logger
 from aria.orchestrator.workflows.executor import base
+from aria.orchestrator.workflows.executor import serialization
+from aria.orchestrator.workflows.exceptions import ExecutorException
 from aria.storage import instrumentation
 from aria.extension import process_executor
 from aria.utils import (
@@ -56,6 +62,13 @@ _IS_WIN = os.name == 'nt'
 
 _INT_FMT = 'I'
 _INT_SIZE = struct.calcsize(_INT_FMT)
+# Interval (in seconds) in which the listener checks for worker processes that died
+_WORKERS_CHECK_INTERVAL = 1
+_RECV_SIZE = 64 * 1024
+_extensions_installed = False
+# The model storages of a worker process, by their serialization dict. Tasks share them (and thus
+# their engines and connection pools) rather than each connecting to the storage anew
+_model_storages = {}
 UPDATE_TRACKED_CHANGES_FAILED_STR = \
     'Some changes failed writing to storage. For more info refer to the log.'
 
@@ -63,11 +76,29 @@ UPDATE_TRACKED_CHANGES_FAILED_STR = \
 class ProcessExecutor(base.BaseExecutor):
     """
     Executor which runs tasks in a subprocess environment
+
+    By default, each task runs in a new subprocess. When ``pool_size`` is set, tasks run in
+    long-lived worker processes instead, saving the interpreter startup time per task. Up to
+    ``pool_size`` workers are kept for each plugin (workers are never shared between plugins, as
+    the plugin determines the worker's environment). A worker is replaced after running
+    ``max_tasks_per_worker`` tasks, or when it dies.
+
+    Messages from the subprocesses are serialized with ``serializer`` (by default, a
+    :class:`~aria.orchestrator.workflows.executor.serialization.PickleSerializer`).
+
+    By default, the changes a task makes to the model are sent to the executor, which stores them
+    on the task's behalf. With ``direct_writes``, the subprocesses commit their changes to the
+    storage themselves, and concurrent modifications are detected by the models' version. This
+    requires a storage that can be written by several processes at once (e.g. one initiated with
+    :data:`~aria.storage.sql_mapi.CONCURRENT_WRITERS_PROFILE`).
     """
 
-    def __init__(self, plugin_manager=None, python_path=None, *args, **kwargs):
+    def __init__(self, plugin_manager=None, python_path=None, pool_size=None,
+                 max_tasks_per_worker=100, serializer=None, direct_writes=False, *args, **kwargs):
         super(ProcessExecutor, self).__init__(*args, **kwargs)
         self._plugin_manager = plugin_manager
+        self._serializer = serializer or serialization.PickleSerializer()
+        self._direct_writes = direct_writes
 
         # Optional list of additional directories that should be added to
         # subprocesses python path
@@ -83,7 +114,8 @@ class ProcessExecutor(base.BaseExecutor):
             'started': self._handle_task_started_request,
             'succeeded': self._handle_task_succeeded_request,
             'failed': self._handle_task_failed_request,
-            'apply_tracked_changes': self._handle_apply_tracked_changes_request
+            'apply_tracked_changes': self._handle_apply_tracked_changes_request,
+            'logs_stored': self._handle_logs_stored_request
         }
 
         # Server socket used to accept task status messages from subprocesses
@@ -92,8 +124,14 @@ class ProcessExecutor(base.BaseExecutor):
         self._server_socket.listen(10)
         self._server_port = self._server_socket.getsockname()[1]
 
+        # Optional pool of long-lived worker processes
+        self._pool = None
+        if pool_size:
+            self._pool = _WorkerPool(size=pool_size, max_tasks_per_worker=max_tasks_per_worker)
+
         # Used to send a "closed" message to the listener when this executor is closed
-        self._messenger = _Messenger(task_id=None, port=self._server_port)
+        self._messenger = _Messenger(task_id=None, port=self._server_port,
+                                     serializer=self._serializer)
 
         # Queue object used by the listener thread to notify this constructed it has started
         # (see last line of this __init__ method)
@@ -110,22 +148,23 @@ class ProcessExecutor(base.BaseExecutor):
     def close(self):
         if self._stopped:
             return
+        super(ProcessExecutor, self).close()
         self._stopped = True
-        # Listener thread may be blocked on "accept" call. This will wake it up with an explicit
-        # "closed" message
+        # Listener thread may be blocked waiting for messages. This will wake it up with an
+        # explicit "closed" message
         self._messenger.closed()
         self._server_socket.close()
         self._listener_thread.join(timeout=60)
+        if self._pool:
+            self._pool.close()
 
     def execute(self, task):
         self._check_closed()
-        self._tasks[task.id] = task
+        super(ProcessExecutor, self).execute(task)
 
-        # Temporary file used to pass arguments to the started subprocess
-        file_descriptor, arguments_json_path = tempfile.mkstemp(prefix='executor-', suffix='.json')
-        os.close(file_descriptor)
-        with open(arguments_json_path, 'wb') as f:
-            f.write(pickle.dumps(self._create_arguments_dict(task)))
+    def _execute(self, task):
+        self._check_closed()
+        self._tasks[task.id] = task
 
         env = os.environ.copy()
         # See _update_env for plugin_prefix usage
@@ -134,11 +173,19 @@ class ProcessExecutor(base.BaseExecutor):
         else:
             plugin_prefix = None
         self._update_env(env=env, plugin_prefix=plugin_prefix)
-        # Asynchronously start the operation in a subprocess
-        subprocess.Popen(
-            '{0} {1} {2}'.format(sys.executable, __file__, arguments_json_path),
-            env=env,
-            shell=True)
+
+        if self._pool:
+            self._pool.submit(key=plugin_prefix,
+                              env=env,
+                              task_id=task.id,
+                              arguments=self._create_arguments_dict(task))
+            return
+
+        # Asynchronously start the operation in a subprocess. The arguments are passed through the
+        # subprocess input, which is then closed, so it exits once the task ends
+        process = subprocess.Popen([sys.executable, __file__], env=env, stdin=subprocess.PIPE)
+        _write_message(process.stdin, self._create_arguments_dict(task))
+        process.stdin.close()
 
     def _remove_task(self, task_id):
         return self._tasks.pop(task_id)
@@ -154,6 +201,8 @@ class ProcessExecutor(base.BaseExecutor):
             'operation_inputs': dict(inp.unwrap() for inp in task.inputs.values()),
             'port': self._server_port,
             'context': task.context.serialization_dict,
+            'serializer': self._serializer,
+            'direct_writes': self._direct_writes,
         }
 
     def _update_env(self, env, plugin_prefix):
@@ -194,12 +243,58 @@ class ProcessExecutor(base.BaseExecutor):
     def _listener(self):
         # Notify __init__ method this thread has actually started
         self._listener_started.put(True)
-        while not self._stopped:
-            try:
-                with self._accept_request() as (request, response):
-                    request_type = request['type']
-                    if request_type == 'closed':
+        # Each subprocess holds a single connection for all its messages. All the connections are
+        # served by this thread
+        connections = {}
+        last_workers_check = time.time()
+        self._listener_stopped = False
+        try:
+            while not self._listener_stopped:
+                readable, _, _ = select.select(
+                    [self._server_socket] + connections.keys(), [], [],
+                    _WORKERS_CHECK_INTERVAL if self._pool else None)
+                for sock in readable:
+                    if sock is self._server_socket:
+                        connection = self._server_socket.accept()[0]
+                        connections[connection] = _MessageReader()
+                    elif not self._serve_connection(sock, connections[sock]):
+                        del connections[sock]
+                        sock.close()
+                    if self._listener_stopped:
                         break
+                if self._pool and time.time() - last_workers_check >= _WORKERS_CHECK_INTERVAL:
+                    self._handle_dead_workers()
+                    last_workers_check = time.time()
+        finally:
+            for connection in connections:
+                connection.close()
+
+    def _serve_connection(self, connection, reader):
+        """
+        Handles all the complete messages received on the connection
+        :return: False if the connection was closed
+        """
+        try:
+            data = connection.recv(_RECV_SIZE)
+        except socket.error:
+            data = None
+        if not data:
+            return False
+        for message in reader.feed(data):
+            response = {}
+            try:
+                # A message that cannot be read (e.g. an exception the executor cannot import) is
+                # answered with an error, rather than breaking the connections of all the tasks
+                try:
+                    request = self._serializer.loads(message)
+                except BaseException as e:
+                    response['exception'] = ExecutorException(
+                        'Invalid message from the task process: {0}'.format(e))
+                    raise
+                request_type = request['type']
+                if request_type == 'closed':
+                    self._listener_stopped = True
+                else:
                     request_handler = self._request_handlers.get(request_type)
                     if not request_handler:
                         raise RuntimeError('Invalid request type: {0}'.format(request_type))
@@ -207,19 +302,26 @@ class ProcessExecutor(base.BaseExecutor):
                     request_handler(task_id=task_id, request=request, response=response)
             except BaseException as e:
                 self.logger.debug('Error in process executor listener: {0}'.format(e))
-
-    @contextlib.contextmanager
-    def _accept_request(self):
-        with contextlib.closing(self._server_socket.accept()[0]) as connection:
-            message = _recv_message(connection)
-            response = {}
-            yield message, response
-            _send_message(connection, response)
+            _send_message(connection, response, self._serializer)
+        return True
 
     def _handle_task_started_request(self, task_id, **kwargs):
         self._task_started(self._tasks[task_id])
 
+    def _handle_dead_workers(self):
+        for task_id, return_code in self._pool.reap():
+            self._task_failed(
+                self._remove_task(task_id),
+                exception=ExecutorException(
+                    'Worker process running the task exited unexpectedly '
+                    '(exit code: {0})'.format(return_code)))
+
+    def _release_worker(self, task_id):
+        if self._pool:
+            self._pool.task_done(task_id)
+
     def _handle_task_succeeded_request(self, task_id, request, **kwargs):
+        self._release_worker(task_id)
         task = self._remove_task(task_id)
         try:
             self._apply_tracked_changes(task, request)
@@ -230,23 +332,30 @@ class ProcessExecutor(base.BaseExecutor):
             self._task_succeeded(task)
 
     def _handle_task_failed_request(self, task_id, request, **kwargs):
+        self._release_worker(task_id)
         task = self._remove_task(task_id)
+        exception = exceptions.load_exception(request['exception'], self._serializer)
         try:
             self._apply_tracked_changes(task, request)
         except BaseException as e:
-            e.message += 'Task failed due to {0}.'.format(request['exception']) + \
+            e.message += 'Task failed due to {0}.'.format(exception) + \
                          UPDATE_TRACKED_CHANGES_FAILED_STR
             self._task_failed(
                 task, exception=e, traceback=exceptions.get_exception_as_string(*sys.exc_info()))
         else:
-            self._task_failed(task, exception=request['exception'], traceback=request['traceback'])
+            self._task_failed(task, exception=exception, traceback=request['traceback'])
 
     def _handle_apply_tracked_changes_request(self, task_id, request, response):
         task = self._tasks[task_id]
         try:
             self._apply_tracked_changes(task, request)
         except BaseException as e:
-            response['exception'] = exceptions.wrap_if_needed(e)
+            response['exception'] = exceptions.wrap_if_needed(e, self._serializer)
+
+    @staticmethod
+    def _handle_logs_stored_request(request, **kwargs):
+        # Relayed by the subprocesses, which store the logs of their tasks themselves
+        aria_logger.logs_stored_signal.send(request['execution_id'])
 
     @staticmethod
     def _apply_tracked_changes(task, request):
@@ -255,27 +364,188 @@ class ProcessExecutor(base.BaseExecutor):
             model=task.context.model)
 
 
-def _send_message(connection, message):
+class _WorkerPool(object):
+    """
+    Long-lived worker processes, grouped by a key which determines their environment. Each worker
+    runs a single task at a time.
+    """
 
-    # Packing the length of the entire msg using struct.pack.
-    # This enables later reading of the content.
-    def _pack(data):
-        return struct.pack(_INT_FMT, len(data))
+    def __init__(self, size, max_tasks_per_worker):
+        self._size = size
+        self._max_tasks_per_worker = max_tasks_per_worker
+        self._lock = threading.RLock()
+        # key -> live workers (either idle or running a task)
+        self._workers = {}
+        # key -> idle workers
+        self._idle = {}
+        # key -> (task_id, arguments, env) of tasks waiting for a worker
+        self._pending = {}
+        # task_id -> the worker running it
+        self._running = {}
+        # workers that were asked to stop, kept until they exit
+        self._retired = []
+
+    def submit(self, key, env, task_id, arguments):
+        with self._lock:
+            self._pending.setdefault(key, collections.deque()).append((task_id, arguments, env))
+            self._dispatch(key)
+
+    def task_done(self, task_id):
+        with self._lock:
+            worker = self._running.pop(task_id, None)
+            if worker is None:
+                return
+            worker.tasks_count += 1
+            if self._max_tasks_per_worker and \
+                    worker.tasks_count >= self._max_tasks_per_worker:
+                self._retire(worker)
+            else:
+                self._idle.setdefault(worker.key, []).append(worker)
+            self._dispatch(worker.key)
+
+    def reap(self):
+        """
+        Removes workers that died
+        :return: list of (task_id, return_code) of the tasks the dead workers were running
+        """
+        with self._lock:
+            orphaned_tasks = []
+            for task_id, worker in self._running.items():
+                return_code = worker.poll()
+                if return_code is not None:
+                    del self._running[task_id]
+                    self._workers[worker.key].discard(worker)
+                    orphaned_tasks.append((task_id, return_code))
+            for key, workers in self._idle.items():
+                for worker in [w for w in workers if w.poll() is not None]:
+                    workers.remove(worker)
+                    self._workers[key].discard(worker)
+            self._retired = [w for w in self._retired if w.poll() is None]
+            for key in self._pending.keys():
+                self._dispatch(key)
+            return orphaned_tasks
 
-    data = jsonpickle.dumps(message)
-    msg_metadata = _pack(data)
-    connection.send(msg_metadata)
-    connection.sendall(data)
+    def close(self):
+        with self._lock:
+            for workers in self._workers.values():
+                for worker in workers:
+                    worker.stop()
+            self._workers.clear()
+            self._idle.clear()
+
+    def _dispatch(self, key):
+        pending = self._pending.get(key)
+        while pending:
+            task_id, arguments, env = pending[0]
+            worker = self._acquire(key, env)
+            if worker is None:
+                # All the workers of this key are busy
+                return
+            pending.popleft()
+            self._running[task_id] = worker
+            worker.send(arguments)
+
+    def _acquire(self, key, env):
+        idle = self._idle.get(key)
+        if idle:
+            return idle.pop()
+        workers = self._workers.setdefault(key, set())
+        if len(workers) < self._size:
+            worker = _Worker(key=key, env=env)
+            workers.add(worker)
+            return worker
+        return None
+
+    def _retire(self, worker):
+        self._workers[worker.key].discard(worker)
+        worker.stop()
+        self._retired.append(worker)
+
+
+class _Worker(object):
+    """
+    A worker process. The process is started, and the arguments of its tasks are written to its
+    input, by a thread of the worker, so the pool (and the executor's listener) never waits for the
+    process to read them.
+    """
 
+    def __init__(self, key, env):
+        self.key = key
+        self.tasks_count = 0
+        self._env = env
+        self._process = None
+        self._start_failed = False
+        # Arguments of the tasks to send to the process, and None once it should stop
+        self._messages = Queue.Queue()
+        self._writer_thread = threading.Thread(target=self._writer)
+        self._writer_thread.daemon = True
+        self._writer_thread.start()
+
+    def send(self, arguments):
+        """Send a task's arguments to the worker"""
+        self._messages.put(arguments)
+
+    def stop(self):
+        """The worker exits once its input is closed (after finishing its current task)"""
+        self._messages.put(None)
+
+    def poll(self):
+        """
+        :return: the exit code of the process, or None if it is still starting or running
+        """
+        if self._start_failed:
+            # As a shell does for commands it cannot run
+            return 127
+        return None if self._process is None else self._process.poll()
+
+    def _writer(self):
+        try:
+            self._process = subprocess.Popen([sys.executable, __file__],
+                                             env=self._env,
+                                             stdin=subprocess.PIPE)
+        except (IOError, OSError):
+            # The pool's reap() will fail the worker's task
+            self._start_failed = True
+            return
+        try:
+            for arguments in iter(self._messages.get, None):
+                _write_message(self._process.stdin, arguments)
+            self._process.stdin.close()
+        except (IOError, OSError):
+            # The process died; the pool's reap() will fail its task
+            pass
 
-def _recv_message(connection):
+
+def _write_message(stream, message):
+    data = pickle.dumps(message, pickle.HIGHEST_PROTOCOL)
+    stream.write(struct.pack(_INT_FMT, len(data)))
+    stream.write(data)
+    stream.flush()
+
+
+def _read_message(stream):
+    """Returns None once the stream is closed"""
+    length = stream.read(_INT_SIZE)
+    if len(length) < _INT_SIZE:
+        return None
+    return pickle.loads(stream.read(struct.unpack(_INT_FMT, length)[0]))
+
+
+def _send_message(connection, message, serializer):
+    data = serializer.dumps(message)
+    # The length of the message is packed in front of it, so it can later be read in full. Both
+    # are sent together as a single write
+    connection.sendall(struct.pack(_INT_FMT, len(data)) + data)
+
+
+def _recv_message(connection, serializer):
     # Retrieving the length of the msg to come.
     def _unpack(conn):
         return struct.unpack(_INT_FMT, _recv_bytes(conn, _INT_SIZE))[0]
 
     msg_metadata_len = _unpack(connection)
     msg = _recv_bytes(connection, msg_metadata_len)
-    return jsonpickle.loads(msg)
+    return serializer.loads(msg)
 
 
 def _recv_bytes(connection, count):
@@ -290,11 +560,49 @@ def _recv_bytes(connection, count):
         count -= len(read)
 
 
+class _MessageReader(object):
+    """
+    Collects the data received on a connection, and extracts the complete (serialized) messages
+    out of it
+    """
+
+    def __init__(self):
+        self._buffer = ''
+
+    def feed(self, data):
+        """
+        :return: list of the serialized messages completed by the new data
+        """
+        self._buffer += data
+        messages = []
+        while len(self._buffer) >= _INT_SIZE:
+            length = struct.unpack(_INT_FMT, self._buffer[:_INT_SIZE])[0]
+            if len(self._buffer) < _INT_SIZE + length:
+                break
+            messages.append(self._buffer[_INT_SIZE:_INT_SIZE + length])
+            self._buffer = self._buffer[_INT_SIZE + length:]
+        return messages
+
+
+def _connect(port):
+    connection = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    # Messages are small and each one waits for a response, so they should not be delayed
+    connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    connection.connect(('localhost', port))
+    return connection
+
+
 class _Messenger(object):
 
-    def __init__(self, task_id, port):
+    def __init__(self, task_id, port, serializer, connection=None):
+        """
+        :param connection: connection to the executor; if not provided, one is created on the
+                           first message. Either way, it is used for all the messages
+        """
         self.task_id = task_id
         self.port = port
+        self.serializer = serializer
+        self.connection = connection
 
     def started(self):
         """Task started message"""
@@ -302,36 +610,59 @@ class _Messenger(object):
 
     def succeeded(self, tracked_changes):
         """Task succeeded message"""
+        # The logs of the task are stored before it is reported as ended
+        aria_logger.flush_task_logs()
         self._send_message(type='succeeded', tracked_changes=tracked_changes)
 
     def failed(self, tracked_changes, exception):
         """Task failed message"""
-        self._send_message(type='failed', tracked_changes=tracked_changes, exception=exception)
+        aria_logger.flush_task_logs()
+        try:
+            self._send_message(type='failed', tracked_changes=tracked_changes, exception=exception)
+        except ExecutorException as e:
+            # The executor could not read the message, so the failure is reported without the
+            # parts it might have choked on
+            self._send_message(type='failed', exception=ExecutorException(
+                '{0}: {1} (could not be reported: {2})'.format(
+                    type(exception).__name__, exception, e)))
 
     def apply_tracked_changes(self, tracked_changes):
         self._send_message(type='apply_tracked_changes', tracked_changes=tracked_changes)
 
+    def logs_stored(self, execution_id):
+        """Logs of the execution stored message"""
+        self._send_message(type='logs_stored', execution_id=execution_id)
+
     def closed(self):
         """Executor closed message"""
-        self._send_message(type='closed')
-
-    def _send_message(self, type, tracked_changes=None, exception=None):
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.connect(('localhost', self.port))
         try:
-            _send_message(sock, {
-                'type': type,
-                'task_id': self.task_id,
-                'exception': exceptions.wrap_if_needed(exception),
-                'traceback': exceptions.get_exception_as_string(*sys.exc_info()),
-                'tracked_changes': tracked_changes
-            })
-            response = _recv_message(sock)
-            response_exception = response.get('exception')
-            if response_exception:
-                raise response_exception
+            self._send_message(type='closed')
         finally:
-            sock.close()
+            self.close()
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def _send_message(self, type, tracked_changes=None, exception=None, **kwargs):
+        if self.connection is None:
+            self.connection = _connect(self.port)
+        _send_message(self.connection, dict(
+            type=type,
+            task_id=self.task_id,
+            # The exception is serialized on its own, so that an exception the executor cannot
+            # deserialize (e.g. of a module only the plugin's python path has) is wrapped instead
+            exception=exceptions.dump_exception(exception, self.serializer)
+            if exception is not None else None,
+            traceback=exceptions.get_exception_as_string(*sys.exc_info()),
+            tracked_changes=instrumentation.diff_tracked_changes(tracked_changes or {}),
+            **kwargs
+        ), self.serializer)
+        response = _recv_message(self.connection, self.serializer)
+        response_exception = response.get('exception')
+        if response_exception:
+            raise response_exception
 
 
 def _patch_session(ctx, messenger, instrument):
@@ -366,41 +697,180 @@ def _patch_session(ctx, messenger, instrument):
     session.refresh = patched_refresh
 
 
-def _main():
-    arguments_json_path = sys.argv[1]
-    with open(arguments_json_path) as f:
-        arguments = pickle.loads(f.read())
-
-    # arguments_json_path is a temporary file created by the parent process.
-    # so we remove it here
-    os.remove(arguments_json_path)
-
+def _execute(arguments, connection):
     task_id = arguments['task_id']
-    port = arguments['port']
-    messenger = _Messenger(task_id=task_id, port=port)
+    messenger = _Messenger(task_id=task_id,
+                           port=arguments['port'],
+                           serializer=arguments['serializer'],
+                           connection=connection)
     messenger.started()
 
     implementation = arguments['implementation']
     operation_inputs = arguments['operation_inputs']
     context_dict = arguments['context']
 
-    # This is required for the instrumentation work properly.
-    # See docstring of `remove_mutable_association_listener` for further details
-    modeling_types.remove_mutable_association_listener()
+    if arguments['direct_writes']:
+        _execute_with_direct_writes(messenger, implementation, operation_inputs, context_dict)
+        return
 
     with instrumentation.track_changes() as instrument:
         try:
-            ctx = context_dict['context_cls'].deserialize_from_dict(**context_dict['context'])
+            ctx = _deserialize_context(context_dict)
             _patch_session(ctx=ctx, messenger=messenger, instrument=instrument)
-            task_func = imports.load_attribute(implementation)
-            aria.install_aria_extensions()
-            for decorate in process_executor.decorate():
-                task_func = decorate(task_func)
+            task_func = _load_task_func(implementation)
             task_func(ctx=ctx, **operation_inputs)
             messenger.succeeded(tracked_changes=instrument.tracked_changes)
         except BaseException as e:
             messenger.failed(exception=e, tracked_changes=instrument.tracked_changes)
 
 
+def _execute_with_direct_writes(messenger, implementation, operation_inputs, context_dict):
+    try:
+        ctx = _deserialize_context(context_dict)
+        with _keep_loaded_instances(ctx):
+            task_func = _load_task_func(implementation)
+            try:
+                task_func(ctx=ctx, **operation_inputs)
+            except BaseException:
+                # The changes made before the task failed are stored as well (as they would have
+                # been by the executor), but the task's own failure is the one reported
+                exc_info = sys.exc_info()
+                try:
+                    _commit(ctx)
+                except BaseException:
+                    pass
+                raise exc_info[0], exc_info[1], exc_info[2]
+            _commit(ctx)
+        messenger.succeeded(tracked_changes=None)
+    except BaseException as e:
+        messenger.failed(exception=e, tracked_changes=None)
+
+
+def _deserialize_context(context_dict):
+    kwargs = dict(context_dict['context'])
+    if kwargs.get('model_storage'):
+        kwargs['model_storage'] = _get_model_storage(kwargs['model_storage'])
+    return context_dict['context_cls'].deserialize_from_dict(**kwargs)
+
+
+def _get_model_storage(serialization_dict):
+    key = repr(sorted(serialization_dict.items()))
+    model_storage = _model_storages.get(key)
+    if model_storage is None:
+        model_storage = aria.application_model_storage(**serialization_dict)
+        _model_storages[key] = model_storage
+    return model_storage
+
+
+def _reset_model_storages():
+    # The next task starts with a new session, which holds none of the instances (or session
+    # patches) of the previous one
+    for model_storage in _model_storages.values():
+        session = model_storage.node._session
+        for name in ('commit', 'rollback', 'refresh'):
+            vars(session).pop(name, None)
+        session.remove()
+
+
+def _close_model_storages():
+    _reset_model_storages()
+    for model_storage in _model_storages.values():
+        model_storage.node._engine.dispose()
+    _model_storages.clear()
+
+
+@contextlib.contextmanager
+def _keep_loaded_instances(ctx):
+    # The changes of mutable attributes (e.g. ``ctx.node.runtime_properties[key] = value``) are
+    # only recorded as long as their instance is referenced, while the session only keeps weak
+    # references to unmodified instances. The loaded instances are referenced until committed.
+    # model will be None only in tests that test the executor component directly
+    if not ctx.model:
+        yield
+        return
+    session = ctx.model.node._session
+    instances = []
+
+    def keep(_, instance):
+        instances.append(instance)
+
+    event.listen(session, 'loaded_as_persistent', keep)
+    try:
+        yield
+    finally:
+        event.remove(session, 'loaded_as_persistent', keep)
+
+
+def _commit(ctx):
+    # model will be None only in tests that test the executor component directly
+    if ctx.model:
+        # All the mapis share the same session. A modification of a stale instance is reported as a
+        # version conflict
+        ctx.model.node._safe_commit()
+
+
+def _load_task_func(implementation):
+    task_func = imports.load_attribute(implementation)
+    _install_aria_extensions()
+    for decorate in process_executor.decorate():
+        task_func = decorate(task_func)
+    return task_func
+
+
+def _install_aria_extensions():
+    # Worker processes run many tasks, but extensions may only be installed once per process
+    global _extensions_installed                                                                   # pylint: disable=global-statement
+    if not _extensions_installed:
+        aria.install_aria_extensions()
+        _extensions_installed = True
+
+
+def _reset_task_logger():
+    # Operation contexts add a storage log handler to the task logger (bound to the execution
+    # of the task), which should not be used by the next task the worker runs
+    task_logger = logging.getLogger(aria_logger.TASK_LOGGER_NAME)
+    for handler in task_logger.handlers[:]:
+        task_logger.removeHandler(handler)
+        handler.close()
+
+
+def _relay_stored_logs(port, serializer):
+    # Logs are stored by the handler's background thread, which needs a connection of its own
+    messenger = _Messenger(task_id=None, port=port, serializer=serializer)
+
+    def relay(execution_id):
+        messenger.logs_stored(execution_id)
+
+    aria_logger.logs_stored_signal.connect(relay, weak=False)
+
+
+def _main():
+    if _IS_WIN:
+        import msvcrt
+        msvcrt.setmode(sys.stdin.fileno(), os.O_BINARY)
+
+    # The subprocess' tasks are all sent by the same executor, and share a connection to it
+    connection = None
+    # Tasks are read from stdin until the parent process closes it
+    arguments = _read_message(sys.stdin)
+    if arguments is not None and not arguments['direct_writes']:
+        # This is required for the instrumentation work properly.
+        # See docstring of `remove_mutable_association_listener` for further details
+        modeling_types.remove_mutable_association_listener()
+    while arguments is not None:
+        if connection is None:
+            connection = _connect(arguments['port'])
+            _relay_stored_logs(arguments['port'], arguments['serializer'])
+        try:
+            _execute(arguments, connection)
+        finally:
+            _reset_task_logger()
+            _reset_model_storages()
+        arguments = _read_message(sys.stdin)
+    _close_model_storages()
+    if connection is not None:
+        connection.close()
+
+
 if __name__ == '__main__':
     _main()
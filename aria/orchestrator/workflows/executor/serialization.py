@@ -0,0 +1,119 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Serializers for the messages passed between executors and the processes running their tasks
+"""
+
+import cPickle
+import pickle
+import sys
+from cStringIO import StringIO
+
+import jsonpickle
+
+
+class Serializer(object):
+    """
+    Base class for message serializers. Serializers are sent to the subprocesses along with the
+    tasks, so they must be picklable
+    """
+
+    def dumps(self, message):
+        """
+        :return: the message serialized to a string
+        """
+        raise NotImplementedError
+
+    def loads(self, data):
+        """
+        :return: the message deserialized from the string
+        """
+        raise NotImplementedError
+
+
+class JsonPickleSerializer(Serializer):
+    """
+    Serializes messages to JSON
+    """
+
+    def dumps(self, message):
+        return jsonpickle.dumps(message)
+
+    def loads(self, data):
+        return jsonpickle.loads(data)
+
+
+class PickleSerializer(Serializer):
+    """
+    Serializes messages using the binary pickle protocol. Only builtin values, the explicitly
+    allowed classes and the exceptions of the allowed or already imported modules are restored,
+    so a message cannot import arbitrary modules or call arbitrary code
+    """
+
+    ALLOWED_CLASSES = frozenset([
+        ('__builtin__', 'object'),
+        ('__builtin__', 'set'),
+        ('__builtin__', 'frozenset'),
+        ('collections', 'OrderedDict'),
+        ('datetime', 'date'),
+        ('datetime', 'datetime'),
+        ('datetime', 'time'),
+        ('datetime', 'timedelta'),
+        ('aria.storage.instrumentation', '_Value'),
+        ('aria.storage.instrumentation', '_Patch'),
+    ])
+
+    ALLOWED_EXCEPTION_MODULES = frozenset(['exceptions', 'aria'])
+
+    def __init__(self, allowed_classes=None, allowed_exception_modules=None):
+        """
+        :param allowed_classes: (module, name) pairs of classes allowed on top of the defaults
+        :param allowed_exception_modules: modules (along with their submodules) whose exceptions
+                                          are allowed on top of the defaults
+        """
+        self._allowed_classes = self.ALLOWED_CLASSES.union(allowed_classes or ())
+        self._allowed_exception_modules = \
+            self.ALLOWED_EXCEPTION_MODULES.union(allowed_exception_modules or ())
+
+    def dumps(self, message):
+        return cPickle.dumps(message, protocol=2)
+
+    def loads(self, data):
+        unpickler = cPickle.Unpickler(StringIO(data))
+        unpickler.find_global = self._find_class
+        return unpickler.load()
+
+    def _find_class(self, module_name, name):
+        # Nothing is imported before the module is known to be allowed
+        if (module_name, name) in self._allowed_classes:
+            return getattr(__import__(module_name, fromlist=[name]), name)
+        module = sys.modules.get(module_name)
+        if module is None and self._is_exception_module(module_name):
+            module = __import__(module_name, fromlist=[name])
+        cls = getattr(module, name, None)
+        if isinstance(cls, type) and issubclass(cls, BaseException):
+            return cls
+        raise pickle.UnpicklingError('{0}.{1} is not allowed in executor messages'
+                                     .format(module_name, name))
+
+    def _is_exception_module(self, module_name):
+        package_name = module_name
+        while True:
+            if package_name in self._allowed_exception_modules:
+                return True
+            if '.' not in package_name:
+                return False
+            package_name = package_name.rsplit('.', 1)[0]
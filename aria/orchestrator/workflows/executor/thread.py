@@ -24,6 +24,7 @@ import sys
 
 from aria.utils import imports, exceptions
 
+from .admission import AdmissionController
 from .base import BaseExecutor
 
 
@@ -32,10 +33,14 @@ class ThreadExecutor(BaseExecutor):
     Executor which runs tasks in a separate thread. It's easier writing tests
     using this executor rather than the full blown subprocess executor.
     Note: This executor is not capable of running plugin operations.
+
+    Unless given an admission controller, tasks are admitted up to the number of threads, so the
+    queued tasks are prioritized by the controller.
     """
 
-    def __init__(self, pool_size=1, *args, **kwargs):
-        super(ThreadExecutor, self).__init__(*args, **kwargs)
+    def __init__(self, pool_size=1, admission=None, *args, **kwargs):
+        super(ThreadExecutor, self).__init__(
+            admission=admission or AdmissionController(max_tasks=pool_size), *args, **kwargs)
         self._stopped = False
         self._queue = Queue.Queue()
         self._pool = []
@@ -46,10 +51,11 @@ class ThreadExecutor(BaseExecutor):
             thread.start()
             self._pool.append(thread)
 
-    def execute(self, task):
+    def _execute(self, task):
         self._queue.put(task)
 
     def close(self):
+        super(ThreadExecutor, self).close()
         self._stopped = True
         for thread in self._pool:
             thread.join()
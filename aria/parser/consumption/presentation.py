@@ -14,12 +14,18 @@
 # limitations under the License.
 
 
+import multiprocessing
+
+from ...exceptions import AriaException
 from ...utils.threading import FixedThreadPoolExecutor
 from ...utils.formatting import json_dumps, yaml_dumps
+from ...utils.openclose import OpenClose
+from ...utils.uris import as_file
 from ..loading import UriLocation
 from ..reading import AlreadyReadException
 from ..presentation import PresenterNotFoundError
 from .consumer import Consumer
+from .context import ConsumptionContext
 
 
 class Read(Consumer):
@@ -32,12 +38,22 @@ class Read(Consumer):
     It supports agnostic raw data composition for presenters that have
     :code:`_get_import_locations` and :code:`_merge_import`.
 
-    To improve performance, loaders are called asynchronously on separate threads.
+    To improve performance, loaders are called asynchronously on separate threads. Moreover, the
+    imports that presenters list in :code:`_get_profile_locations` are presented along with their
+    own imports, and cached in the context's presentation cache for the following parses.
+
+    Optionally, imports can be read and presented in a pool of processes instead (see the
+    :code:`processes` of the presentation context), in order to make use of multiple cores. The
+    threads then only wait for the processes and merge their presentations.
 
     Note that parsing may internally trigger more than one loading/reading/presentation
     cycle, for example if the agnostic raw data has dependencies that must also be parsed.
     """
 
+    def __init__(self, context):
+        super(Read, self).__init__(context)
+        self._pool = None
+
     def consume(self):
         if self.context.presentation.location is None:
             self.context.validation.report('Presentation consumer: missing location')
@@ -46,6 +62,9 @@ class Read(Consumer):
         presenter = None
         imported_presentations = None
 
+        if self.context.presentation.processes and (self.context.reading.reader is None):
+            # Forked before the threads are started
+            self._pool = multiprocessing.Pool(self.context.presentation.processes)
         executor = FixedThreadPoolExecutor(size=self.context.presentation.threads,
                                            timeout=self.context.presentation.timeout)
         executor.print_exceptions = self.context.presentation.print_exceptions
@@ -60,6 +79,10 @@ class Read(Consumer):
             imported_presentations = executor.returns
         finally:
             executor.close()
+            if self._pool is not None:
+                self._pool.close()
+                self._pool.join()
+                self._pool = None
 
         # Merge imports
         if (imported_presentations is not None) and hasattr(presenter, '_merge_import'):
@@ -93,7 +116,95 @@ class Read(Consumer):
         # Link the context to this thread
         self.context.set_thread_local()
 
-        raw = self._read(location, origin_location)
+        if (self._pool is not None) and (origin_location is not None):
+            presentation = self._present_in_pool(location, origin_location, presenter_class)
+        else:
+            presentation = self._present_document(location, origin_location, presenter_class)
+        self._submit_imports(presentation, location, executor)
+        return presentation
+
+    def _present_in_pool(self, location, origin_location, presenter_class):
+        sources = (self.context.loading.loader_source,
+                   list(self.context.loading.prefixes),
+                   self.context.loading.import_store,
+                   self.context.loading.import_lock,
+                   self.context.reading.reader_source,
+                   self.context.presentation.presenter_source,
+                   self.context.presentation.presenter_class)
+        presenter_class, raw, uri, locked_imports = self._pool.apply(
+            _present_in_process, (location, origin_location, presenter_class, sources))
+        if locked_imports:
+            # The imports were locked by the process, in its own copy of the lock
+            for locked_uri, digest in locked_imports.iteritems():
+                self.context.loading.import_lock.check(locked_uri, digest)
+
+        # Imports of the document are relative to where it was found
+        location.uri = uri
+        if not self.context.reading.add_location(location):
+            raise AlreadyReadException('already read: %s' % location)
+        return presenter_class(raw=raw)
+
+    def _present_profile(self, location, origin_location, presenter_class, executor):
+        # Link the context to this thread
+        self.context.set_thread_local()
+
+        # Find where the profile is
+        loader = self.context.loading.loader_source.get_loader(self.context.loading, location,
+                                                               origin_location)
+        with OpenClose(loader):
+            pass
+        path = as_file(location.uri)
+        if path is None:
+            return self._present(location, origin_location, presenter_class, executor)
+
+        if not self.context.reading.add_location(location):
+            raise AlreadyReadException('already read: %s' % location)
+
+        cache = self.context.presentation.cache
+        presenter_class = self.context.presentation.presenter_class or presenter_class
+        cached = cache.get(path, presenter_class)
+        if cached is not None:
+            presentation, dependencies = cached
+        else:
+            dependencies = []
+            presentation = self._present_with_imports(location, presenter_class, [path],
+                                                      dependencies)
+            cache.put(path, presenter_class, presentation, dependencies)
+
+        # The profile's imports are not read again
+        for dependency in dependencies:
+            self.context.reading.add_location(UriLocation(dependency))
+        return presentation
+
+    def _present_with_imports(self, location, presenter_class, read_uris, dependencies):
+        """
+        Presents a document with its imports merged in, on this thread (the documents are not kept
+        track of in the context).
+        """
+
+        presentation = self._present_document(location, None, presenter_class, track=False)
+        if hasattr(presentation, '_get_import_locations'):
+            for import_location in presentation._get_import_locations(self.context):
+                import_location = UriLocation(import_location)
+                loader = self.context.loading.loader_source.get_loader(self.context.loading,
+                                                                       import_location, location)
+                with OpenClose(loader):
+                    pass
+                if import_location.uri in read_uris:
+                    continue
+                read_uris.append(import_location.uri)
+                dependencies.append(import_location.uri)
+                imported_presentation = self._present_with_imports(
+                    import_location, presentation.__class__, read_uris, dependencies)
+                okay = True
+                if hasattr(presentation, '_validate_import'):
+                    okay = presentation._validate_import(self.context, imported_presentation)
+                if okay:
+                    presentation._merge_import(imported_presentation)
+        return presentation
+
+    def _present_document(self, location, origin_location, presenter_class, track=True):
+        raw = self._read(location, origin_location, track)
 
         if self.context.presentation.presenter_class is not None:
             # The presenter class we specified in the context overrides everything
@@ -113,24 +224,57 @@ class Read(Consumer):
         if presentation is not None and hasattr(presentation, '_link_locators'):
             presentation._link_locators()
 
-        # Submit imports to executor
+        return presentation
+
+    def _submit_imports(self, presentation, location, executor):
         if hasattr(presentation, '_get_import_locations'):
             import_locations = presentation._get_import_locations(self.context)
             if import_locations:
+                profile_locations = ()
+                if (self.context.presentation.cache is not None) \
+                        and (self.context.reading.reader is None) \
+                        and hasattr(presentation, '_get_profile_locations'):
+                    profile_locations = presentation._get_profile_locations(self.context)
                 for import_location in import_locations:
+                    present = self._present_profile if import_location in profile_locations \
+                        else self._present
                     # The imports inherit the parent presenter class and use the current location as
                     # their origin location
                     import_location = UriLocation(import_location)
-                    executor.submit(self._present, import_location, location, presenter_class,
+                    executor.submit(present, import_location, location, presentation.__class__,
                                     executor)
 
-        return presentation
-
-    def _read(self, location, origin_location):
+    def _read(self, location, origin_location, track=True):
         if self.context.reading.reader is not None:
             return self.context.reading.reader.read()
         loader = self.context.loading.loader_source.get_loader(self.context.loading, location,
                                                                origin_location)
-        reader = self.context.reading.reader_source.get_reader(self.context.reading, location,
-                                                               loader)
+        reader = self.context.reading.reader_source.get_reader(
+            self.context.reading if track else None, location, loader)
         return reader.read()
+
+
+def _present_in_process(location, origin_location, presenter_class, sources):
+    """
+    Presents a document in a process of the pool of :class:`Read`.
+
+    :return: the presenter class and the raw data (with its locators) of the presentation, the
+     URI the document was found at, and the imports of the import lock (if there is one)
+    """
+
+    context = ConsumptionContext()
+    context.loading.loader_source, prefixes, context.loading.import_store, \
+        context.loading.import_lock, context.reading.reader_source, \
+        context.presentation.presenter_source, context.presentation.presenter_class = sources
+    context.loading.prefixes.extend(prefixes)
+    try:
+        presentation = Read(context)._present_document(location, origin_location,
+                                                       presenter_class)
+    except AriaException as e:
+        # Tracebacks cannot be sent back to the parent process (the issue is enough)
+        e.cause = None
+        e.cause_traceback = None
+        raise
+    import_lock = context.loading.import_lock
+    return presentation.__class__, presentation._raw, location.uri, \
+        import_lock.imports if import_lock is not None else None
@@ -23,6 +23,7 @@ from .literal import LiteralLoader
 from .uri import UriTextLoader
 from .request import SESSION, SESSION_CACHE_PATH, RequestLoader, RequestTextLoader
 from .file import FileTextLoader
+from .store import ImportStore, ImportLock, StoredTextLoader, IMPORT_STORE
 
 
 __all__ = (
@@ -42,4 +43,8 @@ __all__ = (
     'SESSION_CACHE_PATH',
     'RequestLoader',
     'RequestTextLoader',
-    'FileTextLoader')
+    'FileTextLoader',
+    'ImportStore',
+    'ImportLock',
+    'StoredTextLoader',
+    'IMPORT_STORE')
@@ -16,6 +16,7 @@
 
 from ...utils.collections import StrictList
 from .source import DefaultLoaderSource
+from .store import IMPORT_STORE
 
 
 class LoadingContext(object):
@@ -24,8 +25,12 @@ class LoadingContext(object):
 
     * :code:`loader_source`: For finding loader instances
     * :code:`prefixes`: List of additional prefixes for :class:`UriTextLoader`
+    * :code:`import_store`: :class:`ImportStore` for documents imported from URLs
+    * :code:`import_lock`: Optional :class:`ImportLock` for documents imported from URLs
     """
 
     def __init__(self):
         self.loader_source = DefaultLoaderSource()
         self.prefixes = StrictList(value_class=basestring)
+        self.import_store = IMPORT_STORE
+        self.import_lock = None
@@ -14,7 +14,10 @@
 # limitations under the License.
 
 
+import hashlib
 import os
+import posixpath
+import urlparse
 
 from ...utils.uris import as_file
 
@@ -30,6 +33,13 @@ class Location(object):
     def is_equivalent(self, location):
         raise NotImplementedError
 
+    @property
+    def key(self):
+        """
+        Normalized key of the location: equivalent locations have the same key.
+        """
+        raise NotImplementedError
+
     @property
     def prefix(self):
         return None
@@ -50,6 +60,20 @@ class UriLocation(Location):
     def is_equivalent(self, location):
         return isinstance(location, UriLocation) and (location.uri == self.uri)
 
+    @property
+    def key(self):
+        path = as_file(self.uri)
+        if path is not None:
+            return 'file:' + os.path.normcase(os.path.abspath(path))
+        url = urlparse.urlsplit(self.uri)
+        netloc = url.netloc.lower()
+        if (url.scheme, url.port) in (('http', 80), ('https', 443)):
+            netloc = netloc.rsplit(':', 1)[0]
+        path = posixpath.normpath(url.path) if url.path else '/'
+        if url.path.endswith('/') and (path != '/'):
+            path += '/'
+        return urlparse.urlunsplit((url.scheme.lower(), netloc, path, url.query, ''))
+
     @property
     def prefix(self):
         prefix = os.path.dirname(self.uri)
@@ -78,5 +102,12 @@ class LiteralLocation(Location):
     def is_equivalent(self, location):
         return isinstance(location, LiteralLocation) and (location.content == self.content)
 
+    @property
+    def key(self):
+        content = self.content
+        if isinstance(content, unicode):
+            content = content.encode('utf-8')
+        return 'literal:' + hashlib.sha1(content).hexdigest()
+
     def __str__(self):
         return '<%s>' % self.name
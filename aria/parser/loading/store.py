@@ -0,0 +1,236 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import os
+import re
+import tarfile
+import tempfile
+from StringIO import StringIO
+from threading import Lock
+
+from .exceptions import LoaderException
+from .loader import Loader
+
+LOCK_SUFFIX = '.lock'
+BUNDLE_LOCK_NAME = 'imports.lock'
+BUNDLE_OBJECTS_DIR = 'objects'
+
+_DIGEST_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+class ImportStore(object):
+    """
+    Content-addressed store of documents imported from URLs.
+
+    Documents are stored by the SHA-256 digest of their content, and an index keeps the digest of
+    the document last fetched from every URL.
+
+    :ivar path: directory of the store, or ``None`` to disable it
+    :ivar refresh: if set, documents are fetched again rather than read from the index (locked
+     documents are still read by their digest)
+    """
+
+    def __init__(self, path=None, refresh=False):
+        self.path = path
+        self.refresh = refresh
+        self._lock = Lock()
+
+    def get(self, uri, digest=None):
+        """
+        :param digest: if set, the document with this digest is looked up instead of the one last
+         fetched from the URI
+        :return: the digest and content of the document, or ``None`` if it is not stored
+        """
+        if self.path is None:
+            return None
+        if digest is None:
+            digest = self._read_index().get(uri)
+            if digest is None:
+                return None
+        try:
+            with open(self._object_path(digest), 'rb') as object_file:
+                data = object_file.read()
+        except IOError:
+            return None
+        if get_digest(data) != digest:
+            # Corrupted
+            return None
+        return digest, data
+
+    def put(self, uri, data):
+        """
+        Stores the document fetched from the URI.
+
+        :return: the digest of the document
+        """
+        digest = get_digest(data)
+        if self.path is None:
+            return digest
+        object_path = self._object_path(digest)
+        if not os.path.isfile(object_path):
+            _write_atomically(object_path, data)
+        if uri is not None:
+            with self._lock:
+                index = self._read_index()
+                if index.get(uri) != digest:
+                    index[uri] = digest
+                    _write_atomically(self._index_path, json.dumps(index, indent=2))
+        return digest
+
+    def write_bundle(self, destination, lock):
+        """
+        Writes an offline bundle of the locked documents (which must all be stored), along with the
+        lock.
+        """
+        with tarfile.open(destination, 'w:gz') as bundle:
+            _add_to_bundle(bundle, BUNDLE_LOCK_NAME, lock.dumps())
+            for uri, digest in sorted(lock.imports.iteritems()):
+                stored = self.get(uri, digest)
+                if stored is None:
+                    raise LoaderException('import is not stored: "{0}"'.format(uri))
+                _add_to_bundle(bundle, '{0}/{1}'.format(BUNDLE_OBJECTS_DIR, digest), stored[1])
+
+    def add_bundle(self, source):
+        """
+        Stores the documents of an offline bundle.
+
+        :return: the lock of the bundle
+        :rtype: :class:`ImportLock`
+        """
+        if self.path is None:
+            raise LoaderException('import store is disabled')
+        with tarfile.open(source, 'r:gz') as bundle:
+            lock = ImportLock.loads(bundle.extractfile(BUNDLE_LOCK_NAME).read())
+            for uri, digest in lock.imports.iteritems():
+                if not _DIGEST_RE.match(digest):
+                    raise LoaderException('malformed digest in bundle: "{0}"'.format(digest))
+                data = bundle.extractfile('{0}/{1}'.format(BUNDLE_OBJECTS_DIR, digest)).read()
+                if get_digest(data) != digest:
+                    raise LoaderException('corrupted import in bundle: "{0}"'.format(uri))
+                self.put(uri, data)
+        return lock
+
+    def __getstate__(self):
+        # For the processes of :class:`~aria.parser.consumption.Read`
+        return self.path, self.refresh
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    @property
+    def _index_path(self):
+        return os.path.join(self.path, 'index.json')
+
+    def _object_path(self, digest):
+        return os.path.join(self.path, BUNDLE_OBJECTS_DIR, digest)
+
+    def _read_index(self):
+        try:
+            with open(self._index_path) as index_file:
+                return json.load(index_file)
+        except (IOError, ValueError):
+            return {}
+
+
+class ImportLock(object):
+    """
+    Digests of the documents imported from URLs by a service template, by URL.
+
+    Locked documents are read from the store by their digest, or fetched and checked against it.
+    The lock of a service template is kept in a file next to it (see :func:`get_path`).
+
+    A lock read from a file (or a bundle) is complete: URLs that are not locked are not requested,
+    as they were not imported when the lock was written. Other locks lock the documents they are
+    checked against.
+    """
+
+    def __init__(self, imports=None, complete=False):
+        self.imports = imports or {}
+        self.complete = complete
+
+    @staticmethod
+    def get_path(service_template_path):
+        return service_template_path + LOCK_SUFFIX
+
+    @classmethod
+    def read(cls, path):
+        """
+        :return: the lock in the file, or ``None`` if there is no such file
+        """
+        if not os.path.isfile(path):
+            return None
+        with open(path) as lock_file:
+            return cls.loads(lock_file.read())
+
+    @classmethod
+    def loads(cls, data):
+        try:
+            return cls(json.loads(data)['imports'], complete=True)
+        except (ValueError, KeyError) as e:
+            raise LoaderException('malformed import lock', cause=e)
+
+    def write(self, path):
+        _write_atomically(path, self.dumps())
+
+    def dumps(self):
+        return json.dumps({'imports': self.imports}, indent=2, sort_keys=True)
+
+    def check(self, uri, digest):
+        """
+        Checks the digest of a document against the lock, and locks it if it was not locked.
+        """
+        locked_digest = self.imports.setdefault(uri, digest)
+        if locked_digest != digest:
+            raise LoaderException('import does not match its lock: "{0}"'.format(uri))
+
+
+class StoredTextLoader(Loader):
+    """
+    ARIA stored text loader.
+
+    Provides the text of a document read from an :class:`ImportStore`.
+    """
+
+    def __init__(self, data):
+        self.data = data
+
+    def load(self):
+        return self.data.decode('utf-8')
+
+
+def get_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_atomically(path, data):
+    dir_path = os.path.dirname(path)
+    if not os.path.isdir(dir_path):
+        os.makedirs(dir_path)
+    temp_file, temp_path = tempfile.mkstemp(dir=dir_path)
+    with os.fdopen(temp_file, 'wb') as temp_file:
+        temp_file.write(data)
+    os.rename(temp_path, path)
+
+
+def _add_to_bundle(bundle, name, data):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    bundle.addfile(info, StringIO(data))
+
+
+#: Used by :class:`~aria.parser.loading.LoadingContext` by default (disabled unless given a path)
+IMPORT_STORE = ImportStore()
@@ -22,6 +22,7 @@ from ...utils.uris import as_file
 from .loader import Loader
 from .file import FileTextLoader
 from .request import RequestTextLoader
+from .store import StoredTextLoader, get_digest
 from .exceptions import DocumentNotFoundException
 
 
@@ -37,6 +38,12 @@ class UriTextLoader(Loader):
     * If :code:`origin_location` is provided its prefix will come first.
     * Then the prefixes in the :class:`LoadingContext` will be added.
     * Finally, the global prefixes specified in :code:`URI_LOADER_PREFIXES` will be added.
+
+    A URL is read from the :class:`ImportStore` of the context, if it is stored there (unless the
+    store is refreshed), before it is requested. Requested documents are added to the store. All
+    documents read from URLs are checked against the :class:`ImportLock` of the context, if there
+    is one. Locked documents are read from the store by their digest, and URLs that are not in a
+    complete lock are not requested.
     """
 
     def __init__(self, context, location, origin_location=None):
@@ -83,15 +90,47 @@ class UriTextLoader(Loader):
             self._loader.close()
 
     def load(self):
-        return self._loader.load() if self._loader is not None else None
+        if self._loader is None:
+            return None
+        data = self._loader.load()
+        if isinstance(self._loader, RequestTextLoader) and (data is not None):
+            self._store(self.location.uri, data)
+        return data
 
     def _open(self, uri):
         the_file = as_file(uri)
         if the_file is not None:
             uri = the_file
             loader = FileTextLoader(self.context, uri)
+        elif self._open_stored(uri):
+            return
         else:
+            import_lock = self.context.import_lock
+            if (import_lock is not None) and import_lock.complete and \
+                    (uri not in import_lock.imports):
+                raise DocumentNotFoundException('import is not locked: "%s"' % uri)
             loader = RequestTextLoader(self.context, uri)
         loader.open() # might raise an exception
         self._loader = loader
         self.location.uri = uri
+
+    def _open_stored(self, uri):
+        import_lock = self.context.import_lock
+        digest = import_lock.imports.get(uri) if import_lock is not None else None
+        if (digest is None) and self.context.import_store.refresh:
+            return False
+        stored = self.context.import_store.get(uri, digest)
+        if stored is None:
+            return False
+        digest, data = stored
+        if import_lock is not None:
+            import_lock.check(uri, digest)
+        self._loader = StoredTextLoader(data)
+        self.location.uri = uri
+        return True
+
+    def _store(self, uri, data):
+        data = data.encode('utf-8')
+        if self.context.import_lock is not None:
+            self.context.import_lock.check(uri, get_digest(data))
+        self.context.import_store.put(uri, data)
@@ -19,6 +19,7 @@ from .context import PresentationContext
 from .presenter import Presenter
 from .presentation import Value, PresentationBase, Presentation, AsIsPresentation
 from .source import PresenterSource, DefaultPresenterSource
+from .cache import PresentationCache, PRESENTATION_CACHE
 from .null import NULL, none_to_null, null_to_none
 from .fields import (Field, has_fields, short_form_field, allow_unknown_fields, primitive_field,
                      primitive_list_field, primitive_dict_field, primitive_dict_unknown_fields,
@@ -43,6 +44,8 @@ __all__ = (
     'AsIsPresentation',
     'PresenterSource',
     'DefaultPresenterSource',
+    'PresentationCache',
+    'PRESENTATION_CACHE',
     'NULL',
     'none_to_null',
     'null_to_none',
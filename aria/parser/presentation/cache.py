@@ -0,0 +1,142 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import cPickle as pickle
+import hashlib
+import os
+import tempfile
+from collections import namedtuple
+from threading import Lock
+
+from ...VERSION import version as aria_version
+from ...utils.uris import as_file
+
+
+_Entry = namedtuple('_Entry', 'dependencies presentation')
+
+
+class PresentationCache(object):
+    """
+    Process-wide cache of presentations of documents (such as profiles) which are presented
+    along with all of their imports. It can be backed by a directory, in order to be shared by
+    processes.
+
+    Entries are keyed by the path and content of the document, the presenter class and the ARIA
+    version, and are only used if the content of the documents it imported is unchanged.
+    Presentations are stored pickled, so every use gets a copy which can be safely merged into.
+
+    :ivar path: directory of the stored entries, or ``None`` to only keep them in memory
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._entries = {}
+        self._lock = Lock()
+
+    def get(self, path, presenter_class):
+        """
+        :return: the presentation of the document at the path and the paths of the documents it
+         imported, or ``None`` if not cached
+        """
+        key = self._key(path, presenter_class)
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            entry = self._load_entry(key)
+            if entry is None:
+                return None
+        for dependency, digest in entry.dependencies:
+            if _digest(dependency) != digest:
+                return None
+        with self._lock:
+            self._entries[key] = entry
+        presentation_class, raw = pickle.loads(entry.presentation)
+        return presentation_class(raw=raw), [dependency for dependency, _ in entry.dependencies]
+
+    def put(self, path, presenter_class, presentation, dependencies):
+        """
+        Caches the presentation of the document at the path, which includes the documents at the
+        dependency paths. Presentations of documents imported from anywhere other than files are
+        not cached.
+        """
+        key = self._key(path, presenter_class)
+        digests = [_digest(dependency) for dependency in dependencies]
+        if (key is None) or (None in digests):
+            return
+        entry = _Entry(dependencies=tuple(zip(dependencies, digests)),
+                       presentation=pickle.dumps((presentation.__class__, presentation._raw),
+                                                 pickle.HIGHEST_PROTOCOL))
+        with self._lock:
+            self._entries[key] = entry
+        self._store_entry(key, entry)
+
+    def clear(self):
+        """
+        Clears the entries kept in memory (the stored ones are kept).
+        """
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def _key(path, presenter_class):
+        digest = _digest(path)
+        if digest is None:
+            return None
+        return hashlib.sha1('\0'.join((aria_version,
+                                       '{0}.{1}'.format(presenter_class.__module__,
+                                                        presenter_class.__name__),
+                                       path,
+                                       digest))).hexdigest()
+
+    def _load_entry(self, key):
+        if self.path is None:
+            return None
+        try:
+            with open(os.path.join(self.path, key), 'rb') as entry_file:
+                return _Entry(*pickle.load(entry_file))
+        except Exception:
+            # Missing, or stored by an incompatible version of a presenter
+            return None
+
+    def _store_entry(self, key, entry):
+        if self.path is None:
+            return
+        try:
+            if not os.path.isdir(self.path):
+                os.makedirs(self.path, 0o700)
+            # Written to a temporary file first, so that other processes never read a partial entry
+            entry_file, entry_path = tempfile.mkstemp(dir=self.path)
+            with os.fdopen(entry_file, 'wb') as entry_file:
+                pickle.dump(tuple(entry), entry_file, pickle.HIGHEST_PROTOCOL)
+            os.rename(entry_path, os.path.join(self.path, key))
+        except (IOError, OSError):
+            pass
+
+
+def _digest(uri):
+    path = as_file(uri)
+    if path is None:
+        return None
+    try:
+        with open(path, 'rb') as the_file:
+            return hashlib.sha1(the_file.read()).hexdigest()
+    except IOError:
+        return None
+
+
+#: Used by :class:`~aria.parser.presentation.PresentationContext` by default
+PRESENTATION_CACHE = PresentationCache()
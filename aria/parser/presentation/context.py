@@ -15,6 +15,7 @@
 
 
 from .source import DefaultPresenterSource
+from .cache import PRESENTATION_CACHE
 
 
 class PresentationContext(object):
@@ -27,8 +28,11 @@ class PresentationContext(object):
     * :code:`presenter_class`: Overrides :code:`presenter_source` with a specific class
     * :code:`import_profile`: Whether to import the profile by default (defaults to true)
     * :code:`threads`: Number of threads to use when reading data
+    * :code:`processes`: Number of processes to read and present imports in (defaults to none,
+      in which case they are read on the threads)
     * :code:`timeout`: Timeout in seconds for loading data
     * :code:`print_exceptions`: Whether to print exceptions while reading data
+    * :code:`cache`: For caching presentations of profiles (``None`` to disable)
     """
 
     def __init__(self):
@@ -38,8 +42,10 @@ class PresentationContext(object):
         self.presenter_class = None  # overrides
         self.import_profile = True
         self.threads = 8  # reasonable default for networking multithreading
+        self.processes = 0
         self.timeout = 10  # in seconds
         self.print_exceptions = False
+        self.cache = PRESENTATION_CACHE
 
     def get(self, *names):
         """
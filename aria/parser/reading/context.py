@@ -10,7 +10,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from ...utils.threading import LockedList
+from threading import Condition
+
 from .source import DefaultReaderSource
 
 
@@ -26,4 +27,48 @@ class ReadingContext(object):
         self.reader_source = DefaultReaderSource()
         self.reader = None
 
-        self._locations = LockedList()  # for keeping track of locations already read
+        # Locations already read, by key (see Location.key), and the keys being read
+        self._locations = {}
+        self._claimed_keys = set()
+        self._locations_condition = Condition()
+
+    def claim_location(self, location):
+        """
+        Claims the reading of a location. If it is being read already, waits for that reading to
+        end first.
+
+        :return: the key of the location, to release with :meth:`release_location` once it was
+         read (or failed to be read), or ``None`` if the location was already read
+        """
+        key = location.key
+        with self._locations_condition:
+            while key in self._claimed_keys:
+                self._locations_condition.wait()
+            if key in self._locations:
+                return None
+            self._claimed_keys.add(key)
+        return key
+
+    def release_location(self, key, location=None):
+        """
+        Releases a claimed location.
+
+        :param location: the location, if it was read (otherwise it can be claimed again)
+        """
+        with self._locations_condition:
+            self._claimed_keys.discard(key)
+            if location is not None:
+                self._locations[key] = location
+            self._locations_condition.notify_all()
+
+    def add_location(self, location):
+        """
+        Keeps track of a location as read.
+
+        :return: ``False`` if the location was already read
+        """
+        key = self.claim_location(location)
+        if key is None:
+            return False
+        self.release_location(key, location)
+        return True
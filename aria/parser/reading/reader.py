@@ -27,18 +27,36 @@ class Reader(object):
         self.loader = loader
 
     def load(self):
-        with OpenClose(self.loader) as loader:
-            if self.context is not None:
-                with self.context._locations:
-                    for location in self.context._locations:
-                        if location.is_equivalent(loader.location):
-                            raise AlreadyReadException('already read: %s' % loader.location)
-                    self.context._locations.append(loader.location)
-
-            data = loader.load()
-            if data is None:
-                raise ReaderException('loader did not provide data: %s' % loader)
-            return data
+        if self.context is None:
+            with OpenClose(self.loader) as loader:
+                return self._load(loader)
+
+        key = None
+        try:
+            with OpenClose(self.loader) as loader:
+                # Claimed once the loader has resolved the location (e.g. against the search
+                # prefixes), so that equivalent locations are read only once
+                key = self._claim(loader.location)
+                data = self._load(loader)
+        except BaseException:
+            if key is not None:
+                self.context.release_location(key)
+            raise
+        self.context.release_location(key, loader.location)
+        return data
+
+    def _claim(self, location):
+        key = self.context.claim_location(location)
+        if key is None:
+            raise AlreadyReadException('already read: %s' % location)
+        return key
+
+    @staticmethod
+    def _load(loader):
+        data = loader.load()
+        if data is None:
+            raise ReaderException('loader did not provide data: %s' % loader)
+        return data
 
     def read(self):
         raise NotImplementedError
@@ -73,8 +73,13 @@ yaml.constructor.SafeConstructor.add_constructor(MAP_TAG, construct_yaml_map)
 class YamlReader(Reader):
     """
     ARIA YAML reader.
+
+    By default the C-accelerated loader is used if available.
     """
 
+    #: Whether to use the C-accelerated loader
+    fast = True
+
     def read(self):
         data = self.load()
         try:
@@ -82,7 +87,10 @@ class YamlReader(Reader):
             # see issue here:
             # https://bitbucket.org/ruamel/yaml/issues/61/roundtriploader-causes-exceptions-with
             #yaml_loader = yaml.RoundTripLoader(data)
-            yaml_loader = yaml.SafeLoader(data)
+            if self.fast:
+                yaml_loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)(data)
+            else:
+                yaml_loader = yaml.SafeLoader(data)
             try:
                 node = yaml_loader.get_single_node()
                 locator = YamlLocator(self.loader.location, 0, 0)
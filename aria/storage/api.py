@@ -82,6 +82,16 @@ class ModelAPI(StorageAPI):
         """
         raise NotImplementedError('Subclass must implement abstract store method')
 
+    def put_many(self, entries, **kwargs):
+        """
+        Store several entries in storage.
+
+        :param entries:
+        :param kwargs:
+        :return:
+        """
+        return [self.put(entry, **kwargs) for entry in entries]
+
     def delete(self, entry_id, **kwargs):
         """
         Delete entry from storage.
@@ -92,6 +102,16 @@ class ModelAPI(StorageAPI):
         """
         raise NotImplementedError('Subclass must implement abstract delete method')
 
+    def delete_many(self, entries, **kwargs):
+        """
+        Delete several entries from storage.
+
+        :param entries:
+        :param kwargs:
+        :return:
+        """
+        return [self.delete(entry, **kwargs) for entry in entries]
+
     def __iter__(self):
         return self.iter()
 
@@ -114,6 +134,16 @@ class ModelAPI(StorageAPI):
         """
         raise NotImplementedError('Subclass must implement abstract update method')
 
+    def update_many(self, entries, **kwargs):
+        """
+        Update several entries in storage.
+
+        :param entries:
+        :param kwargs:
+        :return:
+        """
+        return [self.update(entry, **kwargs) for entry in entries]
+
 
 class ResourceAPI(StorageAPI):
     """
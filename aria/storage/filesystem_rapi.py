@@ -143,9 +143,12 @@ class FileSystemResourceAPI(api.ResourceAPI):
         :param path: the destination of the file/s relative to the entry root dir.
         """
         resource_directory = os.path.join(self.directory, self.name, entry_id)
-        if not os.path.exists(resource_directory):
-            os.makedirs(resource_directory)
         destination = os.path.join(resource_directory, path or '')
+        # Files may be uploaded to a path in a directory of the entry
+        destination_directory = os.path.dirname(destination) if os.path.isfile(source) \
+            else resource_directory
+        if not os.path.exists(destination_directory):
+            os.makedirs(destination_directory)
         if os.path.isfile(source):
             shutil.copy2(source, destination)
         else:
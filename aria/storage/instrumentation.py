@@ -20,10 +20,12 @@ import json
 import sqlalchemy.event
 
 from ..modeling import models as _models
-from ..storage.exceptions import StorageError
+from ..storage.exceptions import StorageError, NotFoundError
 
 
 _VERSION_ID_COL = 'version'
+# Maximal number of values in a single "IN" filter (SQLite limits the number of query parameters)
+_MAX_FILTER_VALUES = 500
 _STUB = object()
 _INSTRUMENTED = {
     _models.Node.runtime_properties: dict
@@ -82,10 +84,8 @@ class _Instrumentation(object):
             mapi_name = target.__modelname__
             tracked_instances = self.tracked_changes.setdefault(mapi_name, {})
             tracked_attributes = tracked_instances.setdefault(target.id, {})
-            if value is None:
-                current = None
-            else:
-                current = copy.deepcopy(attribute_type(value))
+            # The initial value is unknown, so the new value needs no snapshot to be diffed against
+            current = None if value is None else attribute_type(value)
             tracked_attributes[instrumented_attribute.key] = _Value(_STUB, current)
             return current
         listener_args = (instrumented_attribute, 'set', listener)
@@ -107,6 +107,8 @@ class _Instrumentation(object):
                     initial = getattr(target, attribute_name)
                     if initial is None:
                         current = None
+                    elif attribute_type is dict:
+                        current = _TrackedDict(initial)
                     else:
                         current = copy.deepcopy(attribute_type(initial))
                     tracked_attributes[attribute_name] = _Value(initial, current)
@@ -160,44 +162,318 @@ class _Value(object):
         return {'initial': self.initial, 'current': self.current}.copy()
 
 
+class _TrackedDict(dict):
+    """
+    The tracked value of a dict attribute, which shares the values of the attribute's initial dict
+    until they are handed out (and thus may be modified in place). Each value is copied once it is
+    first handed out, so only the values a task uses are copied, rather than the whole dict.
+
+    Note that a shallow copy of the dict made by ``dict()`` (rather than by ``copy()``) holds the
+    shared values as well, which must not be modified.
+    """
+
+    def __init__(self, initial):
+        super(_TrackedDict, self).__init__(initial)
+        # Keys whose values are still those of the initial dict
+        self._shared = set(initial)
+
+    def __getitem__(self, key):
+        self._own(key)
+        return super(_TrackedDict, self).__getitem__(key)
+
+    def __setitem__(self, key, value):
+        self._shared.discard(key)
+        super(_TrackedDict, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._shared.discard(key)
+        super(_TrackedDict, self).__delitem__(key)
+
+    def __reduce__(self):
+        return dict, (self.copy(), )
+
+    def get(self, key, default=None):
+        self._own(key)
+        return super(_TrackedDict, self).get(key, default)
+
+    def setdefault(self, key, default=None):
+        self._own(key)
+        return super(_TrackedDict, self).setdefault(key, default)
+
+    def pop(self, key, *default):
+        self._own(key)
+        return super(_TrackedDict, self).pop(key, *default)
+
+    def popitem(self):
+        self._own_all()
+        return super(_TrackedDict, self).popitem()
+
+    def update(self, *args, **kwargs):
+        values = dict(*args, **kwargs)
+        self._shared.difference_update(values)
+        super(_TrackedDict, self).update(values)
+
+    def clear(self):
+        self._shared.clear()
+        super(_TrackedDict, self).clear()
+
+    def copy(self):
+        self._own_all()
+        return dict(self)
+
+    def values(self):
+        self._own_all()
+        return super(_TrackedDict, self).values()
+
+    def itervalues(self):
+        self._own_all()
+        return super(_TrackedDict, self).itervalues()
+
+    def viewvalues(self):
+        self._own_all()
+        return super(_TrackedDict, self).viewvalues()
+
+    def items(self):
+        self._own_all()
+        return super(_TrackedDict, self).items()
+
+    def iteritems(self):
+        self._own_all()
+        return super(_TrackedDict, self).iteritems()
+
+    def viewitems(self):
+        self._own_all()
+        return super(_TrackedDict, self).viewitems()
+
+    def shared_items(self):
+        """
+        :return: the items of the dict, without copying the shared values (which must therefore
+                 not be modified)
+        """
+        return dict.items(self)
+
+    def _own(self, key):
+        if key in self._shared:
+            self._shared.remove(key)
+            dict.__setitem__(self, key, copy.deepcopy(dict.__getitem__(self, key)))
+
+    def _own_all(self):
+        for key in list(self._shared):
+            self._own(key)
+
+
+class _Patch(object):
+    """
+    The changes made to a dict attribute, as operations on key paths. Each operation holds the
+    value that was expected at its path, so a patch can be applied on top of concurrent changes
+    made to other keys of the same attribute
+    """
+
+    ADD = 'add'
+    SET = 'set'
+    DELETE = 'delete'
+
+    def __init__(self, operations):
+        # Operations are (kind, path, expected, value) tuples
+        self.operations = operations
+
+    @classmethod
+    def diff(cls, initial, current):
+        """
+        :return: the patch that turns the ``initial`` dict into the ``current`` dict
+        """
+        operations = []
+        cls._diff(initial, current, (), operations)
+        return cls(operations)
+
+    @classmethod
+    def _diff(cls, initial, current, path, operations):
+        items = current.shared_items() if isinstance(current, _TrackedDict) else current.items()
+        for key, value in items:
+            key_path = path + (key, )
+            if key not in initial:
+                operations.append((cls.ADD, key_path, None, value))
+            elif initial[key] is value:
+                # Shared with the initial dict, thus unchanged
+                continue
+            elif isinstance(initial[key], dict) and isinstance(value, dict):
+                cls._diff(initial[key], value, key_path, operations)
+            elif initial[key] != value:
+                operations.append((cls.SET, key_path, initial[key], value))
+        for key in initial:
+            if key not in current:
+                operations.append((cls.DELETE, path + (key, ), initial[key], None))
+
+    def apply(self, target):
+        """
+        Dicts along the changed paths are copied, the rest of ``target`` is shared with the result
+
+        :return: the patched copy of ``target``
+        :raises StorageError: if a value in ``target`` differs from the one expected by the patch
+        """
+        result = target
+        for kind, path, expected, value in self.operations:
+            found, target_value = _get_path(result, path)
+            if kind == self.DELETE:
+                if not found:
+                    continue
+                if target_value != expected:
+                    raise _key_conflict(path, expected, target_value)
+                result = _set_path(result, path, None, delete=True)
+            else:
+                if found and target_value == value:
+                    continue
+                # Added keys are expected to be missing, set keys to hold their initial value
+                if found != (kind == self.SET) or target_value != expected:
+                    raise _key_conflict(path, expected, target_value)
+                result = _set_path(result, path, value)
+        return result
+
+    def __eq__(self, other):
+        if not isinstance(other, _Patch):
+            return False
+        return self.operations == other.operations
+
+    def __nonzero__(self):
+        return bool(self.operations)
+
+    @property
+    def dict(self):
+        return {'operations': list(self.operations)}
+
+
+def _get_path(target, path):
+    for key in path:
+        if not isinstance(target, dict) or key not in target:
+            return False, None
+        target = target[key]
+    return True, target
+
+
+def _set_path(target, path, value, delete=False):
+    # Values along the path which are not dicts (e.g. concurrently replaced ones) are replaced
+    target = dict(target) if isinstance(target, dict) else {}
+    key = path[0]
+    if len(path) == 1:
+        if delete:
+            del target[key]
+        else:
+            target[key] = value
+    else:
+        target[key] = _set_path(target.get(key), path[1:], value, delete)
+    return target
+
+
+def _key_conflict(path, expected, value):
+    return StorageError(
+        'Version conflict: key {0} was modified concurrently [expected {1!r}, found {2!r}]'
+        .format('.'.join(str(key) for key in path), expected, value))
+
+
+def diff_tracked_changes(tracked_changes):
+    """Reduce tracked changes to the actual changes
+
+    Unchanged attributes are dropped, and changed dict attributes whose initial value is known are
+    replaced with patches. The result can be passed to ``apply_tracked_changes`` instead of the
+    tracked changes, and is usually much smaller.
+
+    :param tracked_changes: The ``tracked_changes`` attribute of the instrumentation context
+                            returned by calling ``track_changes()``
+    """
+    result = {}
+    for mapi_name, tracked_instances in tracked_changes.items():
+        for instance_id, tracked_attributes in tracked_instances.items():
+            changes = {}
+            for attribute_name, value in tracked_attributes.items():
+                change = _diff_value(value)
+                if change and attribute_name != _VERSION_ID_COL:
+                    changes[attribute_name] = change
+            if changes:
+                if _VERSION_ID_COL in tracked_attributes:
+                    changes[_VERSION_ID_COL] = tracked_attributes[_VERSION_ID_COL]
+                result.setdefault(mapi_name, {})[instance_id] = changes
+    return result
+
+
+def _diff_value(value):
+    if isinstance(value, _Patch):
+        return value
+    if value.initial == value.current:
+        return None
+    if isinstance(value.initial, dict) and isinstance(value.current, dict):
+        return _Patch.diff(value.initial, value.current)
+    return value
+
+
 def apply_tracked_changes(tracked_changes, model):
     """Write tracked changes back to the database using provided model storage
 
+    The changed instances of each model are loaded with a query per chunk, and all the changes are
+    committed in a single transaction: either all of them are applied, or (if any of them fails)
+    none are, and the error is raised.
+
+    Changes to dict attributes are applied as patches, which fail only if one of the changed keys
+    was concurrently modified. Other changes overwrite the attribute, and fail if the instance was
+    concurrently modified at all (i.e., its version id changed).
+
     :param tracked_changes: The ``tracked_changes`` attribute of the instrumentation context
-                            returned by calling ``track_changes()``
+                            returned by calling ``track_changes()``, or its
+                            ``diff_tracked_changes()``
     :param model: The model storage used to actually apply the changes
     """
-    successfully_updated_changes = dict()
+    mapi = None
     try:
-        for mapi_name, tracked_instances in tracked_changes.items():
-            successfully_updated_changes[mapi_name] = dict()
+        for mapi_name, tracked_instances in diff_tracked_changes(tracked_changes).items():
             mapi = getattr(model, mapi_name)
-            for instance_id, tracked_attributes in tracked_instances.items():
-                successfully_updated_changes[mapi_name][instance_id] = dict()
-                instance = None
-                for attribute_name, value in tracked_attributes.items():
-                    if value.initial != value.current:
-                        if not instance:
-                            instance = mapi.get(instance_id)
-                        setattr(instance, attribute_name, value.current)
-                if instance:
-                    _validate_version_id(instance, mapi)
-                    mapi.update(instance)
-                    successfully_updated_changes[mapi_name][instance_id] = [
-                        v.dict for v in tracked_attributes.values()]
+            instance_ids = tracked_instances.keys()
+            instances = {}
+            for index in range(0, len(instance_ids), _MAX_FILTER_VALUES):
+                for instance in mapi.iter(
+                        filters={'id': instance_ids[index:index + _MAX_FILTER_VALUES]}):
+                    instances[instance.id] = instance
+            for instance_id, changes in tracked_instances.items():
+                instance = instances.get(instance_id)
+                if instance is None:
+                    raise NotFoundError('Requested `{0}` with ID `{1}` was not found'
+                                        .format(mapi.model_cls.__name__, instance_id))
+                _apply_changes(instance, changes)
+        if mapi is not None:
+            # All the model APIs share the same session, so this commits all the changes
+            mapi._safe_commit()
     except BaseException:
-        for key, value in successfully_updated_changes.items():
-            if not value:
-                del successfully_updated_changes[key]
+        if mapi is not None:
+            mapi._session.rollback()
         model.logger.error(
-            'Registering all the changes to the storage has failed. {0}'
-            'The successful updates were: {0} '
-            '{1}'.format(os.linesep, json.dumps(successfully_updated_changes, indent=4)))
-
+            'Registering the changes to the storage has failed, none of them were applied. {0}'
+            'The changes were: {0}'
+            '{1}'.format(os.linesep, json.dumps(_changes_as_dict(tracked_changes),
+                                                indent=4,
+                                                default=str)))
         raise
 
 
-def _validate_version_id(instance, mapi):
+def _apply_changes(instance, changes):
+    overwritten = False
+    for attribute_name, change in changes.items():
+        if isinstance(change, _Patch):
+            setattr(instance, attribute_name, change.apply(getattr(instance, attribute_name)))
+        elif attribute_name != _VERSION_ID_COL:
+            setattr(instance, attribute_name, change.current)
+            overwritten = True
+    if overwritten and _VERSION_ID_COL in changes:
+        setattr(instance, _VERSION_ID_COL, changes[_VERSION_ID_COL].current)
+        _validate_version_id(instance)
+
+
+def _changes_as_dict(tracked_changes):
+    return dict(
+        (mapi_name, dict((instance_id, dict((attribute_name, value.dict)
+                                            for attribute_name, value in attributes.items()))
+                         for instance_id, attributes in tracked_instances.items()))
+        for mapi_name, tracked_instances in tracked_changes.items() if tracked_instances)
+
+
+def _validate_version_id(instance):
     version_id = sqlalchemy.inspect(instance).committed_state.get(_VERSION_ID_COL)
     # There are two version conflict code paths:
     # 1. The instance committed state loaded already holds a newer version,
@@ -206,7 +482,6 @@ def _validate_version_id(instance, mapi):
     #    will raise a StateDataError if there is a version mismatch.
     if version_id and getattr(instance, _VERSION_ID_COL) != version_id:
         object_version_id = getattr(instance, _VERSION_ID_COL)
-        mapi._session.rollback()
         raise StorageError(
             'Version conflict: committed and object {0} differ '
             '[committed {0}={1}, object {0}={2}]'
@@ -17,12 +17,24 @@ SQLAlchemy based MAPI
 """
 import os
 import platform
+import threading
+import zlib
+from collections import namedtuple
 
 from sqlalchemy import (
+    and_,
+    bindparam,
     create_engine,
+    event,
+    func,
+    inspect,
+    literal_column,
+    or_,
     orm,
 )
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext import baked
+from sqlalchemy.sql.elements import Label
 from sqlalchemy.orm.exc import StaleDataError
 
 from aria.utils.collections import OrderedDict
@@ -31,6 +43,13 @@ from . import (
     exceptions,
 )
 
+# Initiator kwargs for ``init_storage``, which let several processes write to the db concurrently.
+# WAL journaling lets readers work alongside a writer, ``normal`` synchronous level is safe with WAL
+# (and much faster than ``full``), and writers wait for each other instead of failing right away
+CONCURRENT_WRITERS_PROFILE = dict(journal_mode='wal', synchronous='normal', busy_timeout=30)
+
+CacheInfo = namedtuple('CacheInfo', 'hits, misses, maxsize, currsize')
+
 _predicates = {'ge': '__ge__',
                'gt': '__gt__',
                'lt': '__lt__',
@@ -38,6 +57,13 @@ _predicates = {'ge': '__ge__',
                'eq': '__eq__',
                'ne': '__ne__'}
 
+# The built and compiled queries of all the models, by their shape (see
+# `SQLAlchemyModelAPI._get_query`)
+_bakery = baked.bakery(size=1000)
+
+# Maximal number of variables in a single statement (SQLite's default limit is 999)
+_MAX_VARIABLES = 500
+
 
 class SQLAlchemyModelAPI(api.ModelAPI):
     """
@@ -47,27 +73,47 @@ class SQLAlchemyModelAPI(api.ModelAPI):
     def __init__(self,
                  engine,
                  session,
+                 cache=None,
                  **kwargs):
+        """
+        :param cache: An optional `ModelCache` holding the instances fetched by
+        `get`, which may be shared by the APIs of several models
+        """
         super(SQLAlchemyModelAPI, self).__init__(**kwargs)
         self._engine = engine
         self._session = session
+        self._cache = cache
 
-    def get(self, entry_id, include=None, **kwargs):
+    @property
+    def cache(self):
+        """The `ModelCache` of `get`, or None if results are not cached
+        """
+        return self._cache
+
+    def get(self, entry_id, include=None, load=None, **kwargs):
         """Return a single result based on the model class and element ID
         """
-        query = self._get_query(include, {'id': entry_id})
-        result = query.first()
+        use_cache = self._cache is not None and not include and not load
+        if use_cache:
+            result = self._cache.get((self.model_cls, entry_id), self._revalidate)
+            if result is not None:
+                return result
+
+        query, params = self._get_query(include, {'id': entry_id}, load=load)
+        result = self._run(query, params).first()
 
         if not result:
             raise exceptions.NotFoundError(
                 'Requested `{0}` with ID `{1}` was not found'
                 .format(self.model_cls.__name__, entry_id)
             )
+        if use_cache:
+            self._cache.put((self.model_cls, result.id), _CachedInstance(result))
         return result
 
-    def get_by_name(self, entry_name, include=None, **kwargs):
+    def get_by_name(self, entry_name, include=None, load=None, **kwargs):
         assert hasattr(self.model_cls, 'name')
-        result = self.list(include=include, filters={'name': entry_name})
+        result = self.list(include=include, filters={'name': entry_name}, load=load)
         if not result:
             raise exceptions.NotFoundError(
                 'Requested {0} with name `{1}` was not found'
@@ -86,10 +132,27 @@ class SQLAlchemyModelAPI(api.ModelAPI):
              filters=None,
              pagination=None,
              sort=None,
+             load=None,
+             count=True,
              **kwargs):
-        query = self._get_query(include, filters, sort)
+        """Return a (possibly empty) list of `model_class` results
+
+        :param pagination: An optional dict with `size` and `offset` keys, or
+        with `size` and `after` keys, where `after` is the ID of the last entry
+        of the previous page. Pages that are found by `after` (keyset
+        pagination) take the same time to fetch, no matter how deep they are
+        :param count: Whether to count the total number of entries when
+        paginating (the total is None otherwise)
+        """
+        after = (pagination or {}).get('after')
+        if after is not None:
+            sort = self._get_unique_sort(sort)
+            query, params = self._get_query(include, filters, sort, load, seek=True)
+            params.update(self._get_seek_params(sort, self.get(after)))
+        else:
+            query, params = self._get_query(include, filters, sort, load)
 
-        results, total, size, offset = self._paginate(query, pagination)
+        results, total, size, offset = self._paginate(query, params, pagination, count)
 
         return ListResult(
             dict(total=total, size=size, offset=offset),
@@ -100,10 +163,22 @@ class SQLAlchemyModelAPI(api.ModelAPI):
              include=None,
              filters=None,
              sort=None,
+             load=None,
+             chunk_size=None,
              **kwargs):
         """Return a (possibly empty) list of `model_class` results
+
+        :param chunk_size: When set, the results are fetched in chunks of this
+        size (using keyset pagination), so only a single chunk is held in
+        memory at a time, and no read is left open in between chunks
         """
-        return iter(self._get_query(include, filters, sort))
+        if not chunk_size:
+            return iter(self._run(*self._get_query(include, filters, sort, load)))
+        if include:
+            raise exceptions.StorageError(
+                'Only whole {0} instances can be fetched in chunks'
+                .format(self.model_cls.__name__))
+        return self._iter_chunks(filters, sort, load, chunk_size)
 
     def put(self, entry, **kwargs):
         """Create a `model_class` instance from a serializable `model` object
@@ -113,18 +188,66 @@ class SQLAlchemyModelAPI(api.ModelAPI):
         of `model_class` (might also my just an instance of `model_class`)
         :return: An instance of `model_class`
         """
+        self._invalidate(entry)
         self._session.add(entry)
         self._safe_commit()
         return entry
 
+    def put_many(self, entries, **kwargs):
+        """Add several instances to the DB session, and commit them in a single
+        transaction. The rows are written in a single flush, in which statements
+        of the same kind are batched (`executemany`) where possible
+
+        :param entries: Instances of `model_class`
+        :return: The stored instances
+        """
+        for entry in entries:
+            self._invalidate(entry)
+        self._session.add_all(entries)
+        self._safe_commit()
+        return entries
+
     def delete(self, entry, **kwargs):
         """Delete a single result based on the model class and element ID
         """
+        self._invalidate(entry)
         self._load_relationships(entry)
         self._session.delete(entry)
         self._safe_commit()
         return entry
 
+    def delete_many(self, entries, bulk=False, **kwargs):
+        """Delete several instances, and commit in a single transaction
+
+        :param bulk: If set, the rows are removed by a single statement, without
+        cascading the deletion to related instances nor removing association
+        rows. Only use it for instances which have neither.
+        :return: The deleted instances
+        """
+        for entry in entries:
+            self._invalidate(entry)
+        if bulk:
+            id_column_name = self.model_cls.id_column_name()
+            ids = [getattr(entry, id_column_name) for entry in entries]
+            id_column = getattr(self.model_cls, id_column_name)
+            # Stays below SQLite's limit of variables in a statement
+            for i in xrange(0, len(ids), _MAX_VARIABLES):
+                self._session.query(self.model_cls) \
+                    .filter(id_column.in_(ids[i:i + _MAX_VARIABLES])) \
+                    .delete(synchronize_session=False)
+            for entry in entries:
+                self._session.expunge(entry)
+        else:
+            for entry in entries:
+                # Unlike `delete`, only the collections are loaded (which the deletion may cascade
+                # to, or remove association rows of), rather than a query per related instance
+                for rel in entry.__mapper__.relationships:
+                    if rel.uselist:
+                        getattr(entry, rel.key)
+                self._session.delete(entry)
+        self._safe_commit()
+        return entries
+
     def update(self, entry, **kwargs):
         """Add `instance` to the DB session, and attempt to commit
 
@@ -132,6 +255,14 @@ class SQLAlchemyModelAPI(api.ModelAPI):
         """
         return self.put(entry)
 
+    def update_many(self, entries, **kwargs):
+        """Add several instances to the DB session, and commit them in a single
+        transaction
+
+        :return: The updated instances
+        """
+        return self.put_many(entries)
+
     def refresh(self, entry):
         """Reload the instance with fresh information from the DB
 
@@ -142,6 +273,45 @@ class SQLAlchemyModelAPI(api.ModelAPI):
         self._load_relationships(entry)
         return entry
 
+    def _revalidate(self, cached):
+        """Return the cached instance if it still matches its row, or None.
+        An instance which was not expired is returned as is, same as a query
+        would (the session keeps a single instance per row). An expired
+        instance of a versioned model is restored from its snapshot if the
+        version of its row is unchanged, which takes a single column query
+        """
+        instance = cached.instance
+        state = orm.attributes.instance_state(instance)
+        if state.deleted or state.detached or \
+                orm.object_session(instance) is not self._session():
+            return None
+        if not state.expired_attributes:
+            return instance
+        if cached.version is None:
+            return None
+
+        version_column = self.model_cls.__mapper__.version_id_col
+        version = self._session.query(version_column) \
+            .filter(self.model_cls.id == cached.id).scalar()
+        if version != cached.version:
+            return None
+        keys = [key for key in state.expired_attributes if key in cached.snapshot]
+        for key in keys:
+            orm.attributes.set_committed_value(instance, key, _copy(cached.snapshot[key]))
+        # Let the attribute listeners (e.g. mutable types) know, as if the
+        # instance was refreshed by a query
+        state.manager.dispatch.refresh(state, None, keys)
+        return instance
+
+    def _invalidate(self, entry):
+        if self._cache is None:
+            return
+        # The identity of the instance is read from its state, so an expired
+        # instance is not loaded just to be invalidated
+        identity = orm.attributes.instance_state(entry).identity
+        if identity:
+            self._cache.pop((self.model_cls, identity[0]))
+
     def _destroy_connection(self):
         pass
 
@@ -156,6 +326,40 @@ class SQLAlchemyModelAPI(api.ModelAPI):
             # created at runtime).
             self.model_cls.metadata.create_all(bind=self._engine, checkfirst=checkfirst)
 
+        if checkfirst:
+            self._upgrade_indexes()
+
+    def _upgrade_indexes(self):
+        """Create the declared indexes which are missing from existing tables,
+        upgrading the SQLite db of an older version in place. The db keeps a
+        digest of the declared indexes (as its `user_version`), so the tables
+        are only inspected once after the declared indexes change
+        """
+        if self._engine.dialect.name != 'sqlite':
+            return
+        metadata = self.model_cls.metadata
+        digest = _get_indexes_digest(metadata)
+        with self._engine.connect() as connection:
+            if connection.execute('PRAGMA user_version').scalar() == digest:
+                return
+            inspector = inspect(connection)
+            existing_tables = set(inspector.get_table_names())
+            for table in metadata.sorted_tables:
+                if table.name not in existing_tables:
+                    continue
+                existing = set(index['name'] for index in inspector.get_indexes(table.name))
+                for index in table.indexes:
+                    if index.name in existing:
+                        continue
+                    try:
+                        index.create(connection)
+                    except SQLAlchemyError:
+                        # Another process might have created it in the meantime
+                        if index.name not in set(
+                                i['name'] for i in inspect(connection).get_indexes(table.name)):
+                            raise
+            connection.execute('PRAGMA user_version = {0}'.format(digest))
+
     def drop(self):
         """
         Drop the table from the storage.
@@ -234,103 +438,190 @@ class SQLAlchemyModelAPI(api.ModelAPI):
                 query = query.order_by(column)
         return query
 
-    def _filter_query(self, query, filters):
-        """Add filter clauses to the query
-
-        :param query: Base SQL query
-        :param filters: An optional dictionary where keys are column names to
-        filter by, and values are values applicable for those columns (or lists
-        of such values)
-        :return: An SQLAlchemy AppenderQuery object
-        """
-        return self._add_value_filter(query, filters)
-
-    @staticmethod
-    def _add_value_filter(query, filters):
-        for column, value in filters.items():
-            if isinstance(value, dict):
-                for predicate, operand in value.items():
-                    query = query.filter(getattr(column, predicate)(operand))
-            elif isinstance(value, (list, tuple)):
-                query = query.filter(column.in_(value))
-            else:
-                query = query.filter(column == value)
-
-        return query
-
     def _get_query(self,
                    include=None,
                    filters=None,
-                   sort=None):
-        """Get an SQL query object based on the params passed
+                   sort=None,
+                   load=None,
+                   seek=False):
+        """Get a baked SQL query based on the params passed, along with the
+        values to bind to its parameters. A query is built and compiled once
+        for each shape of the params (the included columns, the filtered
+        columns and their predicates, the sort and the loaded relationships),
+        only the values of the filters vary between calls
 
-        :param model_class: SQL DB table class
         :param include: An optional list of columns to include in the query
         :param filters: An optional dictionary where keys are column names to
         filter by, and values are values applicable for those columns (or lists
         of such values)
         :param sort: An optional dictionary where keys are column names to
         sort by, and values are the order (asc/desc)
-        :return: A sorted and filtered query with only the relevant
-        columns
+        :param load: An optional list of relationship paths (e.g.
+        `outbound_relationships.target_node`) to load along with the results
+        :param seek: Whether to match only the entries that come after the
+        entry whose values are given by `_get_seek_params` (`sort` must be
+        unique, see `_get_unique_sort`)
+        :return: A tuple of a `BakedQuery` of a sorted and filtered query with
+        only the relevant columns, and a dictionary of its parameters
         """
-        include, filters, sort, joins = self._get_joins_and_converted_columns(
-            include, filters, sort
-        )
-        filters = self._convert_operands(filters)
+        if include and load:
+            raise exceptions.StorageError(
+                'Relationships can only be loaded along with whole {0} instances'
+                .format(self.model_cls.__name__))
+        include = tuple(include or ())
+        filters, params = self._get_filters_shape(filters or {})
+        sort = tuple((sort or OrderedDict()).items())
+        load = tuple(load or ())
+
+        query = _bakery(lambda session: self._build_query(include, filters, sort, load, seek),
+                        self.model_cls, include, filters, sort, load, seek)
+        if any(kind == 'instance' for _, kind, _ in filters):
+            # Instances are part of the query itself, so it is built for each call
+            query.spoil(full=True)
+        return query, params
+
+    def _build_query(self, include, filters, sort, load, seek):
+        """Build the query of a shape returned by `_get_query`, with bound
+        parameters in place of the filter values
+        """
+        all_columns = set(include) | set(f[0] for f in filters) | set(c for c, _ in sort)
+        joins = self._get_joins(self.model_cls, all_columns)
 
-        query = self._get_base_query(include, joins)
-        query = self._filter_query(query, filters)
-        query = self._sort_query(query, sort)
+        query = self._get_base_query([self._get_column(c) for c in include], joins)
+        for column_name, kind, operands in filters:
+            query = query.filter(
+                self._get_filter_condition(self._get_column(column_name), kind, operands))
+        query = self._sort_query(
+            query, OrderedDict((self._get_column(c), order) for c, order in sort))
+        if seek:
+            query = query.filter(self._get_seek_condition(sort))
+        if load:
+            query = query.options(*self._get_load_options(load))
         return query
 
-    @staticmethod
-    def _convert_operands(filters):
-        for column, conditions in filters.items():
-            if isinstance(conditions, dict):
-                for predicate, operand in conditions.items():
+    def _run(self, query, params):
+        """Get the results of a baked query, given the values of its parameters
+        """
+        return query(self._session()).params(**params)
+
+    def _get_load_options(self, load):
+        """Convert relationship paths to eager loading options. Each relationship
+        in a path is loaded in the same query as its parent if it is a
+        many-to-one relationship, and in a single additional query otherwise
+
+        :param load: A list of relationship paths (dot separated relationship
+        names, starting at the model class)
+        :return: A list of SQLAlchemy loader options
+        """
+        options = []
+        for path in load:
+            option = orm
+            model_cls = self.model_cls
+            for key in path.split('.'):
+                relationships = model_cls.__mapper__.relationships
+                if key not in relationships:
+                    raise exceptions.StorageError(
+                        '{0} has no relationship `{1}` (in `{2}`)'
+                        .format(model_cls.__name__, key, path))
+                rel = relationships[key]
+                strategy = 'subqueryload' if rel.uselist else 'joinedload'
+                option = getattr(option, strategy)(getattr(model_cls, key))
+                model_cls = rel.mapper.class_
+            options.append(option)
+        return options
+
+    def _get_filters_shape(self, filters):
+        """Split the filters to their shape, which is a tuple of (column name,
+        kind, parameter names) triplets, and the values of the parameters.
+        Relationships are compared to instances, which are kept in the shape
+        """
+        shape = []
+        params = {}
+        for index, column_name in enumerate(sorted(filters)):
+            value = filters[column_name]
+            name = 'filter_{0}'.format(index)
+            if isinstance(value, dict):
+                operands = []
+                for predicate in sorted(value):
                     if predicate not in _predicates:
                         raise exceptions.StorageError(
                             "{0} is not a valid predicate for filtering. Valid predicates are {1}"
                             .format(predicate, ', '.join(_predicates.keys())))
-                    del filters[column][predicate]
-                    filters[column][_predicates[predicate]] = operand
-
+                    operand = value[predicate]
+                    if operand is None:
+                        operands.append((predicate, None))
+                    else:
+                        param = '{0}_{1}'.format(name, predicate)
+                        params[param] = operand
+                        operands.append((predicate, param))
+                shape.append((column_name, 'predicates', tuple(operands)))
+            elif isinstance(value, (list, tuple)):
+                names = tuple('{0}_{1}'.format(name, i) for i in range(len(value)))
+                params.update(zip(names, value))
+                shape.append((column_name, 'in', names))
+            elif value is None:
+                shape.append((column_name, 'null', None))
+            elif isinstance(getattr(getattr(self.model_cls, column_name), 'property', None),
+                            orm.RelationshipProperty):
+                shape.append((column_name, 'instance', value))
+            else:
+                params[name] = value
+                shape.append((column_name, 'eq', name))
+        return tuple(shape), params
 
-        return filters
+    @staticmethod
+    def _get_filter_condition(column, kind, operands):
+        if kind == 'predicates':
+            return and_(*(getattr(column, _predicates[predicate])(
+                None if param is None else _bind(param, column))
+                          for predicate, param in operands))
+        elif kind == 'in':
+            return column.in_([_bind(param, column) for param in operands])
+        elif kind == 'null':
+            return column.is_(None)
+        elif kind == 'instance':
+            return column == operands
+        return column == _bind(operands, column)
 
-    def _get_joins_and_converted_columns(self,
-                                         include,
-                                         filters,
-                                         sort):
-        """Get a list of tables on which we need to join and the converted
-        `include`, `filters` and `sort` arguments (converted to actual SQLA
-        column/label objects instead of column names)
+    @staticmethod
+    def _get_unique_sort(sort):
+        """Add the ID as the last sort key, so that the order of the entries
+        is total, as required by keyset pagination
         """
-        include = include or []
-        filters = filters or dict()
-        sort = sort or OrderedDict()
-
-        all_columns = set(include) | set(filters.keys()) | set(sort.keys())
-        joins = self._get_joins(self.model_cls, all_columns)
+        sort = OrderedDict(sort or ())
+        sort.setdefault('id', 'asc')
+        return sort
 
-        include, filters, sort = self._get_columns_from_field_names(
-            include, filters, sort
-        )
-        return include, filters, sort, joins
+    def _get_seek_condition(self, sort):
+        """Get a condition which matches the entries that come after the last
+        entry of the previous chunk or page (whose values are bound by
+        `_get_seek_params`), in the (total) order given by `sort`. Sort keys
+        must not be null.
 
-    def _get_columns_from_field_names(self,
-                                      include,
-                                      filters,
-                                      sort):
-        """Go over the optional parameters (include, filters, sort), and
-        replace column names with actual SQLA column objects
+        :param sort: A sequence of (column name, order) pairs to sort by
         """
-        include = [self._get_column(c) for c in include]
-        filters = dict((self._get_column(c), filters[c]) for c in filters)
-        sort = OrderedDict((self._get_column(c), sort[c]) for c in sort)
+        clauses = []
+        previous = []
+        for index, (column_name, order) in enumerate(sort):
+            column = self._get_column(column_name)
+            # Association proxies are labeled, the condition is on the labeled column
+            column = column.element if isinstance(column, Label) else column
+            value = _bind('seek_{0}'.format(index), column)
+            following = column < value if order == 'desc' else column > value
+            clauses.append(and_(*(previous + [following])))
+            previous.append(column == value)
+        return or_(*clauses)
+
+    @staticmethod
+    def _get_seek_params(sort, last):
+        """Get the values of the parameters of `_get_seek_condition`
 
-        return include, filters, sort
+        :param sort: An ordered dictionary where keys are column names to sort
+        by, and values are the order (asc/desc)
+        :param last: The last entry of the previous chunk or page
+        """
+        return dict(('seek_{0}'.format(index), getattr(last, column_name))
+                    for index, column_name in enumerate(sort))
 
     def _get_column(self, column_name):
         """Return the column on which an action (filtering, sorting, etc.)
@@ -348,26 +639,41 @@ class SQLAlchemyModelAPI(api.ModelAPI):
             # Put a label on the remote attribute with the name of the column
             return column.remote_attr.label(column_name)
 
-    @staticmethod
-    def _paginate(query, pagination):
+    def _iter_chunks(self, filters, sort, load, chunk_size):
+        sort = self._get_unique_sort(sort)
+        query, params = self._get_query(filters=filters, sort=sort, load=load)
+        params['limit'] = chunk_size
+        while True:
+            chunk = self._run(query.with_criteria(_limit), params).all()
+            for instance in chunk:
+                yield instance
+            if len(chunk) < chunk_size:
+                return
+            query, _ = self._get_query(filters=filters, sort=sort, load=load, seek=True)
+            params.update(self._get_seek_params(sort, chunk[-1]))
+
+    def _paginate(self, query, params, pagination, count=True):
         """Paginate the query by size and offset
 
-        :param query: Current SQLAlchemy query object
+        :param query: Current baked query
+        :param params: The parameters of the query
         :param pagination: An optional dict with size and offset keys
+        :param count: Whether to count the total number of items
         :return: A tuple with four elements:
         - res ults: `size` items starting from `offset`
-        - the total count of items
+        - the total count of items (None if not counted)
         - `size` [default: 0]
         - `offset` [default: 0]
         """
         if pagination:
             size = pagination.get('size', 0)
             offset = pagination.get('offset', 0)
-            total = query.order_by(None).count()  # Fastest way to count
-            results = query.limit(size).offset(offset).all()
+            total = self._run(query.with_criteria(_count), params).scalar() if count else None
+            results = self._run(query.with_criteria(_limit_and_offset),
+                                dict(params, limit=size, offset=offset)).all()
             return results, total, size, offset
         else:
-            results = query.all()
+            results = self._run(query, params).all()
             return results, len(results), 0, 0
 
     @staticmethod
@@ -379,15 +685,25 @@ class SQLAlchemyModelAPI(api.ModelAPI):
             getattr(instance, rel.key)
 
 
-def init_storage(base_dir, filename='db.sqlite'):
+def init_storage(base_dir, filename='db.sqlite', journal_mode=None, synchronous=None,
+                 busy_timeout=None, cache_size=None):
     """
     A builtin ModelStorage initiator.
     Creates a sqlalchemy engine and a session to be passed to the mapi.
 
     Initiator_kwargs must be passed to the ModelStorage which must hold the base_dir for the
     location of the db file, and an option filename. This would create an sqlite db.
+    The rest of the initiator kwargs tune the db for concurrent access (see
+    ``CONCURRENT_WRITERS_PROFILE``).
     :param base_dir: the dir of the db
     :param filename: the db file name.
+    :param journal_mode: sqlite journal mode (e.g. ``wal``, which lets readers work alongside a
+                         writer)
+    :param synchronous: sqlite synchronous level (``off``, ``normal``, ``full`` or ``extra``)
+    :param busy_timeout: time (in seconds) to wait for a lock held by another connection before
+                         failing
+    :param cache_size: if set, the instances fetched by ``get`` are cached (see ``ModelCache``),
+                       holding up to this number of instances
     :return:
     """
     uri = 'sqlite:///{platform_char}{path}'.format(
@@ -397,11 +713,28 @@ def init_storage(base_dir, filename='db.sqlite'):
 
         path=os.path.join(base_dir, filename))
 
-    engine = create_engine(uri)
+    engine_kwargs = {}
+    if busy_timeout is not None:
+        engine_kwargs['connect_args'] = {'timeout': busy_timeout}
+    engine = create_engine(uri, **engine_kwargs)
+
+    pragmas = [('journal_mode', journal_mode), ('synchronous', synchronous)]
+    pragmas = ['PRAGMA {0}={1}'.format(name, value) for name, value in pragmas if value]
+    if pragmas:
+        def set_pragmas(dbapi_connection, _):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+        event.listen(engine, 'connect', set_pragmas)
+
     session_factory = orm.sessionmaker(bind=engine)
     session = orm.scoped_session(session_factory=session_factory)
 
-    return dict(engine=engine, session=session)
+    api_kwargs = dict(engine=engine, session=session)
+    if cache_size:
+        api_kwargs['cache'] = ModelCache(maxsize=cache_size)
+    return api_kwargs
 
 
 class ListResult(list):
@@ -412,3 +745,106 @@ class ListResult(list):
         super(ListResult, self).__init__(*args, **qwargs)
         self.metadata = metadata
         self.items = self
+
+
+class ModelCache(object):
+    """
+    A process local, least recently used cache of model instances, keyed by
+    (model class, ID). Each entry is validated whenever it is looked up, and
+    entries are dropped when their instances are stored or deleted through
+    the model API
+    """
+    def __init__(self, maxsize=1024):
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key, validate):
+        """Return the value cached under `key` if `validate(entry)` returns it,
+        otherwise drop the entry and return None
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        # Validation may query the db, so it is done without holding the lock
+        value = validate(entry) if entry is not None else None
+        with self._lock:
+            if value is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._entries[key] = entry
+            return value
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = 0
+
+    def cache_info(self):
+        """The hits, misses and size of the cache, as a `CacheInfo`
+        """
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._maxsize, len(self._entries))
+
+
+class _CachedInstance(object):
+    """
+    A cached instance, along with a snapshot of its columns if its model is
+    versioned
+    """
+    def __init__(self, instance):
+        self.instance = instance
+        self.id = instance.id
+        self.version = None
+        self.snapshot = None
+        mapper = instance.__mapper__
+        if mapper.version_id_col is not None:
+            state_dict = orm.attributes.instance_dict(instance)
+            self.snapshot = dict((attr.key, _copy(state_dict[attr.key]))
+                                 for attr in mapper.column_attrs if attr.key in state_dict)
+            self.version = self.snapshot.get(
+                mapper.get_property_by_column(mapper.version_id_col).key)
+
+
+def _copy(value):
+    # Column values are either immutable, or (json like) dicts and lists
+    if isinstance(value, dict):
+        return dict((k, _copy(v)) for k, v in value.items())
+    elif isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+def _get_indexes_digest(metadata):
+    names = sorted(index.name for table in metadata.tables.values() for index in table.indexes)
+    return zlib.crc32(','.join(names)) & 0x7fffffff
+
+
+def _bind(name, column):
+    return bindparam(name, type_=column.type)
+
+
+def _limit(query):
+    return query.limit(bindparam('limit'))
+
+
+def _limit_and_offset(query):
+    return query.limit(bindparam('limit')).offset(bindparam('offset'))
+
+
+def _count(query):
+    # Counting is faster without sorting
+    return query.order_by(None).from_self(func.count(literal_column('*')))
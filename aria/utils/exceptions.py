@@ -108,9 +108,26 @@ class _WrappedException(Exception):
         self.exception_str = exception_str
 
 
-def wrap_if_needed(exception):
+def wrap_if_needed(exception, serializer=jsonpickle):
     try:
-        jsonpickle.loads(jsonpickle.dumps(exception))
+        serializer.loads(serializer.dumps(exception))
         return exception
     except BaseException:
         return _WrappedException(type(exception).__name__, str(exception))
+
+
+def dump_exception(exception, serializer=jsonpickle):
+    """
+    Serializes the exception on its own, along with what is needed to wrap it where it cannot be
+    deserialized (see :func:`load_exception`)
+    """
+    exception = wrap_if_needed(exception, serializer)
+    return serializer.dumps(exception), type(exception).__name__, str(exception)
+
+
+def load_exception(dumped_exception, serializer=jsonpickle):
+    data, exception_type, exception_str = dumped_exception
+    try:
+        return serializer.loads(data)
+    except BaseException:
+        return _WrappedException(exception_type, exception_str)
@@ -0,0 +1,91 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmarks the encoding and decoding time, and the size, of the tracked changes messages of the
+process executor, with each serializer::
+
+    python benchmarks/executor_serializers.py [--rounds ROUNDS]
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import timeit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Nodes count, runtime properties count
+MESSAGES = ((1, 10), (10, 100), (50, 100))
+
+sys.path.insert(0, ROOT_DIR)
+
+# pylint: disable=wrong-import-position
+from aria.orchestrator.workflows.executor import serialization
+from aria.storage import instrumentation
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=10)
+    args = parser.parse_args()
+
+    for nodes_count, properties_count in MESSAGES:
+        run(nodes_count, properties_count, args.rounds)
+
+
+def run(nodes_count, properties_count, rounds):
+    message = _message(nodes_count=nodes_count, properties_count=properties_count)
+    diffed_message = dict(message, tracked_changes=instrumentation.diff_tracked_changes(
+        message['tracked_changes']))
+    print 'tracked changes of {0} nodes with {1} runtime properties each:'.format(
+        nodes_count, properties_count)
+    for serializer in (serialization.PickleSerializer(), serialization.JsonPickleSerializer()):
+        for name, payload in (('values', message), ('patches', diffed_message)):
+            data = serializer.dumps(payload)
+            encode_time = _measure(lambda: serializer.dumps(payload), rounds)
+            decode_time = _measure(lambda: serializer.loads(data), rounds)
+            print '  {0:<22} {1:<8} encode: {2:8.3f}ms  decode: {3:8.3f}ms  size: {4:9} ' \
+                  'bytes'.format(serializer.__class__.__name__, name, encode_time * 1000,
+                                 decode_time * 1000, len(data))
+
+
+def _message(nodes_count, properties_count):
+    tracked_changes = {'node': {}}
+    for node_id in range(nodes_count):
+        initial = dict(('property_{0}'.format(i), {'value': i, 'host': 'host_{0}'.format(i)})
+                       for i in range(properties_count))
+        current = dict(initial, ip='10.0.0.{0}'.format(node_id), ready=True)
+        tracked_changes['node'][node_id] = {
+            'runtime_properties': instrumentation._Value(initial, current),
+            'state': instrumentation._Value('creating', 'started'),
+            'version': instrumentation._Value(1, 1),
+            'updated_at': instrumentation._Value(None, datetime.datetime(2017, 1, 1, 12, 0)),
+        }
+    return {
+        'type': 'apply_tracked_changes',
+        'task_id': os.getpid(),
+        'exception': None,
+        'traceback': None,
+        'tracked_changes': tracked_changes
+    }
+
+
+def _measure(func, rounds, repeat=3):
+    return min(timeit.repeat(func, repeat=repeat, number=rounds)) / rounds
+
+
+if __name__ == '__main__':
+    main()
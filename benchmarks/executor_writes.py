@@ -0,0 +1,134 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmarks the throughput of process executor tasks that commit often, when their changes are
+applied by the executor and when they are written by the tasks directly::
+
+    python benchmarks/executor_writes.py [--tasks TASKS] [--commits COMMITS] [--workers WORKERS]
+
+The operations are those of the direct writes tests, so the test requirements must be installed.
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT_DIR)
+
+# pylint: disable=wrong-import-position
+from aria import logger as aria_logger
+from aria.orchestrator.context.workflow import WorkflowContext
+from aria.orchestrator.workflows.executor import process
+from aria.storage import sql_mapi
+
+from tests import mock, storage
+from tests.orchestrator.workflows.executor.test_process_executor_direct_writes import (
+    _commit_often,
+    _dependency_node,
+    _run_workflow
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=8)
+    parser.add_argument('--commits', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    print '{0} tasks, {1} commits each, {2} workers:'.format(args.tasks, args.commits,
+                                                            args.workers)
+    for name, direct_writes, initiator_kwargs in (
+            ('through executor', False, None),
+            ('direct (wal)', True, sql_mapi.CONCURRENT_WRITERS_PROFILE)):
+        base_dir = tempfile.mkdtemp()
+        try:
+            duration = run(base_dir, direct_writes, initiator_kwargs, args.tasks, args.commits,
+                           args.workers)
+        finally:
+            shutil.rmtree(base_dir)
+        print '  {0:<18} {1:8.3f}s  {2:8.1f} commits/s'.format(
+            name, duration, args.tasks * args.commits / duration)
+
+
+def run(base_dir, direct_writes, initiator_kwargs, tasks_count, commits_count, workers_count):
+    context = mock.context.simple(base_dir, initiator_kwargs=initiator_kwargs)
+    executor = process.ProcessExecutor(python_path=[ROOT_DIR], pool_size=workers_count,
+                                       direct_writes=direct_writes)
+    try:
+        nodes = _create_nodes(context, tasks_count)
+        # The first run starts the workers, the second measures the tasks' overhead
+        durations = [_measure(lambda: _run_workflow(_new_execution(context), executor,
+                                                    _commit_often, nodes=nodes,
+                                                    inputs={'commits': commits}))
+                     for commits in (0, 0, commits_count)]
+        for node in nodes:
+            assert len(context.model.node.get(node.id).runtime_properties) == commits_count
+        return durations[2] - durations[1]
+    finally:
+        executor.close()
+        _close_task_logger()
+        storage.release_sqlite_storage(context.model)
+
+
+def _new_execution(context):
+    execution = mock.models.create_execution(context.service)
+    context.model.execution.put(execution)
+    return WorkflowContext(name='benchmark_context',
+                           model_storage=context.model,
+                           resource_storage=context.resource,
+                           service_id=context.service.id,
+                           workflow_name=mock.models.WORKFLOW_NAME,
+                           execution_id=execution.id,
+                           task_max_attempts=mock.models.TASK_MAX_ATTEMPTS,
+                           task_retry_interval=mock.models.TASK_RETRY_INTERVAL)
+
+
+def _create_nodes(context, count):
+    dependency_node = _dependency_node(context)
+    nodes = []
+    for i in range(count):
+        node = mock.models.create_node(dependency_node.node_template,
+                                       dependency_node.service,
+                                       name='benchmark_node_{0}'.format(i))
+        context.model.node.put(node)
+        nodes.append(node)
+    return nodes
+
+
+def _close_task_logger():
+    # The task logger keeps the log handler of the first context, which writes to this storage
+    aria_logger.flush_task_logs()
+    task_logger = logging.getLogger(aria_logger.TASK_LOGGER_NAME)
+    for handler in task_logger.handlers[:]:
+        task_logger.removeHandler(handler)
+        handler.close()
+
+
+def _measure(func):
+    start = time.time()
+    func()
+    return time.time() - start
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmarks reading the logs of an execution from a db of an older version, before and after
+upgrading it (which creates the missing indexes)::
+
+    python benchmarks/log_indexes.py [--logs LOGS] [--executions EXECUTIONS]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import timeit
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UPGRADED_INDEXES = ('ix_log_execution_fk', 'ix_task_execution_fk_status', 'ix_task_status',
+                    'ix_node_service_fk', 'ix_node_node_template_fk')
+INSERT_BATCH_SIZE = 10000
+
+sys.path.insert(0, ROOT_DIR)
+
+# pylint: disable=wrong-import-position
+from aria import application_model_storage
+from aria.modeling import models
+from aria.storage import sql_mapi
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--logs', type=int, default=1000000)
+    parser.add_argument('--executions', type=int, default=100)
+    args = parser.parse_args()
+
+    base_dir = tempfile.mkdtemp()
+    try:
+        run(base_dir, args.logs, args.executions)
+    finally:
+        shutil.rmtree(base_dir)
+
+
+def run(base_dir, logs_count, executions_count):
+    storage = _storage(base_dir)
+    _downgrade(storage)
+    logs_per_execution = logs_count / executions_count
+    created_at = datetime.utcnow()
+    with storage._all_api_kwargs['engine'].begin() as connection:
+        for start in xrange(0, logs_count, INSERT_BATCH_SIZE):
+            connection.execute(models.Log.__table__.insert(), [
+                dict(execution_fk=i / logs_per_execution, level='INFO', msg='message',
+                     created_at=created_at, name='aria.executions.task')
+                for i in xrange(start, min(start + INSERT_BATCH_SIZE, logs_count))])
+    execution_id = executions_count / 2
+    last_log_id = (execution_id + 1) * logs_per_execution
+
+    def list_logs():
+        # The first page of the logs of an execution, along with their count
+        storage.log.list(filters=dict(execution_fk=execution_id), pagination=dict(size=100))
+
+    def follow_logs():
+        # Polling for new logs of an execution, the way ModelLogIterator does
+        list(storage.log.iter(filters=dict(execution_fk=execution_id, id=dict(gt=last_log_id))))
+
+    print '{0} logs of {1} executions:'.format(logs_count, executions_count)
+    for name, measured in (('list logs', list_logs), ('follow logs', follow_logs)):
+        print '  {0:<12} before upgrade: {1:9.3f}ms'.format(name, _measure(measured) * 1000)
+    _close(storage)
+
+    started_at = time.time()
+    storage = _storage(base_dir)
+    print '  upgrade: {0:.3f}s'.format(time.time() - started_at)
+    for name, measured in (('list logs', list_logs), ('follow logs', follow_logs)):
+        print '  {0:<12} after upgrade:  {1:9.3f}ms'.format(name, _measure(measured) * 1000)
+    _close(storage)
+
+
+def _storage(base_dir):
+    return application_model_storage(sql_mapi.SQLAlchemyModelAPI,
+                                     initiator_kwargs=dict(base_dir=base_dir))
+
+
+def _downgrade(storage):
+    # As if the db was created before the indexes were declared
+    engine = storage._all_api_kwargs['engine']
+    for index_name in UPGRADED_INDEXES:
+        engine.execute('DROP INDEX {0}'.format(index_name))
+    engine.execute('PRAGMA user_version = 0')
+
+
+def _close(storage):
+    storage._all_api_kwargs['session'].close()
+    storage._all_api_kwargs['engine'].dispose()
+
+
+def _measure(func, repeat=3, number=5):
+    return min(timeit.repeat(func, repeat=repeat, number=number)) / number
+
+
+if __name__ == '__main__':
+    main()
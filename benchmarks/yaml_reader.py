@@ -0,0 +1,100 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmarks the YAML reader over the TOSCA Simple Profile use cases.
+
+Every document is read (from memory) and its locators are linked, as the presenters do. Each
+reader mode runs in its own process, so that its peak memory can be reported::
+
+    python benchmarks/yaml_reader.py [--rounds ROUNDS] [--mode fast|pure]
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+USE_CASES_DIR = os.path.join(ROOT_DIR, 'examples', 'tosca-simple-1.0', 'use-cases')
+MODES = ('pure', 'fast')
+
+sys.path.insert(0, ROOT_DIR)
+
+# pylint: disable=wrong-import-position
+from aria.parser.loading import UriLocation, LiteralLoader, LiteralLocation
+from aria.parser.reading import YamlReader
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--mode', choices=MODES)
+    args = parser.parse_args()
+
+    if args.mode is not None:
+        run(args.mode, args.rounds)
+    else:
+        for mode in MODES:
+            subprocess.check_call([sys.executable, __file__, '--mode', mode,
+                                   '--rounds', str(args.rounds)])
+
+
+def run(mode, rounds):
+    documents = _load_documents()
+    size = sum(len(data.encode('utf-8')) for _, data in documents)
+    lines = sum(data.count('\n') for _, data in documents)
+    YamlReader.fast = mode == 'fast'
+    base_rss = _max_rss()
+
+    start = time.time()
+    for _ in xrange(rounds):
+        for path, data in documents:
+            reader = YamlReader(None, UriLocation(path), LiteralLoader(LiteralLocation(data)))
+            raw = reader.read()
+            locator = raw._locator
+            delattr(raw, '_locator')
+            locator.link(raw)
+    elapsed = time.time() - start
+
+    print '{0}: {1} documents ({2} lines, {3:.1f} KiB) x {4} rounds in {5:.2f}s: ' \
+          '{6:.0f} documents/s, {7:.0f} lines/s, {8:.2f} MiB/s, ' \
+          'peak memory +{9:.1f} MiB'.format(mode, len(documents), lines, size / 1024.0, rounds,
+                                            elapsed, len(documents) * rounds / elapsed,
+                                            lines * rounds / elapsed,
+                                            size * rounds / elapsed / (1024 * 1024),
+                                            (_max_rss() - base_rss) / 1024.0)
+
+
+def _load_documents():
+    documents = []
+    for dir_path, _, file_names in os.walk(USE_CASES_DIR):
+        for file_name in sorted(file_names):
+            if file_name.endswith('.yaml'):
+                path = os.path.join(dir_path, file_name)
+                with open(path) as the_file:
+                    documents.append((path, the_file.read().decode('utf-8')))
+    return documents
+
+
+def _max_rss():
+    # In KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+if __name__ == '__main__':
+    main()
@@ -41,3 +41,8 @@ class ToscaSimpleNfvPresenter1_0(ToscaSimplePresenter1_0): # pylint: disable=inv
         if context.presentation.import_profile:
             return FrozenList([self.SIMPLE_PROFILE_FOR_NFV_LOCATION] + import_locations)
         return import_locations
+
+    @cachedmethod
+    def _get_profile_locations(self, context):
+        profile_locations = super(ToscaSimpleNfvPresenter1_0, self)._get_profile_locations(context)
+        return FrozenList([self.SIMPLE_PROFILE_FOR_NFV_LOCATION] + profile_locations)
@@ -76,6 +76,10 @@ class ToscaSimplePresenter1_0(Presenter): # pylint: disable=invalid-name
             import_locations += [self.SPECIAL_IMPORTS.get(i.file, i.file) for i in imports]
         return FrozenList(import_locations) if import_locations else EMPTY_READ_ONLY_LIST
 
+    @cachedmethod
+    def _get_profile_locations(self, context): # pylint: disable=unused-argument
+        return FrozenList([self.SIMPLE_PROFILE_LOCATION] + self.SPECIAL_IMPORTS.values())
+
     @cachedmethod
     def _get_model(self, context): # pylint: disable=no-self-use
         return create_service_template_model(context)
@@ -0,0 +1,41 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+from aria.cli import logger
+from aria.logger import logs_stored_signal
+
+
+class TestModelLogIterator(object):
+
+    def test_wait(self):
+        log_iterator = logger.ModelLogIterator(model_storage=None, execution_id=1)
+        assert not log_iterator.wait(timeout=0)
+        # Logs of other executions are ignored
+        logs_stored_signal.send(2)
+        assert not log_iterator.wait(timeout=0)
+        logs_stored_signal.send(1)
+        assert log_iterator.wait(timeout=0)
+        assert not log_iterator.wait(timeout=0)
+
+    def test_wait_wakes_up(self):
+        log_iterator = logger.ModelLogIterator(model_storage=None, execution_id=1)
+        timer = threading.Timer(0.1, logs_stored_signal.send, args=(1, ))
+        timer.start()
+        try:
+            assert log_iterator.wait(timeout=60)
+        finally:
+            timer.join()
@@ -16,6 +16,7 @@
 import pytest
 from mock import ANY, MagicMock
 
+from aria.cli.commands import node_templates
 from aria.cli.env import _Environment
 
 from .base_test import (  # pylint: disable=unused-import
@@ -105,7 +106,8 @@ class TestNodeTemplatesList(TestCliBase):
 
         node_templates_list = mock_storage.node_template.list
         node_templates_list.assert_called_once_with(sort={sort_by_in_output: order_in_output},
-                                                    filters={'service_template': ANY})
+                                                    filters={'service_template': ANY},
+                                                    load=node_templates.NODE_TEMPLATE_LOAD)
         assert 'Node templates:' in self.logger_output_string
         assert mock_models.SERVICE_TEMPLATE_NAME in self.logger_output_string
         assert mock_models.NODE_TEMPLATE_NAME in self.logger_output_string
@@ -127,7 +129,8 @@ class TestNodeTemplatesList(TestCliBase):
 
         node_templates_list = mock_storage.node_template.list
         node_templates_list.assert_called_once_with(sort={sort_by_in_output: order_in_output},
-                                                    filters={})
+                                                    filters={},
+                                                    load=node_templates.NODE_TEMPLATE_LOAD)
         assert 'Node templates:' in self.logger_output_string
         assert mock_models.SERVICE_TEMPLATE_NAME in self.logger_output_string
         assert mock_models.NODE_TEMPLATE_NAME in self.logger_output_string
@@ -16,6 +16,7 @@
 import pytest
 import mock
 
+from aria.cli.commands import nodes
 from aria.cli.env import _Environment
 
 from .base_test import (  # pylint: disable=unused-import
@@ -73,7 +74,8 @@ class TestNodesList(TestCliBase):
 
         nodes_list = mock_storage.node.list
         nodes_list.assert_called_once_with(sort={sort_by_in_output: order_in_output},
-                                           filters={'service': mock.ANY})
+                                           filters={'service': mock.ANY},
+                                           load=nodes.NODE_LOAD)
         assert 'Nodes:' in self.logger_output_string
         assert 'test_s' in self.logger_output_string
         assert 'test_n' in self.logger_output_string
@@ -95,7 +97,8 @@ class TestNodesList(TestCliBase):
 
         nodes_list = mock_storage.node.list
         nodes_list.assert_called_once_with(sort={sort_by_in_output: order_in_output},
-                                           filters={})
+                                           filters={},
+                                           load=nodes.NODE_LOAD)
         assert 'Nodes:' in self.logger_output_string
         assert 'test_s' in self.logger_output_string
         assert 'test_n' in self.logger_output_string
@@ -20,6 +20,7 @@ from aria.cli import service_template_utils, csar
 from aria.cli.env import _Environment
 from aria.core import Core
 from aria.exceptions import AriaException
+from aria.parser.loading import ImportStore, IMPORT_STORE
 from aria.storage import exceptions as storage_exceptions
 
 from .base_test import (  # pylint: disable=unused-import
@@ -131,6 +132,26 @@ class TestServiceTemplatesStore(TestCliBase):
         assert 'Service template {name} stored'.format(
             name=mock_models.SERVICE_TEMPLATE_NAME) in self.logger_output_string
 
+    def test_store_imports_bundle(self, monkeypatch, mock_object, tmpdir):
+
+        monkeypatch.setattr(Core, 'create_service_template', mock_object)
+        monkeypatch.setattr(service_template_utils, 'get', mock_object)
+        monkeypatch.setattr(ImportStore, 'add_bundle', mock_object)
+        bundle_path = tmpdir.join('imports.tar.gz')
+        bundle_path.write('')
+        self.invoke('service_templates store stubpath test_st --imports-bundle {0}'.format(
+            bundle_path))
+        assert 'Imports bundle {0} added to the import store'.format(bundle_path) \
+            in self.logger_output_string
+
+    def test_store_refresh_imports(self, monkeypatch, mock_object):
+
+        monkeypatch.setattr(Core, 'create_service_template', mock_object)
+        monkeypatch.setattr(service_template_utils, 'get', mock_object)
+        monkeypatch.setattr(IMPORT_STORE, 'refresh', False)
+        self.invoke('service_templates store stubpath test_st --refresh-imports')
+        assert IMPORT_STORE.refresh
+
     def test_store_raises_exception_resulting_from_name_uniqueness(self, monkeypatch, mock_object):
 
         monkeypatch.setattr(service_template_utils, 'get', mock_object)
@@ -232,6 +253,22 @@ class TestServiceTemplatesValidate(TestCliBase):
             expected_exception=AriaException)
 
 
+class TestServiceTemplatesLockImports(TestCliBase):
+
+    def test_header_string(self, monkeypatch, mock_storage):
+
+        monkeypatch.setattr(_Environment, 'model_storage', mock_storage)
+        self.invoke('service_templates lock_imports stubpath')
+        assert 'Locking the imports of service template stubpath...' in self.logger_output_string
+
+    def test_lock_imports_no_exception(self, monkeypatch):
+        monkeypatch.setattr(Core, 'lock_service_template_imports',
+                            lambda *args: 'stubpath.lock')
+        self.invoke('service_templates lock_imports stubpath stubbundle')
+        assert 'Imports locked at stubpath.lock' in self.logger_output_string
+        assert 'Imports bundle created at stubbundle' in self.logger_output_string
+
+
 class TestServiceTemplatesCreateArchive(TestCliBase):
 
     def test_header_string(self, monkeypatch, mock_storage):
@@ -38,7 +38,10 @@ def logging_handler_cleanup(request):
     :return:
     """
     def clear_logging_handlers():
-        logging.getLogger(logger.TASK_LOGGER_NAME).handlers = []
+        task_logger = logging.getLogger(logger.TASK_LOGGER_NAME)
+        for handler in task_logger.handlers:
+            handler.close()
+        task_logger.handlers = []
     request.addfinalizer(clear_logging_handlers)
 
 
@@ -27,9 +27,9 @@ from ..storage import init_inmemory_model_storage
 from .topology import create_simple_topology_two_nodes
 
 
-def simple(tmpdir, inmemory=False, context_kwargs=None, topology=None):
+def simple(tmpdir, inmemory=False, context_kwargs=None, topology=None, initiator_kwargs=None):
     initiator = init_inmemory_model_storage if inmemory else None
-    initiator_kwargs = {} if inmemory else dict(base_dir=tmpdir)
+    initiator_kwargs = {} if inmemory else dict(base_dir=tmpdir, **(initiator_kwargs or {}))
     topology = topology or create_simple_topology_two_nodes
 
     model_storage = aria.application_model_storage(
@@ -343,6 +343,14 @@ def test_relationship_operation_logging(ctx, executor):
     _assert_loggins(ctx, inputs)
 
 
+def test_log_handler_shares_model_storage_engine(ctx):
+    handler = ctx._get_sqla_handler()
+    try:
+        assert handler._engine is ctx.model.log._engine
+    finally:
+        handler.close()
+
+
 def _assert_loggins(ctx, inputs):
 
     # The logs should contain the following: Workflow Start, Operation Start, custom operation
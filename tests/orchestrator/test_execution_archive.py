@@ -0,0 +1,177 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from datetime import datetime
+
+import pytest
+
+from aria import exceptions
+from aria.cli.logger import ModelLogIterator
+from aria.core import Core
+from aria.modeling import models
+from aria.orchestrator import execution_archive
+
+from tests import mock, storage
+
+
+class TestExecutionArchive(object):
+
+    def test_archive(self, ctx):
+        execution, tasks, logs = _populate(ctx, tasks_count=3, logs_per_task=2)
+        summary = _core(ctx).archive_execution(execution.id)
+
+        assert summary.execution == execution
+        assert summary.tasks_count == 3
+        assert summary.logs_count == 6
+        assert summary.size > 0
+        assert ctx.model.execution_archive.list() == [summary]
+        # The rows were moved out of the model storage
+        assert ctx.model.task.list(filters=dict(execution_fk=execution.id)) == []
+        assert ctx.model.log.list(filters=dict(execution_fk=execution.id)) == []
+        assert ctx.model.parameter.list(filters=dict(name='input')) == []
+        assert ctx.model.execution.get(execution.id) == execution
+
+        archived_logs = list(execution_archive.iter_logs(ctx.model, ctx.resource, execution.id))
+        assert [(l.id, l.msg, l.level, l.created_at) for l in archived_logs] == logs
+        assert all(l.execution == execution for l in archived_logs)
+        archived_tasks = dict((l.task.id, l.task) for l in archived_logs)
+        assert sorted(archived_tasks) == sorted(tasks)
+        for task_id, task in archived_tasks.iteritems():
+            assert task.implementation == tasks[task_id]
+            assert task.status == models.Task.SUCCESS
+            assert isinstance(task.ended_at, datetime)
+            assert dict(i.unwrap() for i in task.inputs.values()) == dict(input=task_id)
+
+    def test_archive_again(self, ctx, tmpdir):
+        execution, _, logs = _populate(ctx, tasks_count=1, logs_per_task=2)
+        core = _core(ctx)
+        first_size = core.archive_execution(execution.id).size
+        # Logs stored after the execution was archived are added to its archive, as a new part
+        logs += _add_logs(ctx, execution, task=None, count=2)
+        summary = core.archive_execution(execution.id)
+
+        assert summary.tasks_count == 1
+        assert summary.logs_count == 4
+        parts_dir = tmpdir.join('parts')
+        ctx.resource.execution.download(entry_id=str(execution.id),
+                                        destination=str(parts_dir),
+                                        path=execution_archive.ARCHIVE_DIR)
+        assert len(parts_dir.listdir()) == 2
+        assert summary.size == sum(part.size() for part in parts_dir.listdir())
+        assert summary.size > first_size
+        assert ctx.model.execution_archive.list() == [summary]
+        archived_logs = list(execution_archive.iter_logs(ctx.model, ctx.resource, execution.id))
+        assert [(l.id, l.msg, l.level, l.created_at) for l in archived_logs] == logs
+        assert archived_logs[-1].task is None
+
+    def test_interrupted_archive(self, ctx, monkeypatch):
+        execution, _, logs = _populate(ctx, tasks_count=2, logs_per_task=2)
+        core = _core(ctx)
+
+        def interrupt(*args, **kwargs):
+            raise KeyboardInterrupt
+
+        monkeypatch.setattr(ctx.model.task, 'delete_many', interrupt)
+        with pytest.raises(KeyboardInterrupt):
+            core.archive_execution(execution.id)
+        monkeypatch.undo()
+        # Whatever was not committed is lost, as if the process was killed
+        ctx.model.task._session.rollback()
+        summary = execution_archive.get_summary(ctx.model, execution.id)
+        assert (summary.tasks_count, summary.logs_count) == (0, 4)
+
+        summary = core.archive_execution(execution.id)
+        assert (summary.tasks_count, summary.logs_count) == (2, 4)
+        assert ctx.model.task.list(filters=dict(execution_fk=execution.id)) == []
+        archived_logs = list(execution_archive.iter_logs(ctx.model, ctx.resource, execution.id))
+        assert [(l.id, l.msg, l.level, l.created_at) for l in archived_logs] == logs
+        assert all(l.task is not None for l in archived_logs)
+
+    def test_active_execution(self, ctx):
+        execution, _, _ = _populate(ctx, tasks_count=1, logs_per_task=1,
+                                    status=models.Execution.STARTED)
+        with pytest.raises(exceptions.ActiveExecutionError):
+            _core(ctx).archive_execution(execution.id)
+        assert execution_archive.get_summary(ctx.model, execution.id) is None
+        assert len(ctx.model.log.list(filters=dict(execution_fk=execution.id))) == 1
+
+    def test_delete(self, ctx):
+        execution, _, _ = _populate(ctx, tasks_count=1, logs_per_task=2)
+        _core(ctx).archive_execution(execution.id)
+        execution_archive.delete(ctx.model, ctx.resource, execution)
+
+        assert execution_archive.get_summary(ctx.model, execution.id) is None
+        assert list(execution_archive.iter_logs(ctx.model, ctx.resource, execution.id)) == []
+        # The execution may be archived anew
+        logs = _add_logs(ctx, execution, task=None, count=1)
+        _core(ctx).archive_execution(execution.id)
+        archived_logs = list(execution_archive.iter_logs(ctx.model, ctx.resource, execution.id))
+        assert [(l.id, l.msg, l.level, l.created_at) for l in archived_logs] == logs
+
+    def test_log_iterator(self, ctx):
+        execution, _, logs = _populate(ctx, tasks_count=2, logs_per_task=2)
+        _core(ctx).archive_execution(execution.id)
+        logs += _add_logs(ctx, execution, task=None, count=1)
+
+        log_iterator = ModelLogIterator(ctx.model, execution.id, resource_storage=ctx.resource)
+        # Archived logs first, then the stored ones
+        assert [(l.id, l.msg, l.level, l.created_at) for l in log_iterator] == logs
+        logs += _add_logs(ctx, execution, task=None, count=1)
+        assert [(l.id, l.msg, l.level, l.created_at) for l in log_iterator] == logs[-1:]
+
+
+@pytest.fixture
+def ctx(tmpdir):
+    context = mock.context.simple(str(tmpdir))
+    yield context
+    storage.release_sqlite_storage(context.model)
+
+
+def _core(ctx):
+    return Core(ctx.model, ctx.resource, plugin_manager=None)
+
+
+def _populate(ctx, tasks_count, logs_per_task, status=models.Execution.TERMINATED):
+    execution = ctx.execution
+    execution.status = models.Execution.STARTED
+    if status != execution.status:
+        execution.status = status
+    ctx.model.execution.update(execution)
+    node = ctx.model.node.list()[0]
+    tasks = {}
+    logs = []
+    for i in range(tasks_count):
+        task = models.Task.for_node(node,
+                                    execution=execution,
+                                    implementation='operation_{0}'.format(i),
+                                    status=models.Task.SUCCESS,
+                                    ended_at=datetime.utcnow())
+        ctx.model.task.put(task)
+        task.inputs = {'input': mock.models.create_parameter('input', task.id)}
+        ctx.model.task.update(task)
+        tasks[task.id] = task.implementation
+        logs += _add_logs(ctx, execution, task=task, count=logs_per_task)
+    return execution, tasks, logs
+
+
+def _add_logs(ctx, execution, task, count):
+    logs = [models.Log(execution=execution,
+                       task=task,
+                       level='INFO',
+                       msg='message {0}'.format(i),
+                       created_at=datetime.utcnow())
+            for i in range(count)]
+    ctx.model.log.put_many(logs)
+    return [(l.id, l.msg, l.level, l.created_at) for l in logs]
@@ -17,6 +17,7 @@ import threading
 from datetime import datetime
 
 import pytest
+import sqlalchemy.event
 
 from aria.orchestrator import (
     events,
@@ -29,7 +30,10 @@ from aria.orchestrator.workflows import (
     exceptions,
 )
 from aria.orchestrator.workflows.core import engine
-from aria.orchestrator.workflows.executor import thread
+from aria.orchestrator.workflows.executor import (
+    thread,
+    dry,
+)
 
 from tests import mock, storage
 
@@ -222,6 +226,136 @@ class TestEngine(BaseTest):
         assert global_test_holder.get('invocations') == [1, 2]
         assert global_test_holder.get('sent_task_signal_calls') == 2
 
+    def test_dependent_task_waits_for_all_dependencies(self, workflow_context, executor):
+        @workflow
+        def mock_workflow(ctx, graph):
+            ops = [self._op(mock_ordered_task, ctx, inputs={'counter': 1}) for _ in range(3)]
+            last_op = self._op(mock_ordered_task, ctx, inputs={'counter': 2})
+            graph.add_tasks(*ops)
+            graph.add_tasks(last_op)
+            for op in ops:
+                graph.add_dependency(last_op, op)
+        self._execute(
+            workflow_func=mock_workflow,
+            workflow_context=workflow_context,
+            executor=executor)
+        assert workflow_context.states == ['start', 'success']
+        assert workflow_context.exception is None
+        assert global_test_holder.get('invocations') == [1, 1, 1, 2]
+        assert global_test_holder.get('sent_task_signal_calls') == 4
+
+    def test_synchronous_executor(self, workflow_context):
+        @workflow
+        def mock_workflow(ctx, graph):
+            op1 = self._op(mock_ordered_task, ctx, inputs={'counter': 1})
+            op2 = self._op(mock_ordered_task, ctx, inputs={'counter': 2})
+            graph.sequence(op1, op2)
+        self._execute(
+            workflow_func=mock_workflow,
+            workflow_context=workflow_context,
+            executor=dry.DryExecutor())
+        assert workflow_context.states == ['start', 'success']
+        assert workflow_context.exception is None
+        assert global_test_holder.get('sent_task_signal_calls') == 2
+
+    def test_critical_path_priority(self, workflow_context, executor):
+        ops = []
+
+        @workflow
+        def mock_workflow(ctx, graph):
+            ops.extend(self._op(mock_success_task, ctx) for _ in range(4))
+            graph.sequence(*ops[:3])
+            graph.add_tasks(ops[3])
+        eng = self._engine(workflow_func=mock_workflow,
+                           workflow_context=workflow_context,
+                           executor=executor)
+        priorities = [eng._get_task(op.id).priority for op in ops]
+        # The chain's tasks precede longer paths of dependent tasks than the independent task
+        assert priorities[0] > priorities[1] > priorities[2] == priorities[3]
+
+    def test_critical_path_first(self, workflow_context, executor):
+        @workflow
+        def mock_workflow(ctx, graph):
+            independent_op = self._op(mock_ordered_task, ctx, inputs={'counter': 1})
+            chain = [self._op(mock_ordered_task, ctx, inputs={'counter': counter})
+                     for counter in (2, 3)]
+            graph.add_tasks(independent_op)
+            graph.sequence(*chain)
+        self._execute(
+            workflow_func=mock_workflow,
+            workflow_context=workflow_context,
+            executor=executor)
+        # Both the independent task and the chain's head are ready right away, but the executor
+        # runs a single task at a time
+        assert global_test_holder.get('invocations')[0] == 2
+
+    def test_historical_durations_priority(self, workflow_context, executor):
+        def mock_workflow_func(ops):
+            @workflow
+            def mock_workflow(ctx, graph):
+                ops.extend([self._op(mock_sleep_task, ctx, inputs={'seconds': 0.5}),
+                            self._op(mock_success_task, ctx)])
+                graph.add_tasks(*ops)
+            return mock_workflow
+        self._execute(workflow_func=mock_workflow_func([]),
+                      workflow_context=workflow_context,
+                      executor=executor)
+
+        ops = []
+        eng = self._engine(workflow_func=mock_workflow_func(ops),
+                           workflow_context=workflow_context,
+                           executor=executor)
+        sleep_priority, success_priority = [eng._get_task(op.id).priority for op in ops]
+        assert sleep_priority >= 0.5
+        assert sleep_priority > success_priority
+
+
+class TestStorageAccess(BaseTest):
+
+    def test_task_statements_per_executed_task(self, workflow_context, executor):
+        # Used to be over 50 statements per task, as the engine read every task state from storage
+        # on each iteration
+        number_of_tasks = 10
+
+        @workflow
+        def mock_workflow(ctx, graph):
+            graph.sequence(*(self._op(mock_success_task, ctx) for _ in range(number_of_tasks)))
+        eng = self._engine(workflow_func=mock_workflow,
+                           workflow_context=workflow_context,
+                           executor=executor)
+
+        statements = []
+
+        def count_task_statements(conn, cursor, statement, *args, **kwargs):
+            if ' task ' in statement.replace('\n', ' '):
+                statements.append(statement)
+
+        sql_engine = workflow_context.model.task._engine
+        sqlalchemy.event.listen(sql_engine, 'before_cursor_execute', count_task_statements)
+        try:
+            eng.execute()
+        finally:
+            sqlalchemy.event.remove(sql_engine, 'before_cursor_execute', count_task_statements)
+
+        assert workflow_context.states == ['start', 'success']
+        assert len(statements) / number_of_tasks < 20
+        for task in workflow_context.model.task.iter():
+            assert task.status == task.SUCCESS
+
+    def test_task_stored_as_sent_before_execution(self, workflow_context):
+        @workflow
+        def mock_workflow(ctx, graph):
+            graph.add_tasks(self._op(mock_success_task, ctx))
+        executor = _StoredStatusExecutor()
+        try:
+            self._execute(workflow_func=mock_workflow,
+                          workflow_context=workflow_context,
+                          executor=executor)
+        finally:
+            executor.close()
+        assert workflow_context.states == ['start', 'success']
+        assert global_test_holder.get('stored_statuses') == [models.Task.SENT]
+
 
 class TestCancel(BaseTest):
 
@@ -470,6 +604,14 @@ class TestTaskRetryAndAbort(BaseTest):
         assert global_test_holder.get('sent_task_signal_calls') == 1
 
 
+class _StoredStatusExecutor(thread.ThreadExecutor):
+
+    def _execute(self, task):
+        stored_statuses = global_test_holder.setdefault('stored_statuses', [])
+        stored_statuses.append(task.model_task.status)
+        super(_StoredStatusExecutor, self)._execute(task)
+
+
 @operation
 def mock_success_task(**_):
     pass
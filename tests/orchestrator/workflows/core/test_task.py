@@ -154,3 +154,19 @@ class TestOperationTask(object):
         assert core_task.ended_at == future_time
         assert core_task.retry_count == 2
         assert core_task.due_at == future_time
+
+        # No engine is running, so the update is stored right away
+        storage_task = ctx.model.task.get(core_task.model_task.id)
+        assert storage_task.status == core_task.STARTED
+        assert storage_task.retry_count == 2
+
+    def test_store_tasks_state_in_chunks(self, ctx, monkeypatch):
+        monkeypatch.setattr(core.task, '_MAX_FILTER_VALUES', 2)
+        node = ctx.model.node.get_by_name(mock.models.DEPENDENCY_NODE_NAME)
+        core_tasks = [self._create_node_operation_task(ctx, node)[1] for _ in range(5)]
+        for i, core_task in enumerate(core_tasks):
+            core_task._state.retry_count = i
+
+        core.task.store_tasks_state(core_tasks, ctx.model)
+        for i, core_task in enumerate(core_tasks):
+            assert ctx.model.task.get(core_task.model_task.id).retry_count == i
@@ -14,7 +14,10 @@
 # limitations under the License.
 
 from networkx import topological_sort, DiGraph
+from sqlalchemy import event
+from sqlalchemy.dialects import mysql, oracle, postgresql
 
+from aria.modeling import models
 from aria.orchestrator import context
 from aria.orchestrator.workflows import api, core
 
@@ -100,6 +103,64 @@ def test_task_graph_into_execution_graph(tmpdir):
     storage.release_sqlite_storage(task_context.model)
 
 
+def test_operation_tasks_are_stored_at_once(tmpdir):
+    task_context = mock.context.simple(str(tmpdir))
+    node = task_context.model.node.get_by_name(mock.models.DEPENDENCY_NODE_NAME)
+    interface = mock.models.create_interface(
+        node.service,
+        'Standard',
+        'create',
+        operation_kwargs={'implementation': 'test'}
+    )
+    node.interfaces[interface.name] = interface
+    task_context.model.node.update(node)
+
+    with context.workflow.current.push(task_context):
+        task_graph = api.task_graph.TaskGraph('test_task_graph')
+        task_graph.add_tasks(*[api.task.OperationTask.for_node(node=node,
+                                                               interface_name='Standard',
+                                                               operation_name='create')
+                               for _ in range(10)])
+
+    commits = []
+
+    def count_commit(conn):
+        commits.append(conn)
+
+    engine = task_context.model._all_api_kwargs['engine']
+    event.listen(engine, 'commit', count_commit)
+    try:
+        execution_graph = DiGraph()
+        core.translation.build_execution_graph(task_graph=task_graph,
+                                               execution_graph=execution_graph)
+    finally:
+        event.remove(engine, 'commit', count_commit)
+
+    assert len(commits) == 1
+    operation_tasks = [data['task'] for _, data in execution_graph.nodes_iter(data=True)
+                       if isinstance(data['task'], core.task.OperationTask)]
+    assert len(operation_tasks) == 10
+    stored_tasks = task_context.model.task.list()
+    assert sorted(task.model_task.id for task in operation_tasks) == \
+        sorted(task.id for task in stored_tasks)
+    assert all(task.execution == task_context.execution for task in stored_tasks)
+    storage.release_sqlite_storage(task_context.model)
+
+
+def test_duration_in_seconds_dialects():
+    def compile_duration(dialect):
+        duration = core.translation._duration_in_seconds(
+            dialect.name, models.Task.started_at, models.Task.ended_at)
+        return str(duration.compile(dialect=dialect)) if duration is not None else None
+
+    assert compile_duration(mysql.dialect()).startswith(
+        'timestampdiff(MICROSECOND, task.started_at, task.ended_at)')
+    assert compile_duration(postgresql.dialect()) == \
+        'EXTRACT(epoch FROM task.ended_at - task.started_at)'
+    # Durations are not computed on other dbs
+    assert compile_duration(oracle.dialect()) is None
+
+
 def _assert_execution_is_api_task(execution_task, api_task):
     assert execution_task.id == api_task.id
     assert execution_task.name == api_task.name
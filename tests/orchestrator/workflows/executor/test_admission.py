@@ -0,0 +1,155 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from collections import namedtuple
+
+from aria.orchestrator.workflows.executor.admission import AdmissionController
+
+
+class TestAdmissionController(object):
+
+    def test_unbounded(self):
+        controller = AdmissionController()
+        executed = []
+        for task in _tasks(5):
+            controller.submit(task, executed.append)
+        assert len(executed) == 5
+        assert controller.metrics().in_flight == 5
+
+    def test_max_tasks(self):
+        controller = AdmissionController(max_tasks=2)
+        executed = []
+        tasks = _tasks(3)
+        for task in tasks:
+            controller.submit(task, executed.append)
+        assert executed == tasks[:2]
+        metrics = controller.metrics()
+        assert metrics.queue_depth == 1
+        assert metrics.in_flight == 2
+
+        _release(controller, tasks[0])
+        assert executed == tasks
+        metrics = controller.metrics()
+        assert metrics.queue_depth == 0
+        assert metrics.admitted == 3
+        assert metrics.max_wait_time >= 0
+        assert metrics.total_wait_time >= metrics.max_wait_time
+
+    def test_priority(self):
+        controller = AdmissionController(max_tasks=1)
+        executed = []
+        running, low, high = _tasks(3, priorities=[1, 1, 5])
+        for task in (running, low, high):
+            controller.submit(task, executed.append)
+        _release(controller, running)
+        assert executed == [running, high]
+        _release(controller, high)
+        assert executed == [running, high, low]
+
+    def test_max_tasks_per_plugin(self):
+        controller = AdmissionController(max_tasks_per_plugin=1)
+        executed = []
+        first, second, other = _tasks(3, plugins=[1, 1, 2])
+        for task in (first, second, other):
+            controller.submit(task, executed.append)
+        assert executed == [first, other]
+        _release(controller, first)
+        assert executed == [first, other, second]
+
+    def test_max_tasks_per_host(self):
+        controller = AdmissionController(max_tasks_per_host=1)
+        executed = []
+        first, second, other = _tasks(3, hosts=[1, 1, 2])
+        for task in (first, second, other):
+            controller.submit(task, executed.append)
+        assert executed == [first, other]
+        _release(controller, first)
+        assert executed == [first, other, second]
+
+    def test_synchronous_execution(self):
+        # Tasks ending while they are executed must not make the admission recursive
+        controller = AdmissionController(max_tasks=1)
+        executed = []
+
+        def execute(task):
+            executed.append(task)
+            controller.release(task)
+
+        tasks = _tasks(2000)
+        for task in tasks:
+            controller.submit(task, execute)
+        assert executed == tasks
+
+    def test_shared_controller(self):
+        controller = AdmissionController(max_tasks=1)
+        first_executed, second_executed = [], []
+        first, second = _tasks(2)
+        controller.submit(first, first_executed.append)
+        controller.submit(second, second_executed.append)
+        assert not second_executed
+        _release(controller, first)
+        assert second_executed == [second]
+
+    def test_discard(self):
+        controller = AdmissionController(max_tasks=1)
+        executed = []
+        first, second = _tasks(2)
+        controller.submit(first, executed.append)
+        controller.submit(second, executed.append)
+        controller.discard(executed.append)
+        _release(controller, first)
+        assert executed == [first]
+        assert controller.metrics().queue_depth == 0
+
+    def test_release_does_not_execute(self):
+        # The thread reporting the end of a task (e.g. an executor's listener) must not be kept
+        # busy executing the tasks admitted in its place
+        controller = AdmissionController(max_tasks=1)
+        executing_threads = []
+        first, second = _tasks(2)
+        controller.submit(first, lambda task: None)
+        controller.submit(second, lambda task: executing_threads.append(threading.current_thread()))
+        _release(controller, first)
+        assert len(executing_threads) == 1
+        assert executing_threads[0] is not threading.current_thread()
+
+
+_Actor = namedtuple('_Actor', 'host_fk')
+
+
+class _Task(object):
+
+    def __init__(self, id, priority, plugin_fk, host_fk):
+        self.id = id
+        self.priority = priority
+        self.plugin_fk = plugin_fk
+        self.actor = _Actor(host_fk=host_fk)
+
+
+def _release(controller, task):
+    controller.release(task)
+    # Waiting for the tasks admitted by the release to be executed
+    dispatcher = controller._dispatcher
+    if dispatcher is not None:
+        dispatcher.join()
+
+
+def _tasks(count, priorities=None, plugins=None, hosts=None):
+    return [_Task(id=i,
+                  priority=priorities[i] if priorities else 0,
+                  plugin_fk=plugins[i] if plugins else None,
+                  host_fk=hosts[i] if hosts else None)
+            for i in range(count)]
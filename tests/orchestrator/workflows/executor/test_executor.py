@@ -89,6 +89,8 @@ class MockException(Exception):
     # subprocess needs to load a tests module so we explicitly add the root directory as if
     # the project has been installed in editable mode
     (process.ProcessExecutor, {'python_path': [tests.ROOT_DIR]}),
+    (process.ProcessExecutor, {'python_path': [tests.ROOT_DIR], 'pool_size': 1}),
+    (process.ProcessExecutor, {'python_path': [tests.ROOT_DIR], 'pool_size': 2}),
     # (celery.CeleryExecutor, {'app': app})
 ])
 def executor(request):
@@ -15,14 +15,19 @@
 
 import logging
 import os
+import threading
 import Queue
 
 import pytest
 
+from aria import logger as aria_logger
 from aria.orchestrator import events
+from aria.orchestrator.workflows.exceptions import ExecutorException
 from aria.utils.plugin import create as create_plugin
-from aria.orchestrator.workflows.executor import process
+from aria.orchestrator.workflows.executor import process, serialization
+from aria.orchestrator.workflows.executor.admission import AdmissionController
 
+import tests
 import tests.storage
 import tests.resources
 from tests.fixtures import (  # pylint: disable=unused-import
@@ -69,6 +74,235 @@ class TestProcessExecutor(object):
             executor.execute(task=None)
         assert 'closed' in exc_info.value.message
 
+    def test_concurrent_tasks(self):
+        executor = process.ProcessExecutor(python_path=[tests.ROOT_DIR])
+        try:
+            tasks = [MockTask('{0}.{1}'.format(__name__, mock_pid_task.__name__))
+                     for _ in range(5)]
+            errors = TestProcessExecutorWorkerPool._execute(executor, tasks)
+            assert len(set(errors[task.id].message for task in tasks)) == 5
+        finally:
+            executor.close()
+
+    def test_arguments_passed_without_files(self, mocker):
+        mocker.patch('tempfile.mkstemp', side_effect=AssertionError('temporary file created'))
+        executor = process.ProcessExecutor(python_path=[tests.ROOT_DIR])
+        try:
+            task = MockTask('{0}.{1}'.format(__name__, mock_pid_task.__name__))
+            errors = TestProcessExecutorWorkerPool._execute(executor, [task])
+            assert errors[task.id].message.isdigit()
+        finally:
+            executor.close()
+
+    def test_admission(self):
+        admission = AdmissionController(max_tasks=1)
+        executor = process.ProcessExecutor(python_path=[tests.ROOT_DIR], admission=admission)
+        try:
+            tasks = [MockTask('{0}.{1}'.format(__name__, mock_pid_task.__name__))
+                     for _ in range(3)]
+            TestProcessExecutorWorkerPool._execute(executor, tasks)
+            metrics = admission.metrics()
+            assert metrics.admitted == 3
+            assert metrics.queue_depth == metrics.in_flight == 0
+            # Tasks were queued until the previous ones ended
+            assert metrics.max_wait_time > 0
+        finally:
+            executor.close()
+
+    def test_exception_not_importable_by_the_executor(self, tmpdir):
+        # The exception's module is only on the python path of the task's process
+        tmpdir.join('mock_task_errors.py').write('class TaskError(Exception):\n    pass\n')
+        executor = process.ProcessExecutor(python_path=[tests.ROOT_DIR, str(tmpdir)])
+        try:
+            task = MockTask('{0}.{1}'.format(__name__, mock_task_error_task.__name__))
+            error = TestProcessExecutorWorkerPool._execute(executor, [task])[task.id]
+            assert 'TaskError' in str(error)
+        finally:
+            executor.close()
+
+    def test_invalid_message(self):
+        executor = process.ProcessExecutor(python_path=[tests.ROOT_DIR])
+        connection = process._connect(executor._server_port)
+        try:
+            process._send_message(connection, {'type': 'started', 'task_id': 1,
+                                               'payload': _Payload()}, executor._serializer)
+            response = process._recv_message(connection, executor._serializer)
+            assert isinstance(response['exception'], ExecutorException)
+            # The listener still serves the connection
+            process._send_message(connection, {'type': 'logs_stored', 'task_id': None,
+                                               'execution_id': 1}, executor._serializer)
+            assert process._recv_message(connection, executor._serializer) == {}
+        finally:
+            connection.close()
+            executor.close()
+
+    def test_logs_stored_relay(self):
+        executor = process.ProcessExecutor(python_path=[tests.ROOT_DIR])
+        notified = []
+
+        def notify(execution_id):
+            notified.append(execution_id)
+
+        aria_logger.logs_stored_signal.connect(notify)
+        messenger = process._Messenger(task_id=None, port=executor._server_port,
+                                       serializer=executor._serializer)
+        try:
+            # Sent by the subprocesses whenever they store logs
+            messenger.logs_stored(execution_id=1)
+            assert notified == [1]
+        finally:
+            messenger.close()
+            aria_logger.logs_stored_signal.disconnect(notify)
+            executor.close()
+
+
+class TestMessageReader(object):
+
+    def test_partial_messages(self):
+        first = {'type': 'started', 'task_id': 1}
+        second = {'type': 'succeeded', 'task_id': 2}
+        data = self._frame(first) + self._frame(second)
+        reader = process._MessageReader()
+        assert reader.feed(data[:2]) == []
+        assert self._loads(reader.feed(data[2:len(self._frame(first)) + 3])) == [first]
+        assert self._loads(reader.feed(data[len(self._frame(first)) + 3:])) == [second]
+
+    def test_multiple_messages(self):
+        messages = [{'type': 'apply_tracked_changes', 'task_id': i} for i in range(3)]
+        reader = process._MessageReader()
+        assert self._loads(reader.feed(''.join(self._frame(m) for m in messages))) == messages
+
+    @staticmethod
+    def _loads(messages):
+        return [serialization.PickleSerializer().loads(message) for message in messages]
+
+    @staticmethod
+    def _frame(message):
+        connection = _MockConnection()
+        process._send_message(connection, message, serialization.PickleSerializer())
+        return connection.data
+
+
+class _MockConnection(object):
+
+    def __init__(self):
+        self.data = ''
+
+    def sendall(self, data):
+        self.data += data
+
+
+class TestProcessExecutorWorkerPool(object):
+
+    def test_worker_reuse(self):
+        pids = self._run_tasks(count=3, pool_size=1, max_tasks_per_worker=None)
+        assert len(set(pids)) == 1
+
+    def test_worker_recycling(self):
+        pids = self._run_tasks(count=3, pool_size=1, max_tasks_per_worker=1)
+        assert len(set(pids)) == 3
+
+    def test_pool_size(self):
+        pids = self._run_tasks(count=6, pool_size=2, max_tasks_per_worker=None)
+        assert len(set(pids)) <= 2
+
+    def test_worker_crash(self):
+        executor = process.ProcessExecutor(python_path=[tests.ROOT_DIR], pool_size=1)
+        try:
+            crashing_task = MockTask('{0}.{1}'.format(__name__, mock_crashing_task.__name__))
+            task = MockTask('{0}.{1}'.format(__name__, mock_pid_task.__name__))
+            errors = self._execute(executor, [crashing_task, task])
+            assert isinstance(errors[crashing_task.id], ExecutorException)
+            assert 'exited unexpectedly' in str(errors[crashing_task.id])
+            # The task submitted after the crash runs in a new worker
+            assert errors[task.id].message.isdigit()
+        finally:
+            executor.close()
+
+    def test_model_storage_reuse(self, model, monkeypatch):
+        monkeypatch.setattr(process, '_model_storages', {})
+        model_storage = process._get_model_storage(model.serialization_dict)
+        session = model_storage.node._session
+        session.commit = lambda: None
+        model_storage.node.list()
+        assert session.registry.has()
+        process._reset_model_storages()
+        # The tasks the worker runs next share the storage, but not the session's state
+        assert process._get_model_storage(dict(model.serialization_dict)) is model_storage
+        assert 'commit' not in vars(session)
+        assert not session.registry.has()
+        process._close_model_storages()
+        assert not process._model_storages
+
+    def test_arguments_written_by_the_worker(self, monkeypatch):
+        writing = threading.Event()
+        written = threading.Event()
+        writer_threads = []
+
+        def write_message(*_):
+            # As if the arguments did not fit in the pipe's buffer
+            writer_threads.append(threading.current_thread())
+            writing.set()
+            written.wait(10)
+        monkeypatch.setattr(process, '_write_message', write_message)
+        pool = process._WorkerPool(size=1, max_tasks_per_worker=None)
+        try:
+            pool.submit(key=None, env=os.environ.copy(), task_id='task', arguments={})
+            assert writing.wait(60)
+            assert writer_threads[0] is not threading.current_thread()
+            # The pool is not locked while the arguments are written
+            assert pool.reap() == []
+        finally:
+            written.set()
+            pool.close()
+
+    def _run_tasks(self, count, pool_size, max_tasks_per_worker):
+        executor = process.ProcessExecutor(python_path=[tests.ROOT_DIR],
+                                           pool_size=pool_size,
+                                           max_tasks_per_worker=max_tasks_per_worker)
+        try:
+            tasks = [MockTask('{0}.{1}'.format(__name__, mock_pid_task.__name__))
+                     for _ in range(count)]
+            errors = self._execute(executor, tasks)
+            return [errors[task.id].message for task in tasks]
+        finally:
+            executor.close()
+
+    @staticmethod
+    def _execute(executor, tasks):
+        queue = Queue.Queue()
+
+        def handler(task, exception=None, **kwargs):
+            queue.put((task.id, exception))
+
+        events.on_success_task_signal.connect(handler)
+        events.on_failure_task_signal.connect(handler)
+        try:
+            for task in tasks:
+                executor.execute(task)
+            return dict(queue.get(timeout=60) for _ in tasks)
+        finally:
+            events.on_success_task_signal.disconnect(handler)
+            events.on_failure_task_signal.disconnect(handler)
+
+
+def mock_pid_task(**_):
+    # The only way for the task to report back is through a failure
+    raise RuntimeError(str(os.getpid()))
+
+
+def mock_crashing_task(**_):
+    os._exit(1)
+
+
+def mock_task_error_task(**_):
+    import mock_task_errors
+    raise mock_task_errors.TaskError('failed')
+
+
+class _Payload(object):
+    pass
+
 
 @pytest.fixture
 def executor(plugin_manager):
@@ -69,7 +69,17 @@ def _test_update_and_refresh(ctx, lock_files, key, first_value, second_value):
             raise RuntimeError('Unexpected')
 
 
-def _test(context, executor, lock_files, func, expected_failure):
+def test_concurrent_modification_of_different_keys(context, executor, lock_files):
+    _test(context, executor, lock_files, _test_different_keys, expected_failure=False,
+          second_key='second_key')
+
+
+@operation
+def _test_different_keys(ctx, lock_files, key, first_value, second_value, second_key):
+    _concurrent_update(lock_files, ctx.node, key, first_value, second_value, second_key)
+
+
+def _test(context, executor, lock_files, func, expected_failure, second_key=None):
     def _node(ctx):
         return ctx.model.node.get_by_name(mock.models.DEPENDENCY_NODE_NAME)
 
@@ -84,6 +94,8 @@ def _test(context, executor, lock_files, func, expected_failure):
         'first_value': first_value,
         'second_value': second_value
     }
+    if second_key:
+        inputs['second_key'] = second_key
 
     node = _node(context)
     interface = mock.models.create_interface(
@@ -118,6 +130,8 @@ def _test(context, executor, lock_files, func, expected_failure):
 
     props = _node(context).runtime_properties
     assert props[key] == first_value
+    if second_key:
+        assert props[second_key] == second_value
 
     exceptions = [event['kwargs']['exception'] for event in collected.get(signal, [])]
     if expected_failure:
@@ -148,7 +162,7 @@ def lock_files(tmpdir):
     return str(tmpdir.join('first_lock_file')), str(tmpdir.join('second_lock_file'))
 
 
-def _concurrent_update(lock_files, node, key, first_value, second_value):
+def _concurrent_update(lock_files, node, key, first_value, second_value, second_key=None):
 
     locker1 = fasteners.InterProcessLock(lock_files[0])
     locker2 = fasteners.InterProcessLock(lock_files[1])
@@ -163,7 +177,10 @@ def _concurrent_update(lock_files, node, key, first_value, second_value):
     else:
         locker2.acquire()
 
-    node.runtime_properties[key] = first_value if first else second_value
+    if first:
+        node.runtime_properties[key] = first_value
+    else:
+        node.runtime_properties[second_key or key] = second_value
 
     if first:
         locker1.release()
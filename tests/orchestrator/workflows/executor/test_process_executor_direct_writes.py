@@ -0,0 +1,141 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from aria.storage import sql_mapi
+from aria.storage.exceptions import StorageError
+from aria.orchestrator import events
+from aria.orchestrator.workflows import api, exceptions
+from aria.orchestrator.workflows.executor import process
+from aria.orchestrator import workflow, operation
+
+import tests
+from tests.orchestrator.context import execute as execute_workflow
+from tests.orchestrator.workflows.helpers import events_collector
+from tests.orchestrator.workflows.executor.test_process_executor_concurrent_modifications import (
+    _concurrent_update
+)
+from tests import mock
+from tests import storage
+
+
+_INTERFACE_NAME, _OPERATION_NAME = mock.operations.NODE_OPERATIONS_INSTALL[0]
+
+
+def test_changes_of_successful_operation(context, executor):
+    _run_workflow(context, executor, _set_properties, nodes=[_dependency_node(context)],
+                  inputs={'properties': {'key': 'value'}})
+    assert _dependency_node(context).runtime_properties['key'] == 'value'
+
+
+def test_changes_of_failed_operation(context, executor):
+    with pytest.raises(exceptions.ExecutorException):
+        _run_workflow(context, executor, _set_properties_and_fail,
+                      nodes=[_dependency_node(context)], inputs={'properties': {'key': 'value'}})
+    assert _dependency_node(context).runtime_properties['key'] == 'value'
+
+
+def test_concurrent_modification(context, executor, tmpdir):
+    lock_files = str(tmpdir.join('first_lock_file')), str(tmpdir.join('second_lock_file'))
+    node = _dependency_node(context)
+    signal = events.on_failure_task_signal
+    with events_collector(signal) as collected:
+        with pytest.raises(exceptions.ExecutorException):
+            _run_workflow(context, executor, _update_concurrently, nodes=[node, node],
+                          inputs={'lock_files': lock_files})
+
+    # Both tasks started from the same version of the node, so only one of them may commit
+    failures = [event['kwargs']['exception'] for event in collected[signal]]
+    assert len(failures) == 1
+    assert isinstance(failures[0], StorageError)
+    assert 'Version conflict' in str(failures[0])
+    assert _dependency_node(context).runtime_properties['key'] in ('value1', 'value2')
+
+
+def test_frequent_commits(context, executor):
+    _run_workflow(context, executor, _commit_often, nodes=[_dependency_node(context)],
+                  inputs={'commits': 5})
+    # The changes of every commit are kept
+    runtime_properties = _dependency_node(context).runtime_properties
+    assert runtime_properties == dict(('commit_{0}'.format(i), i) for i in range(5))
+
+
+@operation
+def _set_properties(ctx, properties):
+    ctx.node.runtime_properties.update(properties)
+
+
+@operation
+def _set_properties_and_fail(ctx, properties):
+    ctx.node.runtime_properties.update(properties)
+    raise RuntimeError('MESSAGE')
+
+
+@operation
+def _update_concurrently(ctx, lock_files):
+    _concurrent_update(lock_files, ctx.node, 'key', 'value1', 'value2')
+
+
+@operation
+def _commit_often(ctx, commits):
+    node = ctx.node
+    for i in range(commits):
+        # Assigned rather than modified in place, as the changes made to an instance are no longer
+        # tracked once they are sent to the executor
+        node.runtime_properties = dict(node.runtime_properties, **{'commit_{0}'.format(i): i})
+        ctx.model.node.update(node)
+
+
+def _dependency_node(context):
+    return context.model.node.get_by_name(mock.models.DEPENDENCY_NODE_NAME)
+
+
+def _run_workflow(context, executor, op_func, nodes, inputs):
+    implementation = '{0}.{1}'.format(__name__, op_func.__name__)
+    for node in set(nodes):
+        interface = mock.models.create_interface(
+            node.service,
+            _INTERFACE_NAME,
+            _OPERATION_NAME,
+            operation_kwargs=dict(implementation=implementation, inputs=inputs)
+        )
+        node.interfaces[interface.name] = interface
+        context.model.node.update(node)
+
+    @workflow
+    def mock_workflow(graph, **_):
+        graph.add_tasks(*[api.task.OperationTask.for_node(node=node,
+                                                          interface_name=_INTERFACE_NAME,
+                                                          operation_name=_OPERATION_NAME,
+                                                          inputs=inputs)
+                          for node in nodes])
+
+    execute_workflow(mock_workflow, context, executor)
+
+
+@pytest.fixture
+def executor():
+    result = process.ProcessExecutor(python_path=[tests.ROOT_DIR], direct_writes=True)
+    yield result
+    result.close()
+
+
+@pytest.fixture
+def context(tmpdir):
+    result = mock.context.simple(str(tmpdir),
+                                 initiator_kwargs=sql_mapi.CONCURRENT_WRITERS_PROFILE)
+    yield result
+    storage.release_sqlite_storage(result.model)
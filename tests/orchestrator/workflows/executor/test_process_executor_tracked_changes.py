@@ -150,9 +150,9 @@ def _operation_mapping(func):
     return '{name}.{func.__name__}'.format(name=__name__, func=func)
 
 
-@pytest.fixture
-def executor():
-    result = process.ProcessExecutor(python_path=[tests.ROOT_DIR])
+@pytest.fixture(params=[None, 1])
+def executor(request):
+    result = process.ProcessExecutor(python_path=[tests.ROOT_DIR], pool_size=request.param)
     yield result
     result.close()
 
@@ -0,0 +1,137 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import cPickle
+import datetime
+import os
+import pickle
+import sys
+import types
+
+import pytest
+
+from aria.orchestrator.workflows.exceptions import ExecutorException
+from aria.orchestrator.workflows.executor import serialization
+from aria.storage import instrumentation
+from aria.utils import exceptions
+
+
+class TestSerializers(object):
+
+    def test_tracked_changes(self):
+        serializer = serialization.PickleSerializer()
+        message = _message(nodes_count=3, properties_count=5)
+        assert serializer.loads(serializer.dumps(message)) == message
+
+    @pytest.mark.parametrize('serializer', [
+        serialization.PickleSerializer(),
+        serialization.JsonPickleSerializer()
+    ])
+    def test_exception(self, serializer):
+        message = {'exception': ExecutorException('failed'),
+                   'wrapped_exception': exceptions._WrappedException('Error', 'failed')}
+        result = serializer.loads(serializer.dumps(message))
+        assert isinstance(result['exception'], ExecutorException)
+        assert result['exception'].message == 'failed'
+        assert isinstance(result['wrapped_exception'], exceptions._WrappedException)
+        assert result['wrapped_exception'].exception_str == 'failed'
+
+    def test_pickle_serializer_rejects_disallowed_classes(self):
+        serializer = serialization.PickleSerializer()
+        data = cPickle.dumps(_Payload(), protocol=2)
+        with pytest.raises(pickle.UnpicklingError):
+            serializer.loads(data)
+        # Classes can be explicitly allowed
+        serializer = serialization.PickleSerializer(allowed_classes=[(__name__, '_Payload')])
+        assert isinstance(serializer.loads(data), _Payload)
+
+    def test_pickle_serializer_rejects_disallowed_exceptions(self, monkeypatch):
+        data = _dumps_unimported_exception('mock_unimported_errors')
+        imported = []
+        original_import = __import__
+
+        def import_(name, *args, **kwargs):
+            imported.append(name)
+            return original_import(name, *args, **kwargs)
+
+        monkeypatch.setattr('__builtin__.__import__', import_)
+        with pytest.raises(pickle.UnpicklingError):
+            serialization.PickleSerializer().loads(data)
+        monkeypatch.undo()
+        # The module is not imported before it is known to be allowed
+        assert 'mock_unimported_errors' not in imported
+
+    def test_pickle_serializer_allows_imported_exceptions(self):
+        serializer = serialization.PickleSerializer()
+        assert isinstance(serializer.loads(serializer.dumps(_PayloadError())), _PayloadError)
+
+    def test_unloadable_exceptions_are_wrapped(self):
+        serializer = serialization.PickleSerializer()
+        data = _dumps_unimported_exception('mock_unimported_errors')
+        exception = exceptions.load_exception((data, 'Error', 'failed'), serializer)
+        assert isinstance(exception, exceptions._WrappedException)
+        assert exception.exception_type == 'Error'
+
+    def test_patches(self):
+        serializer = serialization.PickleSerializer()
+        message = _message(nodes_count=3, properties_count=5)
+        tracked_changes = instrumentation.diff_tracked_changes(message['tracked_changes'])
+        assert serializer.loads(serializer.dumps(tracked_changes)) == tracked_changes
+
+    def test_pickle_serializer_is_compact(self):
+        message = _message(nodes_count=10, properties_count=20)
+        pickle_size = len(serialization.PickleSerializer().dumps(message))
+        jsonpickle_size = len(serialization.JsonPickleSerializer().dumps(message))
+        assert pickle_size < jsonpickle_size
+
+
+def _message(nodes_count, properties_count):
+    tracked_changes = {'node': {}}
+    for node_id in range(nodes_count):
+        initial = dict(('property_{0}'.format(i), {'value': i, 'host': 'host_{0}'.format(i)})
+                       for i in range(properties_count))
+        current = dict(initial, ip='10.0.0.{0}'.format(node_id), ready=True)
+        tracked_changes['node'][node_id] = {
+            'runtime_properties': instrumentation._Value(initial, current),
+            'state': instrumentation._Value('creating', 'started'),
+            'version': instrumentation._Value(1, 1),
+            'updated_at': instrumentation._Value(None, datetime.datetime(2017, 1, 1, 12, 0)),
+        }
+    return {
+        'type': 'apply_tracked_changes',
+        'task_id': os.getpid(),
+        'exception': None,
+        'traceback': None,
+        'tracked_changes': tracked_changes
+    }
+
+
+class _Payload(object):
+    pass
+
+
+class _PayloadError(Exception):
+    pass
+
+
+def _dumps_unimported_exception(module_name):
+    # The exception's module is only available while it is pickled
+    module = types.ModuleType(module_name)
+    module.Error = type('Error', (Exception,), {'__module__': module_name})
+    sys.modules[module_name] = module
+    try:
+        return cPickle.dumps(module.Error('failed'), protocol=2)
+    finally:
+        del sys.modules[module_name]
@@ -0,0 +1,197 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+from aria.core import Core
+from aria.parser.consumption import Read
+from aria.parser.loading import ImportStore, ImportLock
+from aria.parser.loading.store import get_digest
+
+from .utils import create_context
+
+
+HEADER = 'tosca_definitions_version: tosca_simple_yaml_1_0\n'
+BASE = HEADER + 'node_types:\n  Base:\n    derived_from: tosca.nodes.Root\n'
+LIBRARY = HEADER + 'imports:\n  - base.yaml\nnode_types:\n  Type:\n    derived_from: Base\n'
+
+
+class TestImportStore(object):
+
+    def test_store(self, tmpdir, server):
+        store = ImportStore(str(tmpdir.join('store')))
+        uri = _write_template(tmpdir, server)
+        assert _types(_read(uri, store)) == ['Base', 'Type']
+        assert server.fetched == ['/library.yaml', '/base.yaml']
+
+        # Stored documents are not requested again, even if they changed
+        server.documents['/base.yaml'] = BASE.replace('Base', 'Other')
+        assert _types(_read(uri, store)) == ['Base', 'Type']
+        assert len(server.fetched) == 2
+
+    @pytest.mark.parametrize('processes', (0, 2))
+    def test_refresh(self, tmpdir, server, processes):
+        store = ImportStore(str(tmpdir.join('store')))
+        uri = _write_template(tmpdir, server)
+        assert _types(_read(uri, store, processes=processes)) == ['Base', 'Type']
+
+        # Unlocked documents are requested again, stored, and locked
+        other_base = BASE.replace('Base', 'Other')
+        server.documents['/base.yaml'] = other_base
+        store.refresh = True
+        import_lock = ImportLock()
+        assert _types(_read(uri, store, import_lock, processes=processes)) == ['Other', 'Type']
+        assert len(server.fetched) == 4
+        assert import_lock.imports[server.url + '/base.yaml'] == get_digest(other_base)
+        store.refresh = False
+        assert _types(_read(uri, store, processes=processes)) == ['Other', 'Type']
+        assert len(server.fetched) == 4
+
+    def test_prefixes_order(self, tmpdir, server):
+        store = ImportStore(str(tmpdir.join('store')))
+        tmpdir.join('template', 'template.yaml').write(
+            HEADER + 'imports:\n  - library.yaml\n', ensure=True)
+        # A file found after a URL is not read instead of it, even if the URL is requested
+        tmpdir.join('files', 'library.yaml').write(BASE.replace('Base', 'Other'), ensure=True)
+        prefixes = [server.url + '/', str(tmpdir.join('files'))]
+        uri = str(tmpdir.join('template', 'template.yaml'))
+        assert _types(_read(uri, store, prefixes=prefixes)) == ['Base', 'Type']
+        assert server.fetched == ['/library.yaml', '/base.yaml']
+        assert _types(_read(uri, store, prefixes=prefixes)) == ['Base', 'Type']
+        assert len(server.fetched) == 2
+
+    def test_lock(self, tmpdir, server):
+        store = ImportStore(str(tmpdir.join('store')))
+        uri = _write_template(tmpdir, server)
+        lock_path = Core(None, None, None).lock_service_template_imports(uri)
+        assert lock_path == ImportLock.get_path(uri)
+        assert sorted(ImportLock.read(lock_path).imports) == \
+            [server.url + '/base.yaml', server.url + '/library.yaml']
+
+        # Documents that do not match the lock are not read
+        server.documents['/base.yaml'] = BASE.replace('Base', 'Other')
+        import_lock = ImportLock.read(lock_path)
+        context = _read(uri, store, import_lock)
+        assert context.validation.has_issues
+        assert 'does not match its lock' in context.validation.issues[0].message
+
+        # Locked documents are read from the store by their digest, not by their URI
+        store.put(server.url + '/base.yaml', BASE.replace('Base', 'Other'))
+        store.put(None, BASE)
+        assert _types(_read(uri, store, import_lock)) == ['Base', 'Type']
+
+    @pytest.mark.parametrize('processes', (0, 2))
+    def test_lock_imports(self, tmpdir, server, processes):
+        store = ImportStore(str(tmpdir.join('store')))
+        uri = _write_template(tmpdir, server)
+        import_lock = ImportLock()
+        assert _types(_read(uri, store, import_lock, processes=processes)) == ['Base', 'Type']
+        assert import_lock.imports == {server.url + '/library.yaml': get_digest(LIBRARY),
+                                       server.url + '/base.yaml': get_digest(BASE)}
+
+    def test_bundle(self, tmpdir, server):
+        store = ImportStore(str(tmpdir.join('store')))
+        uri = _write_template(tmpdir, server)
+        import_lock = ImportLock()
+        _read(uri, store, import_lock)
+        bundle_path = str(tmpdir.join('imports.tar.gz'))
+        store.write_bundle(bundle_path, import_lock)
+        server.stop()
+
+        offline_store = ImportStore(str(tmpdir.join('offline-store')))
+        bundle_lock = offline_store.add_bundle(bundle_path)
+        assert bundle_lock.imports == import_lock.imports
+        # Only the locked URLs are imported, so no other URL is requested
+        assert _types(_read(uri, offline_store, bundle_lock)) == ['Base', 'Type']
+
+    def test_corrupted_object(self, tmpdir):
+        store = ImportStore(str(tmpdir))
+        digest = store.put('http://host/document.yaml', 'data')
+        assert store.get('http://host/document.yaml') == (digest, 'data')
+        tmpdir.join('objects', digest).write('other data')
+        assert store.get('http://host/document.yaml') is None
+
+
+@pytest.fixture
+def server():
+    server = _Server()
+    yield server
+    server.stop()
+
+
+class _Server(object):
+    """
+    Stands in for a remote repository of documents.
+    """
+
+    def __init__(self):
+        server = self
+        self.documents = {'/library.yaml': LIBRARY, '/base.yaml': BASE}
+        # Paths of the documents served (other paths are requested as well, while searching the
+        # prefixes for the profile)
+        self.fetched = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # pylint: disable=invalid-name
+                document = server.documents.get(self.path)
+                if document is not None:
+                    server.fetched.append(self.path)
+                self.send_response(404 if document is None else 200)
+                self.send_header('Cache-Control', 'no-store')
+                self.end_headers()
+                if document is not None:
+                    self.wfile.write(document)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = HTTPServer(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:{0}'.format(self._server.server_port)
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._thread = None
+
+
+def _write_template(tmpdir, server):
+    tmpdir.join('template.yaml').write(
+        HEADER + 'imports:\n  - {0}/library.yaml\n'
+        'topology_template:\n  node_templates:\n    node:\n      type: Type\n'.format(server.url))
+    return str(tmpdir.join('template.yaml'))
+
+
+def _read(uri, store, import_lock=None, prefixes=(), processes=0):
+    context = create_context(uri)
+    context.presentation.processes = processes
+    context.loading.import_store = store
+    context.loading.import_lock = import_lock
+    context.loading.prefixes.extend(prefixes)
+    Read(context).consume()
+    return context
+
+
+def _types(context):
+    assert not context.validation.has_issues, context.validation.issues
+    node_types = context.presentation.presenter.service_template.node_types
+    return sorted(name for name in node_types if name in ('Base', 'Type', 'Other'))
@@ -0,0 +1,105 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from aria.parser.consumption import Read
+from aria.parser.presentation import PresentationCache, Presentation
+from aria.utils.collections import OrderedDict
+from aria.utils.formatting import json_dumps
+
+from .utils import get_example_uri, create_context
+
+
+class TestPresentationCache(object):
+
+    def test_get(self, tmpdir):
+        document, dependency = _write_documents(tmpdir)
+        cache = PresentationCache()
+        assert cache.get(document, Presentation) is None
+        cache.put(document, Presentation, _presentation(), [dependency])
+
+        presentation, dependencies = cache.get(document, Presentation)
+        assert presentation.__class__ == Presentation
+        assert presentation._raw == _presentation()._raw
+        assert dependencies == [dependency]
+        # Every use gets its own copy
+        presentation._raw['key'] = 'changed'
+        assert cache.get(document, Presentation)[0]._raw['key'] == 'value'
+
+    def test_key(self, tmpdir):
+        document, dependency = _write_documents(tmpdir)
+        cache = PresentationCache()
+        cache.put(document, Presentation, _presentation(), [dependency])
+        assert cache.get(document, _Presenter) is None
+        tmpdir.join('document.yaml').write('changed')
+        assert cache.get(document, Presentation) is None
+
+    def test_changed_dependency(self, tmpdir):
+        document, dependency = _write_documents(tmpdir)
+        cache = PresentationCache()
+        cache.put(document, Presentation, _presentation(), [dependency])
+        tmpdir.join('dependency.yaml').write('changed')
+        assert cache.get(document, Presentation) is None
+
+    def test_not_a_file(self, tmpdir):
+        document, _ = _write_documents(tmpdir)
+        cache = PresentationCache()
+        cache.put(document, Presentation, _presentation(), ['http://localhost/dependency.yaml'])
+        assert cache.get(document, Presentation) is None
+
+    def test_stored(self, tmpdir):
+        document, dependency = _write_documents(tmpdir)
+        path = str(tmpdir.join('cache'))
+        PresentationCache(path).put(document, Presentation, _presentation(), [dependency])
+        presentation, _ = PresentationCache(path).get(document, Presentation)
+        assert presentation._raw == _presentation()._raw
+        assert PresentationCache(str(tmpdir.join('other'))).get(document, Presentation) is None
+
+    def test_read(self):
+        uri = get_example_uri('hello-world', 'helloworld.yaml')
+        cache = PresentationCache()
+        uncached_context = _read(uri, cache=None)
+        first_context = _read(uri, cache)
+        second_context = _read(uri, cache)
+
+        raw = json_dumps(uncached_context.presentation.presenter._raw)
+        assert raw == json_dumps(first_context.presentation.presenter._raw)
+        assert raw == json_dumps(second_context.presentation.presenter._raw)
+        node_type = second_context.presentation.presenter.service_template.node_types[
+            'tosca.nodes.WebServer']
+        assert str(node_type._locator.location).endswith('nodes.yaml')
+        # The documents of the profile are kept track of as read
+        assert len(second_context.reading._locations) == len(uncached_context.reading._locations)
+
+
+class _Presenter(Presentation):
+    pass
+
+
+def _write_documents(tmpdir):
+    tmpdir.join('document.yaml').write('document')
+    tmpdir.join('dependency.yaml').write('dependency')
+    return str(tmpdir.join('document.yaml')), str(tmpdir.join('dependency.yaml'))
+
+
+def _presentation():
+    return Presentation(raw=OrderedDict(key='value', nested=OrderedDict(key=1)))
+
+
+def _read(uri, cache):
+    context = create_context(uri)
+    context.presentation.cache = cache
+    Read(context).consume()
+    assert not context.validation.has_issues
+    return context
@@ -0,0 +1,83 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import pytest
+
+from aria.parser.consumption import Read
+
+from .utils import create_context
+
+
+LIBRARIES_COUNT = 5
+
+
+class TestRead(object):
+
+    @pytest.mark.parametrize('processes', (0, 2))
+    def test_imports(self, tmpdir, processes):
+        context = _read(_write_template(tmpdir), processes)
+        assert not context.validation.has_issues
+        presenter = context.presentation.presenter
+        node_types = presenter.service_template.node_types
+        for i in range(LIBRARIES_COUNT):
+            node_type = node_types['Type{0}'.format(i)]
+            assert node_type.derived_from == 'Base'
+            assert str(node_type._locator.location).endswith('library{0}.yaml'.format(i))
+            assert node_type._locator.line == 6
+        assert str(node_types['Base']._locator.location).endswith('base.yaml')
+        # The base library is imported by all libraries, but only read once
+        read_uris = [l.uri for l in context.reading._locations.values()]
+        assert len([uri for uri in read_uris if uri.endswith('base.yaml')]) == 1
+
+    def test_processes_and_threads(self, tmpdir):
+        uri = _write_template(tmpdir)
+        raws = [_read(uri, processes).presentation.presenter._raw for processes in (0, 2)]
+        # Merged lists (such as the imports) depend on the order in which the imports are read
+        for key in ('node_types', 'topology_template'):
+            assert json.dumps(raws[0][key], sort_keys=True) == \
+                json.dumps(raws[1][key], sort_keys=True)
+
+    def test_syntax_error(self, tmpdir):
+        uri = _write_template(tmpdir)
+        tmpdir.join('library0.yaml').write('node_types: [\n')
+        context = _read(uri, processes=2)
+        issues = context.validation.issues
+        assert len(issues) == 1
+        assert str(issues[0].location).endswith('library0.yaml')
+        assert issues[0].line == 1
+
+
+def _write_template(tmpdir):
+    header = 'tosca_definitions_version: tosca_simple_yaml_1_0\n'
+    tmpdir.join('base.yaml').write(header + 'node_types:\n  Base:\n    derived_from: '
+                                   'tosca.nodes.Root\n')
+    for i in range(LIBRARIES_COUNT):
+        tmpdir.join('library{0}.yaml'.format(i)).write(
+            header + 'imports:\n  - base.yaml\nnode_types:\n'
+            '  Type{0}:\n    derived_from: Base\n'.format(i))
+    imports = ''.join('  - library{0}.yaml\n'.format(i) for i in range(LIBRARIES_COUNT))
+    tmpdir.join('template.yaml').write(header + 'imports:\n' + imports +
+                                       'topology_template:\n  node_templates:\n'
+                                       '    node:\n      type: Type0\n')
+    return str(tmpdir.join('template.yaml'))
+
+
+def _read(uri, processes):
+    context = create_context(uri)
+    context.presentation.processes = processes
+    Read(context).consume()
+    return context
@@ -0,0 +1,116 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import threading
+import time
+
+import pytest
+
+from aria.parser.loading import Loader, LoadingContext, UriLocation, LiteralLocation, UriTextLoader
+from aria.parser.reading import ReadingContext, Reader, AlreadyReadException
+
+
+class TestLocationKeys(object):
+
+    def test_file(self):
+        assert UriLocation('/dir/../file.yaml').key == UriLocation('/file.yaml').key
+        assert UriLocation('file:///file.yaml').key == UriLocation('/file.yaml').key
+        assert UriLocation('file.yaml').key == UriLocation(os.path.abspath('file.yaml')).key
+
+    def test_url(self):
+        assert UriLocation('HTTP://Host:80/dir/./file.yaml').key == \
+            UriLocation('http://host/dir/file.yaml').key
+        assert UriLocation('https://host/file.yaml?a=1').key != \
+            UriLocation('https://host/file.yaml?a=2').key
+
+    def test_literal(self):
+        assert LiteralLocation('content', name='a').key == LiteralLocation(u'content').key
+        assert LiteralLocation('content').key != LiteralLocation('other').key
+
+
+class TestReadingContext(object):
+
+    def test_add_location(self):
+        context = ReadingContext()
+        assert context.add_location(UriLocation('/file.yaml'))
+        assert not context.add_location(UriLocation('/dir/../file.yaml'))
+
+    @pytest.mark.parametrize('read', (True, False))
+    def test_claim_location(self, read):
+        context = ReadingContext()
+        location = UriLocation('/file.yaml')
+        key = context.claim_location(location)
+        claims = []
+        thread = threading.Thread(target=lambda: claims.append(context.claim_location(location)))
+        thread.start()
+        time.sleep(0.1)
+        # Waiting for the claimed reading to end
+        assert claims == []
+        context.release_location(key, location if read else None)
+        thread.join()
+        # A reading that failed can be claimed again
+        assert claims == [None if read else key]
+
+    def test_concurrent_readers(self):
+        context = ReadingContext()
+        loader = _SlowLoader(UriLocation('/file.yaml'))
+        results = []
+
+        def read():
+            try:
+                results.append(Reader(context, loader.location, loader).load())
+            except AlreadyReadException:
+                results.append(None)
+
+        threads = [threading.Thread(target=read) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert loader.loaded == 1
+        assert sorted(results) == [None, None, None, 'data']
+
+    def test_relative_locations(self, tmpdir):
+        for dir_name in ('a', 'b'):
+            tmpdir.join(dir_name, 'base.yaml').write('data', ensure=True)
+        context = ReadingContext()
+        loading_context = LoadingContext()
+
+        def read(uri, dir_name):
+            origin_location = UriLocation(str(tmpdir.join(dir_name, 'template.yaml')))
+            loader = UriTextLoader(loading_context, UriLocation(uri), origin_location)
+            try:
+                return Reader(context, loader.location, loader).load()
+            except AlreadyReadException:
+                return None
+
+        assert read('base.yaml', 'a') == 'data'
+        # The same file, through another relative path
+        assert read('../a/base.yaml', 'b') is None
+        # Another file, through the same relative path
+        assert read('base.yaml', 'b') == 'data'
+
+
+class _SlowLoader(Loader):
+
+    def __init__(self, location):
+        self.location = location
+        self.loaded = 0
+
+    def load(self):
+        self.loaded += 1
+        time.sleep(0.1)
+        return 'data'
@@ -0,0 +1,72 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from aria.parser.loading import LiteralLoader, LiteralLocation
+from aria.parser.reading import YamlReader, ReaderSyntaxError
+
+
+DOCUMENT = u"""\
+base: &base
+  key: value
+  list: [1, 2.5, three]
+derived:
+  <<: *base
+  other: value
+"""
+
+
+class TestYamlReader(object):
+
+    @pytest.mark.parametrize('fast', (False, True))
+    def test_read(self, monkeypatch, fast):
+        monkeypatch.setattr(YamlReader, 'fast', fast)
+        raw = _read(DOCUMENT)
+        assert raw == {'base': {'key': 'value', 'list': [1, 2.5, 'three']},
+                       'derived': {'key': 'value', 'list': [1, 2.5, 'three'], 'other': 'value'}}
+        assert _positions(raw) == [
+            ('', 0, 0), ('.base', 1, 7), ('.base.key', 2, 8), ('.derived', 5, 3),
+            ('.derived.key', 2, 8), ('.derived.other', 6, 10)]
+
+    @pytest.mark.parametrize('fast', (False, True))
+    def test_syntax_error(self, monkeypatch, fast):
+        monkeypatch.setattr(YamlReader, 'fast', fast)
+        with pytest.raises(ReaderSyntaxError) as e:
+            _read(u'key: [1, 2\nother: value\n')
+        assert e.value.issue.line == 1
+
+
+def _read(data, link=True):
+    location = LiteralLocation(data)
+    raw = YamlReader(None, location, LiteralLoader(location)).read()
+    if link:
+        locator = raw._locator
+        delattr(raw, '_locator')
+        locator.link(raw)
+    return raw
+
+
+def _positions(raw, path=''):
+    # Lists (and so their elements) are not located
+    positions = [(path, raw._locator.line, raw._locator.column)] \
+        if hasattr(raw, '_locator') else []
+    if isinstance(raw, dict):
+        for key in sorted(raw):
+            positions += _positions(raw[key], '{0}.{1}'.format(path, key))
+    elif isinstance(raw, list):
+        for i, value in enumerate(raw):
+            positions += _positions(value, '{0}.{1}'.format(path, i))
+    return positions
@@ -13,6 +13,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import pickle
+
 import pytest
 from sqlalchemy import Column, Text, Integer, event
 
@@ -25,7 +27,8 @@ from aria.modeling.exceptions import ValueFormatException
 from aria.storage import (
     ModelStorage,
     sql_mapi,
-    instrumentation
+    instrumentation,
+    exceptions
 )
 
 from . import release_sqlite_storage, init_inmemory_model_storage
@@ -232,9 +235,131 @@ class TestInstrumentation(object):
         instance1_1, instance1_2, instance2_1, instance2_2 = get_instances()
         assert instance1_1.dict1 == {'new': 'value'}
         assert instance1_2.list1 == ['new_value']
-        assert instance2_1.dict1 == {'initial': 'value', 'new': 'value'}
+        # Changes made to dict keys are applied on top of the concurrent changes to other keys
+        assert instance2_1.dict1 == {'overriding': 'value', 'new': 'value'}
         assert instance2_2.list1 == ['initial', 'new_value']
 
+    @pytest.mark.parametrize('max_filter_values, selects', ((500, 1), (2, 3)))
+    def test_apply_tracked_changes_queries(self, storage, monkeypatch, max_filter_values, selects):
+        monkeypatch.setattr(instrumentation, '_MAX_FILTER_VALUES', max_filter_values)
+        instances = [MockModel1(name='instance{0}'.format(i)) for i in range(5)]
+        for instance in instances:
+            storage.mock_model_1.put(instance)
+        instrument = self._track_changes({MockModel1.dict1: dict})
+        for instance in instances:
+            instance.dict1 = {'new': 'value'}
+        instrument.restore()
+        storage.mock_model_1._session.expire_all()
+
+        statements = []
+
+        def count_statements(conn, cursor, statement, *args, **kwargs):
+            statements.append(statement.split()[0].upper())
+        engine = storage.mock_model_1._engine
+        event.listen(engine, 'before_cursor_execute', count_statements)
+        try:
+            instrumentation.apply_tracked_changes(
+                tracked_changes=instrument.tracked_changes,
+                model=storage)
+        finally:
+            event.remove(engine, 'before_cursor_execute', count_statements)
+        assert statements.count('SELECT') == selects
+        for instance in instances:
+            assert storage.mock_model_1.get(instance.id).dict1 == {'new': 'value'}
+
+    def test_apply_tracked_changes_all_or_nothing(self, storage):
+        instance1 = MockModel1(name='instance1', dict1={'initial': 'value'})
+        instance2 = MockModel1(name='instance2', dict1={'initial': 'value'})
+        storage.mock_model_1.put(instance1)
+        storage.mock_model_1.put(instance2)
+        instrument = self._track_changes({MockModel1.dict1: dict})
+        instance1.dict1 = {'new': 'value'}
+        instance2.dict1 = {'new': 'value'}
+        instrument.restore()
+        storage.mock_model_1._session.expire_all()
+        storage.mock_model_1.delete(storage.mock_model_1.get(instance2.id))
+
+        with pytest.raises(exceptions.NotFoundError):
+            instrumentation.apply_tracked_changes(
+                tracked_changes=instrument.tracked_changes,
+                model=storage)
+        storage.mock_model_1._session.expire_all()
+        assert storage.mock_model_1.get(instance1.id).dict1 == {'initial': 'value'}
+
+    def test_apply_tracked_changes_key_conflict(self, storage):
+        instance = MockModel1(name='instance', dict1={'key1': 'initial', 'key2': 'initial'})
+        storage.mock_model_1.put(instance)
+        instrument = self._track_changes({MockModel1.dict1: dict})
+        instance = storage.mock_model_1.get(instance.id)
+        instance.dict1['key1'] = 'new'
+        instrument.restore()
+        storage.mock_model_1._session.expire_all()
+
+        instance = storage.mock_model_1.get(instance.id)
+        instance.dict1 = {'key1': 'overriding', 'key2': 'initial'}
+        storage.mock_model_1.update(instance)
+
+        with pytest.raises(exceptions.StorageError) as exc_info:
+            instrumentation.apply_tracked_changes(
+                tracked_changes=instrument.tracked_changes,
+                model=storage)
+        assert 'Version conflict' in str(exc_info.value)
+        assert 'key1' in str(exc_info.value)
+        assert storage.mock_model_1.get(instance.id).dict1['key1'] == 'overriding'
+
+    def test_diff_tracked_changes(self, storage):
+        instance1 = MockModel1(name='instance1', dict1={'big': range(100), 'nested': {'a': 1}})
+        instance2 = MockModel1(name='instance2', dict1={'initial': 'value'})
+        storage.mock_model_1.put(instance1)
+        storage.mock_model_1.put(instance2)
+        instrument = self._track_changes({MockModel1.dict1: dict, MockModel1.list1: list})
+        instance1 = storage.mock_model_1.get(instance1.id)
+        storage.mock_model_1.get(instance2.id)
+        instance1.dict1['nested']['a'] = 2
+        instance1.dict1['nested']['b'] = 3
+        instance1.list1 = ['new']
+
+        changes = instrumentation.diff_tracked_changes(instrument.tracked_changes)
+        assert changes.keys() == ['mock_model_1']
+        assert changes['mock_model_1'].keys() == [instance1.id]
+        instance_changes = changes['mock_model_1'][instance1.id]
+        assert instance_changes['list1'] == Value(STUB, ['new'])
+        assert sorted(instance_changes['dict1'].operations) == [
+            (instrumentation._Patch.ADD, ('nested', 'b'), None, 3),
+            (instrumentation._Patch.SET, ('nested', 'a'), 1, 2)
+        ]
+
+    def test_dict_values_copied_once_handed_out(self, storage):
+        instance = MockModel1(name='instance', dict1={'used': {'a': 1}, 'unused': {'b': 2},
+                                                      'iterated': {'c': 3}})
+        storage.mock_model_1.put(instance)
+        instrument = self._track_changes({MockModel1.dict1: dict})
+        instance = storage.mock_model_1.get(instance.id)
+        value = instrument.tracked_changes['mock_model_1'][instance.id]['dict1']
+        # Values are shared with the initial dict until they are handed out
+        assert dict.__getitem__(value.current, 'unused') is value.initial['unused']
+        instance.dict1['used']['a'] = 10
+        instance.dict1.setdefault('added', {})['d'] = 4
+        for key, nested in instance.dict1.items():
+            if key == 'iterated':
+                nested['c'] = 30
+        assert value.initial == {'used': {'a': 1}, 'unused': {'b': 2}, 'iterated': {'c': 3}}
+
+        changes = instrumentation.diff_tracked_changes(instrument.tracked_changes)
+        assert sorted(changes['mock_model_1'][instance.id]['dict1'].operations) == [
+            (instrumentation._Patch.ADD, ('added', ), None, {'d': 4}),
+            (instrumentation._Patch.SET, ('iterated', 'c'), 3, 30),
+            (instrumentation._Patch.SET, ('used', 'a'), 1, 10)
+        ]
+        assert type(pickle.loads(pickle.dumps(value.current))) is dict
+
+    def test_patch_replaces_values_along_the_path(self):
+        patch = instrumentation._Patch([(instrumentation._Patch.ADD, ('nested', 'b'), None, 3)])
+        for value in (['concurrent'], 'concurrent', None):
+            target = {'nested': value, 'other': 1}
+            assert patch.apply(target) == {'nested': {'b': 3}, 'other': 1}
+            assert target == {'nested': value, 'other': 1}
+
     def test_clear_instance(self, storage):
         instance1 = MockModel1(name='name1')
         instance2 = MockModel1(name='name2')
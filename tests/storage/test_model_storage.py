@@ -13,9 +13,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from collections import OrderedDict
+
 import pytest
 
 from sqlalchemy import (
+    event,
+    inspect,
     Column,
     Integer,
     Text
@@ -25,6 +29,7 @@ from aria import (
     application_model_storage,
     modeling
 )
+from aria.modeling import models
 from aria.storage import (
     ModelStorage,
     exceptions,
@@ -207,3 +212,378 @@ class TestFilterOperands(object):
     def test_eq_and_ne(self, storage):
         assert len(storage.op_mock_model.list(filters=dict(value=dict(eq=1, ne=3)))) == 1
         assert len(storage.op_mock_model.list(filters=dict(value=dict(eq=1, ne=1)))) == 0
+
+
+def test_concurrent_writers_profile(tmpdir):
+    storage = application_model_storage(
+        sql_mapi.SQLAlchemyModelAPI,
+        initiator_kwargs=dict(base_dir=str(tmpdir), **sql_mapi.CONCURRENT_WRITERS_PROFILE))
+    try:
+        engine = storage._all_api_kwargs['engine']
+        assert engine.execute('PRAGMA journal_mode').scalar() == 'wal'
+        # 1 stands for "normal"
+        assert engine.execute('PRAGMA synchronous').scalar() == 1
+    finally:
+        tests_storage.release_sqlite_storage(storage)
+
+
+class TestLoad(object):
+
+    @pytest.fixture
+    def storage(self):
+        storage = application_model_storage(sql_mapi.SQLAlchemyModelAPI,
+                                            initiator=tests_storage.init_inmemory_model_storage)
+        mock.topology.create_simple_topology_two_nodes(storage)
+        storage.node._session.expire_all()
+        yield storage
+        tests_storage.release_sqlite_storage(storage)
+
+    def test_load(self, storage):
+        load = ['outbound_relationships.target_node', 'interfaces.operations', 'service']
+        with _statements(storage) as loading:
+            nodes = storage.node.list(load=load)
+        with _statements(storage) as walking:
+            for node in nodes:
+                assert node.service
+                for relationship in node.outbound_relationships:
+                    assert relationship.target_node
+                for interface in node.interfaces.values():
+                    assert interface.operations
+        # one query per collection in each path
+        assert len(loading) == 4
+        assert not walking
+
+    def test_load_single_instance(self, storage):
+        node_id = storage.node.get_by_name(mock.models.DEPENDENT_NODE_NAME).id
+        storage.node._session.expire_all()
+        node = storage.node.get(node_id, load=['outbound_relationships.target_node'])
+        with _statements(storage) as walking:
+            assert node.outbound_relationships[0].target_node.name == \
+                mock.models.DEPENDENCY_NODE_NAME
+        assert not walking
+
+    def test_load_unknown_relationship(self, storage):
+        with pytest.raises(exceptions.StorageError):
+            storage.node.list(load=['outbound_relationships.no_such_relationship'])
+
+    def test_load_with_include(self, storage):
+        with pytest.raises(exceptions.StorageError):
+            storage.node.list(include=['name'], load=['service'])
+
+
+class TestChunks(object):
+
+    @pytest.fixture
+    def storage(self, storage):
+        # values repeat, so the entries must be told apart by their id as well
+        for i in range(10):
+            storage.mock_model.put(tests_modeling.MockModel(value=i % 3, name='model_{0}'.format(i)))
+        return storage
+
+    @pytest.mark.parametrize('chunk_size', [1, 3, 10, 20])
+    @pytest.mark.parametrize('sort', [None, {'value': 'asc'}, {'value': 'desc'}])
+    def test_iter(self, storage, chunk_size, sort):
+        expected = [model.id for model in storage.mock_model.iter(sort=sort)]
+        result = [model.id for model in storage.mock_model.iter(sort=sort, chunk_size=chunk_size)]
+        if sort:
+            # the order of entries with the same value is not defined without chunks
+            key = lambda model_id: (storage.mock_model.get(model_id).value, model_id)
+            expected = sorted(expected, key=key, reverse=sort['value'] == 'desc')
+            result = sorted(result, key=key, reverse=sort['value'] == 'desc')
+        assert result == expected
+
+    def test_iter_with_filters(self, storage):
+        filters = dict(value=dict(ge=1))
+        result = list(storage.mock_model.iter(filters=filters, chunk_size=2))
+        assert len(result) == 6
+        assert all(model.value >= 1 for model in result)
+        # the filters may be used again
+        assert filters == dict(value=dict(ge=1))
+
+    def test_iter_chunk_queries(self, storage):
+        with _statements(storage) as statements:
+            assert len(list(storage.mock_model.iter(chunk_size=4))) == 10
+        assert len(statements) == 3
+
+    def test_iter_with_include(self, storage):
+        with pytest.raises(exceptions.StorageError):
+            storage.mock_model.iter(include=['name'], chunk_size=2)
+
+    def test_keyset_pagination(self, storage):
+        sort = {'value': 'desc'}
+        expected = storage.mock_model.list(sort=OrderedDict([('value', 'desc'), ('id', 'asc')]))
+        pages = []
+        after = None
+        while True:
+            page = storage.mock_model.list(sort=sort, pagination=dict(size=4, after=after))
+            if not page:
+                break
+            pages.append(page)
+            after = page[-1].id
+        assert [len(page) for page in pages] == [4, 4, 2]
+        assert [model for page in pages for model in page] == expected
+        assert pages[0].metadata['total'] == 10
+
+    def test_pagination_without_count(self, storage):
+        with _statements(storage) as statements:
+            page = storage.mock_model.list(pagination=dict(size=4), count=False)
+        assert len(page) == 4
+        assert page.metadata['total'] is None
+        assert len(statements) == 1
+
+
+class TestQueryCache(object):
+
+    @pytest.fixture
+    def storage(self, storage):
+        for i in range(4):
+            storage.mock_model.put(tests_modeling.MockModel(value=i, name='model_{0}'.format(i)))
+        storage.mock_model.put(tests_modeling.MockModel(name='no_value'))
+        return storage
+
+    @pytest.fixture
+    def builds(self, monkeypatch):
+        builds = []
+        build_query = sql_mapi.SQLAlchemyModelAPI._build_query
+
+        def counting_build_query(*args, **kwargs):
+            builds.append(args)
+            return build_query(*args, **kwargs)
+
+        monkeypatch.setattr(sql_mapi.SQLAlchemyModelAPI, '_build_query', counting_build_query)
+        return builds
+
+    def test_query_is_built_once(self, storage, builds):
+        sort = OrderedDict(value='desc')
+        assert [m.value for m in storage.mock_model.list(filters=dict(value=dict(gt=1)),
+                                                         sort=sort)] == [3, 2]
+        built = len(builds)
+        assert [m.value for m in storage.mock_model.list(filters=dict(value=dict(gt=0)),
+                                                         sort=sort)] == [3, 2, 1]
+        assert len(builds) == built
+
+        assert storage.mock_model.get_by_name('model_1').value == 1
+        built = len(builds)
+        assert storage.mock_model.get_by_name('model_2').value == 2
+        assert len(builds) == built
+
+    def test_shapes(self, storage):
+        assert [m.value for m in storage.mock_model.list(filters=dict(value=[1, 2]),
+                                                         sort=dict(value='asc'))] == [1, 2]
+        assert [m.value for m in storage.mock_model.list(filters=dict(value=[0, 1, 3]),
+                                                         sort=dict(value='asc'))] == [0, 1, 3]
+        assert [m.name for m in storage.mock_model.list(filters=dict(value=None))] == \
+            ['no_value']
+        assert len(storage.mock_model.list(filters=dict(value=dict(ne=None)))) == 4
+        assert len(storage.mock_model.list(filters=dict(value=1, name='model_1'))) == 1
+        assert len(storage.mock_model.list(filters=dict(value=1, name='model_2'))) == 0
+
+    def test_pagination(self, storage):
+        sort = dict(name='asc')
+        pages = [storage.mock_model.list(sort=sort, pagination=dict(size=2, offset=offset))
+                 for offset in (0, 2, 4)]
+        assert [[m.name for m in page] for page in pages] == \
+            [['model_0', 'model_1'], ['model_2', 'model_3'], ['no_value']]
+        assert all(page.metadata['total'] == 5 for page in pages)
+
+    def test_relationship_filter(self, context):
+        service = context.model.service.list()[0]
+        assert len(context.model.node.list(filters=dict(service=service))) == 2
+
+
+class TestIndexes(object):
+
+    UPGRADED_INDEXES = {
+        'log': ['ix_log_execution_fk'],
+        'task': ['ix_task_execution_fk_status', 'ix_task_status'],
+        'node': ['ix_node_service_fk', 'ix_node_node_template_fk'],
+    }
+
+    def test_indexes(self, tmpdir):
+        storage = _storage(tmpdir)
+        try:
+            for table_name, index_names in self.UPGRADED_INDEXES.items():
+                assert set(index_names) <= _index_names(storage, table_name)
+        finally:
+            tests_storage.release_sqlite_storage(storage)
+
+    def test_upgrade(self, tmpdir):
+        _downgrade(_storage(tmpdir), self.UPGRADED_INDEXES)
+        storage = _storage(tmpdir)
+        try:
+            for table_name, index_names in self.UPGRADED_INDEXES.items():
+                assert set(index_names) <= _index_names(storage, table_name)
+        finally:
+            tests_storage.release_sqlite_storage(storage)
+
+
+def _storage(tmpdir):
+    return application_model_storage(sql_mapi.SQLAlchemyModelAPI,
+                                     initiator_kwargs=dict(base_dir=str(tmpdir)))
+
+
+def _downgrade(storage, indexes):
+    # As if the db was created before the indexes were declared
+    engine = storage._all_api_kwargs['engine']
+    for index_names in indexes.values():
+        for index_name in index_names:
+            engine.execute('DROP INDEX {0}'.format(index_name))
+    engine.execute('PRAGMA user_version = 0')
+    storage._all_api_kwargs['session'].close()
+
+
+def _index_names(storage, table_name):
+    return set(index['name'] for index in
+               inspect(storage._all_api_kwargs['engine']).get_indexes(table_name))
+
+
+class TestBulk(object):
+
+    def test_put_many(self, storage):
+        models = [tests_modeling.MockModel(value=i, name='model_{0}'.format(i)) for i in range(5)]
+        with _commits(storage) as commits:
+            assert storage.mock_model.put_many(models) == models
+        assert len(commits) == 1
+        assert all(model.id is not None for model in models)
+        assert sorted(model.value for model in storage.mock_model.list()) == range(5)
+
+    def test_update_many(self, storage):
+        models = storage.mock_model.put_many(
+            [tests_modeling.MockModel(value=i, name='model_{0}'.format(i)) for i in range(5)])
+        for model in models:
+            model.value += 10
+        with _commits(storage) as commits:
+            storage.mock_model.update_many(models)
+        assert len(commits) == 1
+        storage.mock_model._session.expire_all()
+        assert sorted(model.value for model in storage.mock_model.list()) == range(10, 15)
+
+
+class TestCache(object):
+
+    @pytest.fixture
+    def context(self, tmpdir):
+        result = mock.context.simple(str(tmpdir), initiator_kwargs=dict(cache_size=10))
+        # The cache is shared by the models, and was used while creating the context
+        result.model.node.cache.clear()
+        yield result
+        tests_storage.release_sqlite_storage(result.model)
+
+    def test_get(self, context):
+        node_id = context.model.node.get_by_name(mock.models.DEPENDENCY_NODE_NAME).id
+        node = context.model.node.get(node_id)
+        with _statements(context.model) as statements:
+            assert context.model.node.get(node_id) is node
+        assert not statements
+        assert context.model.node.cache.cache_info() == sql_mapi.CacheInfo(
+            hits=1, misses=1, maxsize=10, currsize=1)
+
+    def test_unchanged_version(self, context):
+        node = context.model.node.get_by_name(mock.models.DEPENDENCY_NODE_NAME)
+        node.runtime_properties = {'key': 'value'}
+        context.model.node.update(node)
+        node = context.model.node.get(node.id)
+        node_id = node.id
+        # Committing expires all the instances of the session
+        context.model.execution.update(context.execution)
+
+        with _statements(context.model) as statements:
+            assert context.model.node.get(node_id) is node
+            assert node.runtime_properties == {'key': 'value'}
+        # Only the version is queried
+        assert len(statements) == 1
+        assert context.model.node.cache.cache_info().hits == 1
+
+        # The restored values are still tracked
+        node.runtime_properties['key'] = 'changed'
+        context.model.node.update(node)
+        context.model.node._session.expire_all()
+        assert context.model.node.get(node_id).runtime_properties == {'key': 'changed'}
+
+    def test_changed_version(self, context):
+        node_id = context.model.node.get_by_name(mock.models.DEPENDENCY_NODE_NAME).id
+        node = context.model.node.get(node_id)
+        # Changed by another process
+        context.model._all_api_kwargs['engine'].execute(
+            models.Node.__table__.update()
+            .where(models.Node.__table__.c.id == node_id)
+            .values(version=node.version + 1, state=models.Node.STARTED))
+        context.model.node._session.expire_all()
+
+        assert context.model.node.get(node_id).state == models.Node.STARTED
+        cache_info = context.model.node.cache.cache_info()
+        assert cache_info.hits == 0
+        assert cache_info.misses == 2
+
+    def test_unversioned_model(self, context):
+        execution_id = context._execution_id
+        execution = context.model.execution.get(execution_id)
+        assert context.model.execution.get(execution_id) is execution
+        context.model.node._session.expire_all()
+        with _statements(context.model) as statements:
+            assert context.model.execution.get(execution_id) is execution
+        # Expired instances of models without a version are fetched again
+        assert len(statements) == 1
+        cache_info = context.model.execution.cache.cache_info()
+        assert cache_info.hits == 1
+        assert cache_info.misses == 2
+
+    def test_invalidation(self, context):
+        node = context.model.node.get_by_name(mock.models.DEPENDENCY_NODE_NAME)
+        node = context.model.node.get(node.id)
+        assert context.model.node.cache.cache_info().currsize == 1
+        context.model.node.update(node)
+        assert context.model.node.cache.cache_info().currsize == 0
+
+        node = context.model.node.get(node.id)
+        context.model.node.delete(node)
+        assert context.model.node.cache.cache_info().currsize == 0
+        with pytest.raises(exceptions.NotFoundError):
+            context.model.node.get(node.id)
+
+    def test_include_and_load_are_not_cached(self, context):
+        node_id = context.model.node.get_by_name(mock.models.DEPENDENCY_NODE_NAME).id
+        context.model.node.get(node_id, include=['name'])
+        context.model.node.get(node_id, load=['service'])
+        assert context.model.node.cache.cache_info().currsize == 0
+
+    def test_lru_eviction(self):
+        cache = sql_mapi.ModelCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        assert cache.get('a', lambda entry: entry) == 1
+        cache.put('c', 3)
+        assert cache.get('b', lambda entry: entry) is None
+        assert cache.get('a', lambda entry: entry) == 1
+        assert cache.get('c', lambda entry: entry) == 3
+        assert cache.cache_info() == sql_mapi.CacheInfo(hits=3, misses=1, maxsize=2, currsize=2)
+
+
+class _statements(object):
+
+    def __init__(self, storage):
+        self._engine = storage._all_api_kwargs['engine']
+        self._statements = []
+
+    def __enter__(self):
+        event.listen(self._engine, 'before_cursor_execute', self._append)
+        return self._statements
+
+    def __exit__(self, *args):
+        event.remove(self._engine, 'before_cursor_execute', self._append)
+
+    def _append(self, conn, cursor, statement, *args, **kwargs):
+        self._statements.append(statement)
+
+
+class _commits(_statements):
+
+    def __enter__(self):
+        event.listen(self._engine, 'commit', self._append)
+        return self._statements
+
+    def __exit__(self, *args):
+        event.remove(self._engine, 'commit', self._append)
+
+    def _append(self, conn, *args, **kwargs):
+        self._statements.append(conn)
@@ -14,10 +14,22 @@
 # limitations under the License.
 
 import logging
-
-from aria.logger import (create_logger,
+import os
+import time
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.sql.expression import Insert
+
+from aria import logger
+from aria.modeling import models
+from aria.logger import (logs_stored_signal,
+                         create_logger,
                          create_console_log_handler,
                          create_file_log_handler,
+                         create_sqla_log_handler,
                          _default_file_formatter,
                          LoggerMixin,
                          _DefaultConsoleFormat)
@@ -127,3 +139,157 @@ def test_loggermixin(capsys):
     # class_unpickled = pickle.loads(class_pickled)
     #
     # assert vars(class_unpickled) == vars(custom_class)
+
+
+class TestSQLAlchemyLogHandler(object):
+
+    @pytest.fixture
+    def engine(self, tmpdir):
+        engine = create_engine('sqlite:///{0}'.format(os.path.join(str(tmpdir), 'db.sqlite')))
+        engine.inserts = []
+
+        def count_inserts(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith('INSERT'):
+                engine.inserts.append(len(parameters) if executemany else 1)
+        event.listen(engine, 'before_cursor_execute', count_inserts)
+        yield engine
+        engine.dispose()
+
+    def test_batches(self, engine):
+        handler = _handler(engine, batch_size=3, flush_interval=60)
+        try:
+            for i in range(7):
+                handler.handle(_record(str(i)))
+            # Full batches are written right away
+            _wait_for(lambda: _logs(engine) == ['0', '1', '2', '3', '4', '5'])
+            handler.flush()
+            assert _logs(engine) == [str(i) for i in range(7)]
+            assert engine.inserts == [3, 3, 1]
+        finally:
+            handler.close()
+
+    def test_flush_interval(self, engine):
+        handler = _handler(engine, batch_size=100, flush_interval=0.01)
+        try:
+            handler.handle(_record('message'))
+            _wait_for(lambda: _logs(engine) == ['message'])
+        finally:
+            handler.close()
+
+    def test_created_at(self, engine):
+        handler = _handler(engine)
+        record = _record('message')
+        record.created = time.time() - 3600
+        try:
+            handler.handle(record)
+            handler.flush()
+            log = engine.execute(models.Log.__table__.select()).fetchone()
+            assert log.created_at == datetime.fromtimestamp(record.created)
+            assert log.execution_fk == 1
+            assert log.level == 'INFO'
+        finally:
+            handler.close()
+
+    def test_close(self, engine):
+        handler = _handler(engine, flush_interval=60)
+        handler.handle(_record('message'))
+        handler.close()
+        assert _logs(engine) == ['message']
+        # Closed handlers still store new logs
+        handler.handle(_record('another message'))
+        handler.close()
+        assert _logs(engine) == ['message', 'another message']
+
+    def test_logs_stored_signal(self, engine):
+        notified = []
+
+        def notify(execution_id):
+            notified.append((execution_id, _logs(engine)))
+
+        logs_stored_signal.connect(notify)
+        handler = _handler(engine, flush_interval=60)
+        try:
+            handler.handle(_record('message'))
+            assert notified == []
+            handler.flush()
+            # Sent once the logs are stored
+            assert notified == [(1, ['message'])]
+        finally:
+            handler.close()
+            logs_stored_signal.disconnect(notify)
+
+    def test_locked_db(self, engine, monkeypatch):
+        attempts = _lock_db(engine, monkeypatch, failures=2)
+        handler = _handler(engine, flush_interval=60)
+        try:
+            handler.handle(_record('message'))
+            handler.flush()
+            # Retried until the db is no longer locked
+            assert len(attempts) == 3
+            assert _logs(engine) == ['message']
+        finally:
+            handler.close()
+
+    def test_locked_db_keeps_logs(self, engine, monkeypatch):
+        _lock_db(engine, monkeypatch, failures=logger._INSERT_ATTEMPTS)
+        handler = _handler(engine, flush_interval=60)
+        try:
+            handler.handle(_record('message'))
+            handler.flush()
+            assert _logs(engine) == []
+            # Stored along with the next logs
+            handler.handle(_record('another message'))
+            handler.flush()
+            assert _logs(engine) == ['message', 'another message']
+        finally:
+            handler.close()
+
+    def test_flush_without_logs(self, engine):
+        handler = _handler(engine)
+        handler.flush()
+        handler.close()
+        assert engine.inserts == []
+
+
+def _handler(engine, **kwargs):
+    return create_sqla_log_handler(session=None, engine=engine, log_cls=models.Log,
+                                   execution_id=1, **kwargs)
+
+
+def _lock_db(engine, monkeypatch, failures):
+    """
+    Makes the first inserts fail as if the db was locked
+    :return: list of the insert attempts
+    """
+    monkeypatch.setattr(logger, '_INSERT_RETRY_INTERVAL', 0)
+    monkeypatch.setattr(logger.traceback, 'print_exc', lambda: None)
+    execute = engine.execute
+    attempts = []
+
+    def locked_execute(statement, *args, **kwargs):
+        if isinstance(statement, Insert):
+            attempts.append(statement)
+            if len(attempts) <= failures:
+                raise OperationalError(str(statement), None, 'database is locked')
+        return execute(statement, *args, **kwargs)
+    monkeypatch.setattr(engine, 'execute', locked_execute)
+    return attempts
+
+
+def _record(msg):
+    record = logging.LogRecord(name='test', level=logging.INFO, pathname=__file__, lineno=0,
+                               msg=msg, args=None, exc_info=None)
+    record.task_id = None
+    return record
+
+
+def _logs(engine):
+    table = models.Log.__table__
+    return [row.msg for row in engine.execute(table.select().order_by(table.c.id))]
+
+
+def _wait_for(condition, timeout=10):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.01)